@@ -1,23 +1,62 @@
-import boa
+import importlib
+
 import click
-from eth_account import Account
 
-from scripts.deploy import deploy_commands
-from scripts.tests import test_commands
-from settings.config import settings
+from scripts.tracing import start_tracing, stop_tracing
+
+
+class LazyGroup(click.Group):
+    """
+    Group importing its commands only when they are invoked. Short help of every command is declared here,
+    so that listing commands (`--help`) imports nothing.
+    """
+
+    def __init__(self, *args, lazy_commands: dict[str, tuple[str, str]], **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_commands = lazy_commands
+
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return sorted({*super().list_commands(ctx), *self.lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in self.lazy_commands:
+            return super().get_command(ctx, cmd_name)
+
+        module_name, attr = self.lazy_commands[cmd_name][0].split(":")
+        return getattr(importlib.import_module(module_name), attr)
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        rows = [(cmd_name, short_help) for cmd_name, (_, short_help) in sorted(self.lazy_commands.items())]
+        with formatter.section("Commands"):
+            formatter.write_dl(rows)
 
 
-@click.group("commands")
-def commands(): ...
+# commands set up network env themselves (see scripts.network.requires_network)
+@click.group(
+    "commands",
+    cls=LazyGroup,
+    lazy_commands={
+        "benchmark": ("scripts.benchmark:run_benchmark_command", "benchmark deploy all on local devnet"),
+        "compile": ("scripts.deploy:run_compile", "compile all latest contracts"),
+        "deploy": ("scripts.deploy:deploy_commands", "Commands related to deploy"),
+        "devnet": ("scripts.devnet:devnet_commands", "Commands related to local devnet"),
+        "snapshot": ("scripts.snapshot.commands:snapshot_commands", "Commands related to snapshots of chain state"),
+        "test": ("scripts.tests:test_commands", "Commands related to test"),
+    },
+)
+@click.option(
+    "--trace",
+    "trace_file",
+    type=click.Path(dir_okay=False),
+    default=None,
+    help="Write Chrome trace of the command (chrome://tracing, ui.perfetto.dev) and log time per phase",
+)
+@click.pass_context
+def commands(ctx, trace_file):
+    if trace_file:
+        start_tracing()
+        ctx.call_on_close(lambda: stop_tracing(trace_file))
 
 
 if __name__ == "__main__":
-    if settings.DEBUG:
-        boa.fork(settings.WEB3_PROVIDER_URL, block_identifier="latest")
-    else:
-        boa.set_network_env(settings.WEB3_PROVIDER_URL)
-        boa.env.add_account(Account.from_key(settings.DEPLOYER_EOA_PRIVATE_KEY))
-
-    commands.add_command(deploy_commands)
-    commands.add_command(test_commands)
     commands()
@@ -0,0 +1,4 @@
+from .evm import Revert
+from .stableswap import StableswapState
+from .tricrypto import TricryptoState
+from .twocrypto import TwocryptoState
@@ -0,0 +1,77 @@
+from typing import Callable, Iterable
+
+MAX_UINT256 = 2**256 - 1
+MIN_INT256 = -(2**255)
+MAX_INT256 = 2**255 - 1
+
+
+class Revert(Exception):
+    """
+    Contract call with the same inputs would revert
+    """
+
+
+def uint256(value: int) -> int:
+    """
+    Check result of checked uint256 arithmetic, vyper reverts on overflow and underflow
+    """
+    if value < 0:
+        raise Revert("uint256 underflow")
+    if value > MAX_UINT256:
+        raise Revert("uint256 overflow")
+    return value
+
+
+def int256(value: int) -> int:
+    """
+    Check result of checked int256 arithmetic
+    """
+    if not MIN_INT256 <= value <= MAX_INT256:
+        raise Revert("int256 overflow")
+    return value
+
+
+def wrap_uint256(value: int) -> int:
+    # unsafe_* uint256 operations wrap modulo 2**256
+    return value & MAX_UINT256
+
+
+def wrap_int256(value: int) -> int:
+    # two's complement wrap of unsafe_* int256 operations
+    return (value - MIN_INT256) % 2**256 + MIN_INT256
+
+
+def sdiv(a: int, b: int) -> int:
+    # evm signed division truncates towards zero, python floors
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+def unsafe_div(a: int, b: int) -> int:
+    # evm returns 0 on division by zero
+    return a // b if b else 0
+
+
+def unsafe_sdiv(a: int, b: int) -> int:
+    return wrap_int256(sdiv(a, b)) if b else 0
+
+
+def call_many(calls: Iterable[tuple[Callable, tuple]], allow_failure: bool = False) -> list:
+    """
+    Evaluate many calls, like Multicall3.aggregate3 does on-chain
+
+    Args:
+    calls (Iterable[tuple[Callable, tuple]]): Function and arguments of every call
+    allow_failure (bool): Return None for calls the contract would revert on instead of raising
+    Returns:
+    list: Result of every call
+    """
+    results = []
+    for function, args in calls:
+        try:
+            results.append(function(*args))
+        except (Revert, ZeroDivisionError):
+            if not allow_failure:
+                raise
+            results.append(None)
+    return results
@@ -0,0 +1,261 @@
+from typing import TYPE_CHECKING, Iterable, Literal
+
+from scripts.deploy.constants import MULTICALL3_ADDRESS, ZERO_ADDRESS
+from scripts.logging_config import get_logger
+from scripts.tracing import span
+
+from .evm import call_many
+from .stableswap import StableswapState
+from .tricrypto import TricryptoState
+from .twocrypto import TwocryptoState
+
+if TYPE_CHECKING:
+    from scripts.deploy.multicall import Multicall
+
+logger = get_logger()
+
+PoolKind = Literal["stableswap", "twocrypto", "tricrypto"]
+
+# implementations the states are ported from, their abi is used to read pools
+POOL_ABIS = {
+    "stableswap": "/contracts/amm/stableswap/implementation/implementation_v_700.vy",
+    "twocrypto": "/contracts/amm/twocryptoswap/implementation/implementation_v_300.vy",
+    "tricrypto": "/contracts/amm/tricryptoswap/implementation/implementation_v_200.vy",
+}
+
+# Reading pool state from chain (needs network env set up, see scripts.network). Pool math itself is in modules of
+# this package and doesn't need boa, so boa is only imported by functions that read chain.
+
+
+def _get_pool_contract(pool: str, kind: PoolKind):
+    from scripts.deploy.abi import get_contract_at
+
+    return get_contract_at(POOL_ABIS[kind], pool)
+
+
+def detect_pool_kind(pool: str, multicall_address: str = MULTICALL3_ADDRESS) -> PoolKind | None:
+    """
+    Find which AMM pool is by probing getters specific to each implementation in one multicall
+
+    Args:
+    pool (str): Pool address
+    multicall_address (str): Multicall3 address
+    Returns:
+    PoolKind | None: Kind of the pool, None if it is not a curve pool
+    """
+    from scripts.deploy.multicall import Multicall
+
+    twocrypto = _get_pool_contract(pool, "twocrypto")
+    tricrypto = _get_pool_contract(pool, "tricrypto")
+    stableswap = _get_pool_contract(pool, "stableswap")
+    with Multicall(multicall_address) as multicall:
+        gamma = multicall.add(twocrypto.gamma, allow_failure=True)
+        price_scale_1 = multicall.add(tricrypto.price_scale, 1, allow_failure=True)
+        offpeg_fee_multiplier = multicall.add(stableswap.offpeg_fee_multiplier, allow_failure=True)
+
+    if price_scale_1.success:
+        return "tricrypto"
+    if gamma.success:
+        # other twocrypto implementations have the same get_dy, they are quoted by view calls
+        return "twocrypto"
+    if offpeg_fee_multiplier.success:
+        return "stableswap"
+    return None
+
+
+def _read_stableswap(multicall: "Multicall", pool: str):
+    contract = _get_pool_contract(pool, "stableswap")
+    calls = {
+        "rates": multicall.add(contract.stored_rates, allow_failure=True),
+        "balances": multicall.add(contract.get_balances, allow_failure=True),
+        "A": multicall.add(contract.A, allow_failure=True),
+        "fee": multicall.add(contract.fee, allow_failure=True),
+        "offpeg_fee_multiplier": multicall.add(contract.offpeg_fee_multiplier, allow_failure=True),
+        "total_supply": multicall.add(contract.totalSupply, allow_failure=True),
+    }
+
+    def build(values: dict, timestamp: int) -> StableswapState:
+        return StableswapState(**{**values, "rates": tuple(values["rates"]), "balances": tuple(values["balances"])})
+
+    return calls, build
+
+
+def _read_tricrypto(multicall: "Multicall", pool: str):
+    contract = _get_pool_contract(pool, "tricrypto")
+    calls = {f"balance_{k}": multicall.add(contract.balances, k, allow_failure=True) for k in range(3)}
+    calls.update({f"price_scale_{k}": multicall.add(contract.price_scale, k, allow_failure=True) for k in range(2)})
+    for getter in ("precisions", "A", "gamma", "D", "mid_fee", "out_fee", "fee_gamma", "future_A_gamma_time"):
+        calls[getter] = multicall.add(getattr(contract, getter), allow_failure=True)
+    calls["total_supply"] = multicall.add(contract.totalSupply, allow_failure=True)
+
+    def build(values: dict, timestamp: int) -> TricryptoState:
+        return TricryptoState(
+            balances=tuple(values[f"balance_{k}"] for k in range(3)),
+            precisions=tuple(values["precisions"]),
+            price_scale=tuple(values[f"price_scale_{k}"] for k in range(2)),
+            A=values["A"],
+            gamma=values["gamma"],
+            D=values["D"],
+            mid_fee=values["mid_fee"],
+            out_fee=values["out_fee"],
+            fee_gamma=values["fee_gamma"],
+            total_supply=values["total_supply"],
+            ramping=values["future_A_gamma_time"] > timestamp,
+        )
+
+    return calls, build
+
+
+def _read_twocrypto(multicall: "Multicall", pool: str):
+    contract = _get_pool_contract(pool, "twocrypto")
+    calls = {f"balance_{k}": multicall.add(contract.balances, k, allow_failure=True) for k in range(2)}
+    calls.update(
+        {f"admin_balance_{k}": multicall.add(contract.admin_balances, k, allow_failure=True) for k in range(2)}
+    )
+    for getter in (
+        "POLICY",
+        "precisions",
+        "initial_A_gamma",
+        "initial_A_gamma_time",
+        "future_A_gamma",
+        "future_A_gamma_time",
+        "D",
+        "price_scale",
+        "price_oracle",
+        "last_prices",
+        "last_timestamp",
+        "mid_fee",
+        "out_fee",
+        "fee_gamma",
+        "adjustment_step",
+        "packed_rebalancing_params",
+        "totalSupply",
+        "virtual_price",
+        "xcp_profit",
+        "lp_xcp_profit",
+        "reserved_profit_fraction",
+        "admin_fee",
+        "donation_shares",
+        "donation_shares_max_ratio",
+        "donation_duration",
+        "last_donation_release_ts",
+        "donation_protection_expiry_ts",
+        "donation_protection_period",
+        "donation_protection_lp_threshold",
+    ):
+        calls[getter] = multicall.add(getattr(contract, getter), allow_failure=True)
+
+    def build(values: dict, timestamp: int) -> TwocryptoState | None:
+        if values.pop("POLICY") != ZERO_ADDRESS:
+            # fees of pools with policy contract are not ported
+            return None
+
+        initial_A_gamma, future_A_gamma = values.pop("initial_A_gamma"), values.pop("future_A_gamma")
+        adjustment_step = values.pop("adjustment_step")
+        return TwocryptoState(
+            balances=[values.pop("balance_0"), values.pop("balance_1")],
+            admin_balances=[values.pop("admin_balance_0"), values.pop("admin_balance_1")],
+            precisions=tuple(values.pop("precisions")),
+            initial_A=initial_A_gamma >> 128,
+            initial_gamma=initial_A_gamma & (2**128 - 1),
+            A=future_A_gamma >> 128,
+            gamma=future_A_gamma & (2**128 - 1),
+            adjustment_step_min=adjustment_step[0],
+            adjustment_step_max=adjustment_step[1],
+            ma_time=values.pop("packed_rebalancing_params") & (2**64 - 1),
+            total_supply=values.pop("totalSupply"),
+            **values,
+        )
+
+    return calls, build
+
+
+_READERS = {"stableswap": _read_stableswap, "twocrypto": _read_twocrypto, "tricrypto": _read_tricrypto}
+
+
+def read_pool_state(
+    pool: str, kind: PoolKind, multicall_address: str = MULTICALL3_ADDRESS
+) -> tuple[StableswapState | TwocryptoState | TricryptoState | None, int]:
+    """
+    Read everything pool math needs in one multicall
+
+    TwocryptoState gets price_oracle() (EMA at the block read) in place of private cached_price_oracle, which is exact
+    for views. Operations simulated on it are exact once last_timestamp is the block timestamp.
+
+    Args:
+    pool (str): Pool address
+    kind (PoolKind): Kind of the pool
+    multicall_address (str): Multicall3 address
+    Returns:
+    tuple[StableswapState | TwocryptoState | TricryptoState | None, int]: State (None if some getter failed or the
+    pool is not supported) and timestamp of the block read
+    """
+    from scripts.deploy.multicall import Multicall
+
+    multicall = Multicall(multicall_address)
+    _, block_timestamp = multicall.add_block()
+    calls, build = _READERS[kind](multicall, str(pool))
+    multicall.execute()
+
+    timestamp = block_timestamp.value
+    failed = [name for name, call in calls.items() if not call.success]
+    if failed:
+        logger.debug(f"Can't read {kind} state of {pool}, failed getters: {failed}")
+        return None, timestamp
+    return build({name: call.value for name, call in calls.items()}, timestamp), timestamp
+
+
+def quote_view_calls(
+    pool: str, i: int, j: int, sizes: Iterable[int], kind: PoolKind, multicall_address: str = MULTICALL3_ADDRESS
+) -> list[int | None]:
+    """
+    pool.get_dy(i, j, dx) of every size in one multicall, None for calls that revert
+    """
+    from scripts.deploy.multicall import Multicall
+
+    get_dy = _get_pool_contract(pool, kind).get_dy
+    with Multicall(multicall_address) as multicall:
+        calls = [multicall.add(get_dy, i, j, dx, allow_failure=True) for dx in sizes]
+    return [call.value if call.success else None for call in calls]
+
+
+def quote_curve(
+    pool: str,
+    i: int,
+    j: int,
+    sizes: Iterable[int],
+    kind: PoolKind | None = None,
+    multicall_address: str = MULTICALL3_ADDRESS,
+) -> list[int | None]:
+    """
+    Price impact curve: get_dy of coin i to coin j for many trade sizes.
+    Pool state is read in one multicall and all sizes are evaluated locally sharing D of the state. Pools which
+    state can't be read (other implementations, policy contracts) are quoted by a single multicall of get_dy.
+
+    Args:
+    pool (str): Pool address
+    i (int): Index of coin sent
+    j (int): Index of coin received
+    sizes (Iterable[int]): Amounts of coin i
+    kind (PoolKind | None): Kind of the pool, detected by one more multicall if not given
+    multicall_address (str): Multicall3 address
+    Returns:
+    list[int | None]: dy of every size, None for sizes the pool reverts on
+    """
+    sizes = list(sizes)
+    pool = str(pool)
+    if kind is None:
+        kind = detect_pool_kind(pool, multicall_address)
+        if kind is None:
+            raise ValueError(f"{pool} is not a stableswap-ng, twocrypto-ng or tricrypto-ng pool")
+
+    state, timestamp = read_pool_state(pool, kind, multicall_address)
+    if state is None:
+        logger.debug(f"Quoting {len(sizes)} sizes of {pool} by view calls")
+        return quote_view_calls(pool, i, j, sizes, kind, multicall_address)
+
+    with span(f"quote {kind}", "amm_math"):
+        if kind == "twocrypto":
+            # A and gamma at block timestamp matter while ramping
+            return call_many(((state.get_dy, (i, j, dx, timestamp)) for dx in sizes), allow_failure=True)
+        return call_many(((state.get_dy, (i, j, dx)) for dx in sizes), allow_failure=True)
@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Iterable
+
+from .evm import Revert, call_many
+from .evm import uint256 as u
+
+A_PRECISION = 100
+PRECISION = 10**18
+FEE_DENOMINATOR = 10**10
+MAX_COINS = 8
+
+# Port of stableswap-ng math_v_100.vy and views_v_120.vy. Every checked uint256 operation of the contracts
+# is checked here as well (see evm.uint256), so results are equal to the contracts' and inputs the contracts
+# revert on raise Revert (or ZeroDivisionError).
+
+
+def get_D(xp: list[int], amp: int) -> int:
+    """
+    D invariant for balances in common precision
+
+    Args:
+    xp (list[int]): Balances multiplied by rates
+    amp (int): A * A_PRECISION
+    Returns:
+    int: D
+    """
+    n_coins = len(xp)
+    S = u(sum(xp))
+    if S == 0:
+        return 0
+
+    D = S
+    Ann = u(amp * n_coins)
+    n_pow_n = n_coins**n_coins
+    for _ in range(255):
+        D_P = D
+        for x in xp:
+            D_P = u(D_P * D) // x
+        D_P //= n_pow_n
+        D_prev = D
+
+        numerator = u(u(u(Ann * S) // A_PRECISION + u(D_P * n_coins)) * D)
+        denominator = u(u(u(Ann - A_PRECISION) * D) // A_PRECISION + u((n_coins + 1) * D_P))
+        D = numerator // denominator
+        if abs(D - D_prev) <= 1:
+            return D
+    raise Revert("get_D did not converge")
+
+
+def newton_y(b: int, c: int, D: int, y: int) -> int:
+    for _ in range(255):
+        y_prev = y
+        y = u(u(y * y) + c) // u(u(2 * y + b) - D)
+        if abs(y - y_prev) <= 1:
+            return y
+    raise Revert("newton_y did not converge")
+
+
+def _check_index(i: int, n_coins: int) -> None:
+    if not 0 <= i < n_coins:
+        raise Revert(f"index {i} out of range")
+
+
+def get_y(i: int, j: int, x: int, xp: list[int], amp: int, D: int) -> int:
+    """
+    Balance of coin j if balance of coin i becomes x, at constant D
+
+    Args:
+    i (int): Index of coin with known balance
+    j (int): Index of coin to find balance of
+    x (int): New balance of coin i in common precision
+    xp (list[int]): Balances in common precision
+    amp (int): A * A_PRECISION
+    D (int): Invariant
+    Returns:
+    int: Balance of coin j in common precision
+    """
+    n_coins = len(xp)
+    if i == j:
+        raise Revert("same coin")
+    _check_index(i, n_coins)
+    _check_index(j, n_coins)
+
+    S_ = 0
+    c = D
+    Ann = u(amp * n_coins)
+    for k in range(n_coins):
+        if k == i:
+            _x = x
+        elif k != j:
+            _x = xp[k]
+        else:
+            continue
+        S_ = u(S_ + _x)
+        c = u(c * D) // u(_x * n_coins)
+
+    c = u(u(c * D) * A_PRECISION) // u(Ann * n_coins)
+    b = u(S_ + u(D * A_PRECISION) // Ann)
+    return newton_y(b, c, D, D)
+
+
+def get_y_D(amp: int, i: int, xp: list[int], D: int) -> int:
+    """
+    Balance of coin i if D is reduced to given value, other balances being the same
+
+    Args:
+    amp (int): A * A_PRECISION
+    i (int): Index of coin
+    xp (list[int]): Balances in common precision
+    D (int): New invariant
+    Returns:
+    int: Balance of coin i in common precision
+    """
+    n_coins = len(xp)
+    _check_index(i, n_coins)
+
+    S_ = 0
+    c = D
+    Ann = u(amp * n_coins)
+    for k in range(n_coins):
+        if k == i:
+            continue
+        S_ = u(S_ + xp[k])
+        c = u(c * D) // u(xp[k] * n_coins)
+
+    c = u(u(c * D) * A_PRECISION) // u(Ann * n_coins)
+    b = u(S_ + u(D * A_PRECISION) // Ann)
+    return newton_y(b, c, D, D)
+
+
+def dynamic_fee(xpi: int, xpj: int, fee: int, fee_multiplier: int) -> int:
+    """
+    Offpeg fee: base fee grows up to fee * fee_multiplier as balances i and j get imbalanced
+
+    Args:
+    xpi (int): Balance of coin i in common precision
+    xpj (int): Balance of coin j in common precision
+    fee (int): Base fee (1e10 precision)
+    fee_multiplier (int): Offpeg fee multiplier (1e10 precision)
+    Returns:
+    int: Fee (1e10 precision)
+    """
+    if fee_multiplier <= FEE_DENOMINATOR:
+        return fee
+
+    xps2 = u((xpi + xpj) ** 2)
+    return u(fee_multiplier * fee) // (
+        u(u(u(u(fee_multiplier - FEE_DENOMINATOR) * 4) * xpi) * xpj) // xps2 + FEE_DENOMINATOR
+    )
+
+
+@dataclass(frozen=True)
+class StableswapState:
+    """
+    State of stableswap-ng pool as returned by its getters. D is computed once per state,
+    so quotes of one state share it.
+    """
+
+    rates: tuple[int, ...]  # stored_rates()
+    balances: tuple[int, ...]  # get_balances()
+    A: int  # A(), without A_PRECISION
+    fee: int  # fee()
+    offpeg_fee_multiplier: int  # offpeg_fee_multiplier()
+    total_supply: int = 0  # totalSupply(), only needed for withdrawals
+
+    @property
+    def n_coins(self) -> int:
+        return len(self.balances)
+
+    @cached_property
+    def amp(self) -> int:
+        return u(self.A * A_PRECISION)
+
+    @cached_property
+    def xp(self) -> list[int]:
+        return [u(rate * balance) // PRECISION for rate, balance in zip(self.rates, self.balances)]
+
+    @cached_property
+    def D(self) -> int:
+        return get_D(self.xp, self.amp)
+
+    def get_dy(self, i: int, j: int, dx: int) -> int:
+        """
+        Same as views.get_dy(i, j, dx, pool)
+        """
+        _check_index(i, self.n_coins)
+        _check_index(j, self.n_coins)
+        rates, xp = self.rates, self.xp
+
+        x = u(xp[i] + u(dx * rates[i]) // PRECISION)
+        y = get_y(i, j, x, xp, self.amp, self.D)
+        dy = u(u(xp[j] - y) - 1)
+
+        fee = dynamic_fee(u(xp[i] + x) // 2, u(xp[j] + y) // 2, self.fee, self.offpeg_fee_multiplier)
+        fee = u(fee * dy) // FEE_DENOMINATOR
+        return u(u(dy - fee) * PRECISION) // rates[j]
+
+    def get_dx(self, i: int, j: int, dy: int) -> int:
+        """
+        Same as views.get_dx(i, j, dy, pool)
+        """
+        _check_index(i, self.n_coins)
+        _check_index(j, self.n_coins)
+        rates, xp = self.rates, self.xp
+
+        dy_with_fee = u(u(dy * rates[j]) // PRECISION + 1)
+        fee = dynamic_fee(xp[i], xp[j], self.fee, self.offpeg_fee_multiplier)
+
+        y = u(xp[j] - u(dy_with_fee * FEE_DENOMINATOR) // u(FEE_DENOMINATOR - fee))
+        x = get_y(j, i, y, xp, self.amp, self.D)
+        return u(u(x - xp[i]) * PRECISION) // rates[i]
+
+    def dynamic_fee(self, i: int, j: int) -> int:
+        """
+        Same as views.dynamic_fee(i, j, pool)
+        """
+        _check_index(i, self.n_coins)
+        _check_index(j, self.n_coins)
+        return dynamic_fee(self.xp[i], self.xp[j], self.fee, self.offpeg_fee_multiplier)
+
+    def calc_withdraw_one_coin(self, burn_amount: int, i: int) -> int:
+        """
+        Same as views.calc_withdraw_one_coin(burn_amount, i, pool), needs total_supply
+        """
+        n_coins, amp, xp = self.n_coins, self.amp, self.xp
+        D0 = self.D
+        D1 = u(D0 - u(burn_amount * D0) // self.total_supply)
+        new_y = get_y_D(amp, i, xp, D1)
+        ys = u(D0 + D1) // (2 * n_coins)
+
+        base_fee = u(self.fee * n_coins) // (4 * (n_coins - 1))
+        xp_reduced = list(xp)
+        for k in range(n_coins):
+            if k == i:
+                dx_expected = u(u(xp[k] * D1) // D0 - new_y)
+                xavg = u(xp[k] + new_y) // 2
+            else:
+                dx_expected = u(xp[k] - u(xp[k] * D1) // D0)
+                xavg = xp[k]
+
+            fee = dynamic_fee(xavg, ys, base_fee, self.offpeg_fee_multiplier)
+            xp_reduced[k] = u(xp[k] - u(fee * dx_expected) // FEE_DENOMINATOR)
+
+        dy = u(xp_reduced[i] - get_y_D(amp, i, xp_reduced, D1))
+        return u(u(dy - 1) * PRECISION) // self.rates[i]
+
+
+def get_dy_batch(
+    quotes: Iterable[tuple[StableswapState, int, int, int]], allow_failure: bool = False
+) -> list[int | None]:
+    """
+    Evaluate many get_dy quotes, quotes of the same state object share its D
+
+    Args:
+    quotes (Iterable[tuple[StableswapState, int, int, int]]): (state, i, j, dx) of every quote
+    allow_failure (bool): Return None for quotes the contract would revert on instead of raising
+    Returns:
+    list[int | None]: dy of every quote
+    """
+    return call_many(((state.get_dy, (i, j, dx)) for state, i, j, dx in quotes), allow_failure)
+
+
+def get_dx_batch(
+    quotes: Iterable[tuple[StableswapState, int, int, int]], allow_failure: bool = False
+) -> list[int | None]:
+    """
+    Evaluate many get_dx quotes, quotes of the same state object share its D
+
+    Args:
+    quotes (Iterable[tuple[StableswapState, int, int, int]]): (state, i, j, dy) of every quote
+    allow_failure (bool): Return None for quotes the contract would revert on instead of raising
+    Returns:
+    list[int | None]: dx of every quote
+    """
+    return call_many(((state.get_dx, (i, j, dy)) for state, i, j, dy in quotes), allow_failure)
@@ -0,0 +1,527 @@
+from dataclasses import dataclass
+from functools import cached_property
+from math import isqrt
+from typing import Iterable
+
+from .evm import Revert, call_many
+from .evm import int256 as i256
+from .evm import sdiv
+from .evm import uint256 as u
+from .evm import unsafe_div as udiv
+from .evm import unsafe_sdiv as usdiv
+from .evm import wrap_int256 as wi
+from .evm import wrap_uint256 as w
+
+N_COINS = 3
+A_MULTIPLIER = 10000
+PRECISION = 10**18
+FEE_DENOMINATOR = 10**10
+
+MIN_GAMMA = 10**10
+MAX_GAMMA = 5 * 10**16
+MIN_A = N_COINS**N_COINS * A_MULTIPLIER // 100
+MAX_A = N_COINS**N_COINS * A_MULTIPLIER * 1000
+
+# Port of tricrypto-ng math_v_200.vy and views_v_200.vy. Checked operations of the contracts are checked here
+# (evm.uint256 and evm.int256), unsafe_* operations wrap (evm.wrap_uint256 and evm.wrap_int256), signed divisions
+# truncate towards zero. So results are equal to the contracts' bit for bit and inputs the contracts revert on raise
+# Revert (or ZeroDivisionError).
+
+
+def _sort(x: list[int]) -> list[int]:
+    # descending, as math._sort
+    return sorted(x, reverse=True)
+
+
+def _check_frac(x: int, D: int, message: str) -> None:
+    frac = u(x * 10**18) // D
+    if not 10**16 - 1 < frac < 10**20 + 1:
+        raise Revert(message)
+
+
+def cbrt(x: int) -> int:
+    """
+    Cube root of number in 1e18 precision, same as math.cbrt
+
+    Args:
+    x (int): Number in 1e18 precision
+    Returns:
+    int: Cube root in 1e18 precision
+    """
+    if x >= 115792089237316195423570985008687907853269 * 10**18:
+        xx = x
+    elif x >= 115792089237316195423570985008687907853269:
+        xx = w(x * 10**18)
+    else:
+        xx = w(x * 10**36)
+
+    # snekmate log_2 rounded down, 0 for 0
+    log2x = max(xx.bit_length() - 1, 0)
+    remainder = log2x % 3
+    a = udiv(w(w(2 ** (log2x // 3)) * 1260**remainder), 1000**remainder)
+
+    for _ in range(7):
+        a = w(w(2 * a) + udiv(xx, w(a * a))) // 3
+
+    if x >= 115792089237316195423570985008687907853269 * 10**18:
+        a = w(a * 10**12)
+    elif x >= 115792089237316195423570985008687907853269:
+        a = w(a * 10**6)
+    return a
+
+
+def geometric_mean(x: list[int]) -> int:
+    """
+    Geometric mean of 3 numbers in 1e18 precision, same as math.geometric_mean
+    """
+    prod = u(u(x[0] * x[1]) // 10**18 * x[2]) // 10**18
+    if prod == 0:
+        return 0
+    return cbrt(prod)
+
+
+def reduction_coefficient(x: list[int], fee_gamma: int) -> int:
+    """
+    fee_gamma / (fee_gamma + (1 - K)), same as math.reduction_coefficient
+
+    Args:
+    x (list[int]): Balances in common precision
+    fee_gamma (int): Fee gamma of the pool
+    Returns:
+    int: Reduction coefficient in 1e18 precision
+    """
+    S = u(u(x[0] + x[1]) + x[2])
+    K = u(10**18 * N_COINS * x[0]) // S
+    K = udiv(u(u(K * N_COINS) * x[1]), S)
+    K = udiv(u(u(K * N_COINS) * x[2]), S)
+    if fee_gamma > 0:
+        K = u(fee_gamma * 10**18) // u(u(fee_gamma + 10**18) - K)
+    return K
+
+
+def wad_exp(x: int) -> int:
+    """
+    e**x in 1e18 precision, same as math.wad_exp (snekmate)
+
+    Args:
+    x (int): Power in 1e18 precision (int256)
+    Returns:
+    int: Result in 1e18 precision
+    """
+    if x <= -42139678854452767551:
+        return 0
+    if x >= 135305999368893231589:
+        raise Revert("wad_exp overflow")
+
+    value = usdiv(wi(x << 78), 5**18)
+    k = wi(usdiv(wi(value << 96), 54916777467707473351141471128) + 2**95) >> 96
+    value = wi(value - wi(k * 54916777467707473351141471128))
+
+    y = wi((wi(wi(value + 1346386616545796478920950773328) * value) >> 96) + 57155421227552351082224309758442)
+    p = wi(wi(wi(y + value) - 94201549194550492254356042504812) * y) >> 96
+    p = wi(wi(wi(p + 28719021644029726153956944680412240) * value) + wi(4385272521454847904659076985693276 << 96))
+
+    q = wi((wi(wi(value - 2855989394907223263936484059900) * value) >> 96) + 50020603652535783019961831881945)
+    q = wi((wi(q * value) >> 96) - 533845033583426703283633433725380)
+    q = wi((wi(q * value) >> 96) + 3604857256930695427073651918091429)
+    q = wi((wi(q * value) >> 96) - 14423608567350463180887372962807573)
+    q = wi((wi(q * value) >> 96) + 26449188498355588339934803723976023)
+
+    r = usdiv(p, q)
+    return w(w(r) * 3822833074963236453042738258902158003155416615667) >> u(195 - k)
+
+
+def newton_D(ANN: int, gamma: int, x_unsorted: list[int], K0_prev: int = 0) -> int:
+    """
+    D invariant by newton's method, same as math.newton_D
+
+    Args:
+    ANN (int): A * N**N * A_MULTIPLIER, as A() of the pool
+    gamma (int): Gamma of the pool
+    x_unsorted (list[int]): Balances in common precision
+    K0_prev (int): Warm start, K0 returned by get_y for the trade leading to x (0 starts from geometric mean)
+    Returns:
+    int: D
+    """
+    x = _sort(x_unsorted)
+    if x[0] >= (2**256 - 1) // 10**18 * N_COINS**N_COINS:
+        raise Revert("out of limits")
+    if x[0] == 0:
+        raise Revert("empty pool")
+
+    S = w(w(x[0] + x[1]) + x[2])
+    if K0_prev == 0:
+        D = w(N_COINS * geometric_mean(x))
+    else:
+        if S > 10**36:
+            D = cbrt(u(u(udiv(u(u(x[0] * x[1]) // 10**36 * x[2]), K0_prev) * 27) * 10**12))
+        elif S > 10**24:
+            D = cbrt(u(u(udiv(u(u(x[0] * x[1]) // 10**24 * x[2]), K0_prev) * 27) * 10**6))
+        else:
+            D = cbrt(u(udiv(u(u(x[0] * x[1]) // 10**18 * x[2]), K0_prev) * 27))
+
+    for _ in range(255):
+        D_prev = D
+
+        K0 = udiv(w(w(udiv(w(w(udiv(w(w(10**18 * x[0]) * N_COINS), D) * x[1]) * N_COINS), D) * x[2]) * N_COINS), D)
+
+        _g1k0 = w(gamma + 10**18)
+        if _g1k0 > K0:
+            _g1k0 = w(w(_g1k0 - K0) + 1)
+        else:
+            _g1k0 = w(w(K0 - _g1k0) + 1)
+
+        mul1 = udiv(w(w(udiv(w(udiv(w(10**18 * D), gamma) * _g1k0), gamma) * _g1k0) * A_MULTIPLIER), ANN)
+        mul2 = udiv(w(2 * 10**18 * N_COINS * K0), _g1k0)
+        neg_fprime = w(w(w(S + udiv(w(S * mul2), 10**18)) + udiv(w(mul1 * N_COINS), K0)) - udiv(w(mul2 * D), 10**18))
+
+        D_plus = udiv(u(D * w(neg_fprime + S)), neg_fprime)
+        D_minus = udiv(u(D * D), neg_fprime)
+        if 10**18 > K0:
+            D_minus = u(D_minus + udiv(w(udiv(u(D * udiv(mul1, neg_fprime)), 10**18) * w(10**18 - K0)), K0))
+        else:
+            D_minus = u(D_minus - udiv(w(udiv(u(D * udiv(mul1, neg_fprime)), 10**18) * w(K0 - 10**18)), K0))
+
+        if D_plus > D_minus:
+            D = w(D_plus - D_minus)
+        else:
+            D = w(D_minus - D_plus) // 2
+
+        diff = abs(D - D_prev)
+        if w(diff * 10**14) < max(10**16, D):
+            for _x in x:
+                frac = udiv(w(_x * 10**18), D)
+                if not 10**16 - 1 <= frac < 10**20 + 1:
+                    raise Revert("Unsafe values x[i]")
+            return D
+    raise Revert("Did not converge")
+
+
+def _newton_y(ANN: int, gamma: int, x: list[int], D: int, i: int) -> int:
+    for k in range(N_COINS):
+        if k != i:
+            _check_frac(x[k], D, "Unsafe values x[i]")
+
+    y = D // N_COINS
+    K0_i = 10**18
+    S_i = 0
+
+    x_sorted = list(x)
+    x_sorted[i] = 0
+    x_sorted = _sort(x_sorted)
+    convergence_limit = max(x_sorted[0] // 10**14, D // 10**14, 100)
+
+    for j in range(2, N_COINS + 1):
+        _x = x_sorted[N_COINS - j]
+        y = u(y * D) // u(_x * N_COINS)
+        S_i = u(S_i + _x)
+    for j in range(N_COINS - 1):
+        K0_i = u(u(K0_i * x_sorted[j]) * N_COINS) // D
+
+    for _ in range(255):
+        y_prev = y
+
+        K0 = u(u(K0_i * y) * N_COINS) // D
+        S = u(S_i + y)
+
+        _g1k0 = u(gamma + 10**18)
+        if _g1k0 > K0:
+            _g1k0 = _g1k0 - K0 + 1
+        else:
+            _g1k0 = u(K0 - _g1k0 + 1)
+
+        mul1 = u(u(u(u(10**18 * D) // gamma * _g1k0) // gamma * _g1k0) * A_MULTIPLIER) // ANN
+        mul2 = u(10**18 + u(2 * 10**18 * K0) // _g1k0)
+
+        yfprime = u(u(u(10**18 * y) + u(S * mul2)) + mul1)
+        _dyfprime = u(D * mul2)
+        if yfprime < _dyfprime:
+            y = y_prev // 2
+            continue
+        yfprime -= _dyfprime
+
+        fprime = yfprime // y
+        y_minus = mul1 // fprime
+        y_plus = u(u(yfprime + u(10**18 * D)) // fprime + u(y_minus * 10**18) // K0)
+        y_minus = u(y_minus + u(10**18 * S) // fprime)
+
+        if y_plus < y_minus:
+            y = y_prev // 2
+        else:
+            y = y_plus - y_minus
+
+        if abs(y - y_prev) < max(convergence_limit, y // 10**14):
+            _check_frac(y, D, "Unsafe value for y")
+            return y
+    raise Revert("Did not converge")
+
+
+def get_y(ANN: int, gamma: int, x: list[int], D: int, i: int) -> tuple[int, int]:
+    """
+    Balance of coin i given other balances and D by the analytic cubic solution, same as math.get_y
+
+    Args:
+    ANN (int): A * N**N * A_MULTIPLIER, as A() of the pool
+    gamma (int): Gamma of the pool
+    x (list[int]): Balances in common precision
+    D (int): Invariant
+    i (int): Index of coin to find balance of
+    Returns:
+    tuple[int, int]: Balance of coin i in common precision and K0 (0 if newton's method was used), warm start for
+    newton_D of the balances after the trade
+    """
+    if not MIN_A <= ANN <= MAX_A:
+        raise Revert("unsafe values A")
+    if not MIN_GAMMA <= gamma <= MAX_GAMMA:
+        raise Revert("unsafe values gamma")
+    if not 10**17 <= D <= 10**15 * 10**18:
+        raise Revert("unsafe values D")
+    for k in range(N_COINS):
+        if k != i:
+            _check_frac(x[k], D, "Unsafe values x[i]")
+
+    j, k = {0: (1, 2), 1: (0, 2), 2: (0, 1)}.get(i, (0, 0))
+    _ANN, _gamma, _D = ANN, gamma, D
+    ANN, gamma, D, x_j, x_k = i256(ANN), i256(gamma), i256(D), i256(x[j]), i256(x[k])
+    gamma2 = wi(gamma * gamma)
+
+    a = 10**36 // 27
+    b = i256(
+        wi(10**36 // 9 + usdiv(wi(2 * 10**18 * gamma), 27))
+        - usdiv(usdiv(usdiv(i256(wi(usdiv(wi(D * D), x_j) * gamma2) * ANN), 27**2), A_MULTIPLIER), x_k)
+    )
+    c = i256(
+        wi(10**36 // 9 + usdiv(wi(gamma * wi(gamma + 4 * 10**18)), 27))
+        + usdiv(usdiv(wi(usdiv(i256(gamma2 * wi(wi(x_j + x_k) - D)), D) * ANN), 27), A_MULTIPLIER)
+    )
+    d = usdiv(i256(wi(10**18 + gamma) ** 2), 27)
+    d0 = i256(abs(i256(sdiv(i256(wi(3 * a) * c), b) - b)))
+
+    for threshold, divider in (
+        (10**48, 10**30),
+        (10**44, 10**26),
+        (10**40, 10**22),
+        (10**36, 10**18),
+        (10**32, 10**14),
+        (10**28, 10**10),
+        (10**24, 10**6),
+        (10**20, 10**2),
+        (-1, 1),
+    ):
+        if d0 > threshold:
+            break
+
+    if abs(a) > abs(b):
+        additional_prec = i256(abs(usdiv(a, b)))
+        a = usdiv(wi(a * additional_prec), divider)
+        b = usdiv(i256(b * additional_prec), divider)
+        c = usdiv(i256(c * additional_prec), divider)
+        d = usdiv(i256(d * additional_prec), divider)
+    else:
+        additional_prec = i256(abs(usdiv(b, a)))
+        a = usdiv(i256(sdiv(a, additional_prec)), divider)
+        b = usdiv(usdiv(b, additional_prec), divider)
+        c = usdiv(usdiv(c, additional_prec), divider)
+        d = usdiv(usdiv(d, additional_prec), divider)
+
+    _3ac = i256(wi(3 * a) * c)
+    delta0 = i256(usdiv(_3ac, b) - b)
+    delta1 = i256(i256(usdiv(i256(3 * _3ac), b) - wi(2 * b)) - usdiv(i256(usdiv(i256(27 * i256(a**2)), b) * d), b))
+    sqrt_arg = i256(i256(delta1**2) + i256(usdiv(i256(4 * i256(delta0**2)), b) * delta0))
+
+    if sqrt_arg <= 0:
+        return _newton_y(_ANN, _gamma, x, _D, i), 0
+    sqrt_val = isqrt(sqrt_arg)
+
+    b_cbrt = cbrt(b) if b >= 0 else -cbrt(i256(-b))
+    if delta1 > 0:
+        second_cbrt = cbrt(u(i256(delta1 + sqrt_val)) // 2)
+    else:
+        second_cbrt = -cbrt(u(i256(-i256(delta1 - sqrt_val))) // 2)
+
+    C1 = usdiv(i256(usdiv(i256(b_cbrt * b_cbrt), 10**18) * second_cbrt), 10**18)
+    root_K0 = usdiv(i256(i256(b + i256(sdiv(i256(b * delta0), C1))) - C1), 3)
+    root = usdiv(i256(usdiv(i256(usdiv(usdiv(i256(D * D), 27), x_k) * D), x_j) * root_K0), a)
+
+    out = u(root), u(usdiv(i256(10**18 * root_K0), a))
+    frac = u(out[0] * 10**18) // _D
+    if not 10**16 - 1 <= frac < 10**20 + 1:
+        raise Revert("Unsafe value for y")
+    return out
+
+
+def get_p(xp: list[int], D: int, A_gamma: list[int]) -> list[int]:
+    """
+    dx/dy prices of coins 1 and 2 in coin 0 (to be multiplied by price_scale), same as math.get_p
+
+    Args:
+    xp (list[int]): Balances in common precision
+    D (int): Invariant
+    A_gamma (list[int]): A and gamma of the pool
+    Returns:
+    list[int]: Prices in 1e18 precision
+    """
+    if not 10**17 <= D <= 10**15 * 10**18:
+        raise Revert("unsafe D values")
+
+    K0 = udiv(u(udiv(u(udiv(u(u(27 * xp[0]) * xp[1]), D) * xp[2]), D) * 10**36), D)
+    GK0 = u(
+        u(udiv(u(udiv(u(u(2 * K0) * K0), 10**36) * K0), 10**36) + w(w(A_gamma[1] + 10**18) ** 2))
+        - udiv(u(udiv(w(K0**2), 10**36) * w(w(2 * A_gamma[1]) + 3 * 10**18)), 10**18)
+    )
+    NNAG2 = udiv(w(A_gamma[0] * w(A_gamma[1] ** 2)), A_MULTIPLIER)
+    denominator = u(GK0 + udiv(u(udiv(u(NNAG2 * xp[0]), D) * K0), 10**36))
+    return [
+        udiv(u(u(xp[0] * u(GK0 + udiv(u(udiv(u(NNAG2 * xp[k]), D) * K0), 10**36))) // xp[k] * 10**18), denominator)
+        for k in (1, 2)
+    ]
+
+
+def _check_indices(i: int, j: int) -> None:
+    if i == j or not 0 <= i < N_COINS or not 0 <= j < N_COINS:
+        raise Revert("coin index out of range")
+
+
+@dataclass(frozen=True)
+class TricryptoState:
+    """
+    State of tricrypto-ng pool as returned by its getters. D is taken from the pool (computed once per state while
+    A and gamma are ramping), so quotes of one state share it.
+    """
+
+    balances: tuple[int, int, int]  # balances(k)
+    precisions: tuple[int, int, int]  # precisions()
+    price_scale: tuple[int, int]  # price_scale(k)
+    A: int  # A(), A * N**N * A_MULTIPLIER
+    gamma: int  # gamma()
+    D: int  # D()
+    mid_fee: int  # mid_fee()
+    out_fee: int  # out_fee()
+    fee_gamma: int  # fee_gamma()
+    total_supply: int = 0  # totalSupply(), only needed for withdrawals
+    ramping: bool = False  # future_A_gamma_time() > block.timestamp
+
+    def _xp(self, balances: list[int]) -> list[int]:
+        xp = [u(balances[0] * self.precisions[0])]
+        for k in range(N_COINS - 1):
+            xp.append(u(u(balances[k + 1] * self.price_scale[k]) * self.precisions[k + 1]) // PRECISION)
+        return xp
+
+    @cached_property
+    def D_current(self) -> int:
+        # views._calc_D_ramp
+        if self.ramping:
+            return newton_D(self.A, self.gamma, self._xp(self.balances), 0)
+        return self.D
+
+    def fee_calc(self, xp: list[int]) -> int:
+        """
+        Same as pool.fee_calc(xp)
+        """
+        f = reduction_coefficient(xp, self.fee_gamma)
+        return u(u(self.mid_fee * f) + u(self.out_fee * u(10**18 - f))) // 10**18
+
+    def _get_dy_nofee(self, i: int, j: int, dx: int) -> tuple[int, list[int], int]:
+        _check_indices(i, j)
+        if dx == 0:
+            raise Revert("do not exchange 0 coins")
+
+        balances = list(self.balances)
+        balances[i] = u(balances[i] + dx)
+        xp = self._xp(balances)
+
+        y, K0 = get_y(self.A, self.gamma, xp, self.D_current, j)
+        dy = u(u(xp[j] - y) - 1)
+        xp[j] = y
+        if j > 0:
+            dy = u(dy * PRECISION) // self.price_scale[j - 1]
+        return dy // self.precisions[j], xp, K0
+
+    def get_dy(self, i: int, j: int, dx: int) -> int:
+        """
+        Same as views.get_dy(i, j, dx, pool)
+        """
+        dy, xp, _ = self._get_dy_nofee(i, j, dx)
+        return u(dy - u(self.fee_calc(xp) * dy) // FEE_DENOMINATOR)
+
+    def get_dy_and_D(self, i: int, j: int, dx: int) -> tuple[int, int]:
+        """
+        dy of pool.exchange(i, j, dx) and D of the pool after the trade before price_scale adjustment. As in
+        pool.tweak_price, newton_D is warm started with K0 returned by get_y, so it needs fewer iterations than
+        D of a new state.
+
+        Returns:
+        tuple[int, int]: dy and D_unadjusted
+        """
+        dy, xp, K0 = self._get_dy_nofee(i, j, dx)
+        dy = u(dy - u(self.fee_calc(xp) * dy) // FEE_DENOMINATOR)
+
+        balances = list(self.balances)
+        balances[i] = u(balances[i] + dx)
+        balances[j] = u(balances[j] - dy)
+        return dy, newton_D(self.A, self.gamma, self._xp(balances), K0)
+
+    def get_dx(self, i: int, j: int, dy: int) -> int:
+        """
+        Same as views.get_dx(i, j, dy, pool)
+        """
+        _check_indices(i, j)
+        if dy == 0:
+            raise Revert("do not exchange out 0 coins")
+
+        _dy = dy
+        for _ in range(5):
+            balances = list(self.balances)
+            balances[j] = u(balances[j] - _dy)
+            xp = self._xp(balances)
+
+            x = get_y(self.A, self.gamma, xp, self.D_current, i)[0]
+            dx = u(x - xp[i])
+            xp[i] = x
+            if i > 0:
+                dx = u(dx * PRECISION) // self.price_scale[i - 1]
+            dx //= self.precisions[i]
+
+            _dy = u(u(dy + u(self.fee_calc(xp) * _dy) // FEE_DENOMINATOR) + 1)
+        return dx
+
+    def calc_withdraw_one_coin(self, token_amount: int, i: int) -> int:
+        """
+        Same as views.calc_withdraw_one_coin(token_amount, i, pool), needs total_supply
+        """
+        if token_amount > self.total_supply:
+            raise Revert("token amount more than supply")
+        if not 0 <= i < N_COINS:
+            raise Revert("coin out of range")
+
+        xp = list(self.precisions)
+        price_scale_i = PRECISION * self.precisions[0]
+        xp[0] = u(xp[0] * self.balances[0])
+        for k in range(1, N_COINS):
+            p = self.price_scale[k - 1]
+            if i == k:
+                price_scale_i = u(p * xp[i])
+            xp[k] = u(u(xp[k] * self.balances[k]) * p) // PRECISION
+
+        D = self.D_current
+        dD = u(token_amount * D) // self.total_supply
+        D_fee = u(self.fee_calc(xp) * dD) // (2 * 10**10) + 1
+        D = u(D - u(dD - D_fee))
+
+        y = get_y(self.A, self.gamma, xp, D, i)[0]
+        return u(u(xp[i] - y) * PRECISION) // price_scale_i
+
+
+def get_dy_batch(
+    quotes: Iterable[tuple[TricryptoState, int, int, int]], allow_failure: bool = False
+) -> list[int | None]:
+    """
+    Evaluate many get_dy quotes, quotes of the same state object share its D
+
+    Args:
+    quotes (Iterable[tuple[TricryptoState, int, int, int]]): (state, i, j, dx) of every quote
+    allow_failure (bool): Return None for quotes the contract would revert on instead of raising
+    Returns:
+    list[int | None]: dy of every quote
+    """
+    return call_many(((state.get_dy, (i, j, dx)) for state, i, j, dx in quotes), allow_failure)
@@ -0,0 +1,907 @@
+import copy
+from dataclasses import dataclass, field
+from functools import wraps
+from math import isqrt
+from typing import Iterable
+
+from .evm import Revert, call_many
+from .evm import int256 as i256
+from .evm import sdiv
+from .evm import uint256 as u
+from .evm import unsafe_div as udiv
+from .evm import unsafe_sdiv as usdiv
+from .evm import wrap_int256 as wi
+from .evm import wrap_uint256 as w
+from .tricrypto import cbrt
+from .tricrypto import wad_exp as _wad_exp
+
+N_COINS = 2
+A_MULTIPLIER = 10000
+PRECISION = 10**18
+FEE_PRECISION = 10**10
+
+MIN_GAMMA = 10**10
+MAX_GAMMA_SMALL = 2 * 10**16
+MAX_GAMMA = 199 * 10**15
+MIN_A = N_COINS**N_COINS * A_MULTIPLIER // 10
+MAX_A = N_COINS**N_COINS * A_MULTIPLIER * 1000
+
+MIN_FEE = FEE_PRECISION // 10 // 10_000
+MAX_FEE = FEE_PRECISION
+NOISE_FEE = FEE_PRECISION // 10 // 10_000
+MINIMUM_LIQUIDITY = 10**4
+
+# (threshold, divider) of get_y, a, b, c and d are scaled down to keep the cubic solution in int256
+_DIVIDERS = tuple((10**e, 10 ** (e - 18)) for e in range(48, 23, -2)) + ((10**20, 10**2),)
+
+# Port of twocrypto-ng math_v_210.vy and of pool logic of implementation_v_300.vy (and its views). Same conventions
+# as tricrypto.py: checked operations are checked, unsafe_* operations wrap, signed divisions truncate towards zero.
+
+
+def _check_A_gamma(ANN: int, gamma: int) -> None:
+    if not MIN_A <= ANN <= MAX_A:
+        raise Revert("unsafe values A")
+    if not MIN_GAMMA <= gamma <= MAX_GAMMA:
+        raise Revert("unsafe values gamma")
+
+
+def _check_D(D: int) -> None:
+    if not 10**17 <= D <= 10**15 * 10**18:
+        raise Revert("unsafe values D")
+
+
+def _get_lim_mul(gamma: int) -> int:
+    lim_mul = 100 * 10**18
+    if gamma > MAX_GAMMA_SMALL:
+        lim_mul = udiv(w(lim_mul * MAX_GAMMA_SMALL), gamma)
+    return lim_mul
+
+
+def wad_exp(x: int) -> int:
+    """
+    e**x in 1e18 precision, same as math.wad_exp (int256 result)
+    """
+    return i256(_wad_exp(x))
+
+
+def _newton_y(ANN: int, gamma: int, x: list[int], D: int, i: int, lim_mul: int) -> int:
+    x_j = x[1 - i]
+    y = u(D**2) // u(x_j * N_COINS**2)
+    K0_i = u(10**18 * N_COINS * x_j) // D
+    if not udiv(10**36, lim_mul) <= K0_i <= lim_mul:
+        raise Revert("unsafe values x[i]")
+
+    convergence_limit = max(x_j // 10**14, D // 10**14, 100)
+    for _ in range(255):
+        y_prev = y
+
+        K0 = u(u(K0_i * y) * N_COINS) // D
+        S = u(x_j + y)
+
+        _g1k0 = u(gamma + 10**18)
+        if _g1k0 > K0:
+            _g1k0 = _g1k0 - K0 + 1
+        else:
+            _g1k0 = u(K0 - _g1k0 + 1)
+
+        mul1 = u(u(u(u(10**18 * D) // gamma * _g1k0) // gamma * _g1k0) * A_MULTIPLIER) // ANN
+        mul2 = u(10**18 + u(2 * 10**18 * K0) // _g1k0)
+
+        yfprime = u(u(u(10**18 * y) + u(S * mul2)) + mul1)
+        _dyfprime = u(D * mul2)
+        if yfprime < _dyfprime:
+            y = y_prev // 2
+            continue
+        yfprime -= _dyfprime
+
+        fprime = yfprime // y
+        y_minus = mul1 // fprime
+        y_plus = u(u(yfprime + u(10**18 * D)) // fprime + u(y_minus * 10**18) // K0)
+        y_minus = u(y_minus + u(10**18 * S) // fprime)
+
+        if y_plus < y_minus:
+            y = y_prev // 2
+        else:
+            y = y_plus - y_minus
+
+        if abs(y - y_prev) < max(convergence_limit, y // 10**14):
+            return y
+    raise Revert("Did not converge")
+
+
+def newton_y(ANN: int, gamma: int, x: list[int], D: int, i: int) -> int:
+    """
+    Balance of coin i given the other balance and D by newton's method, same as math.newton_y
+    """
+    _check_A_gamma(ANN, gamma)
+    _check_D(D)
+    lim_mul = _get_lim_mul(gamma)
+
+    y = _newton_y(ANN, gamma, x, D, i, lim_mul)
+    frac = u(y * 10**18) // D
+    if not udiv(10**36 // N_COINS, lim_mul) <= frac <= udiv(lim_mul, N_COINS):
+        raise Revert("unsafe value for y")
+    return y
+
+
+def get_y(ANN: int, gamma: int, x: list[int], D: int, i: int) -> tuple[int, int]:
+    """
+    Balance of coin i given the other balance and D by the analytic cubic solution, same as math.get_y
+
+    Args:
+    ANN (int): A * N**N * A_MULTIPLIER, as A() of the pool
+    gamma (int): Gamma of the pool
+    x (list[int]): Balances in common precision
+    D (int): Invariant
+    i (int): Index of coin to find balance of
+    Returns:
+    tuple[int, int]: Balance of coin i in common precision and K0 (0 if newton's method was used), warm start for
+    newton_D of the balances after the trade
+    """
+    _check_A_gamma(ANN, gamma)
+    _check_D(D)
+    if i not in (0, 1):
+        raise Revert("uint256 underflow")
+    lim_mul = _get_lim_mul(gamma)
+    lim_mul_signed = i256(lim_mul)
+
+    _ANN, _gamma, _D = ANN, gamma, D
+    ANN, gamma, D, x_j = i256(ANN), i256(gamma), i256(D), i256(x[1 - i])
+    gamma2 = wi(gamma * gamma)
+
+    # y is not used, but the contract reverts if it can't be computed
+    i256(sdiv(i256(D**2), i256(x_j * N_COINS**2)))
+
+    K0_i = usdiv(i256(10**18 * N_COINS * x_j), D)
+    if not usdiv(10**36, lim_mul_signed) <= K0_i <= lim_mul_signed:
+        raise Revert("unsafe values x[i]")
+
+    ann_gamma2 = i256(ANN * gamma2)
+    a = 10**32
+    b = i256(sdiv(i256(sdiv(i256(D * ann_gamma2), 400000000)), x_j))
+    b = i256(i256(b - 3 * 10**32) - wi(wi(2 * gamma) * 10**14))
+
+    c = i256(3 * 10**32 + wi(wi(4 * gamma) * 10**14))
+    c = i256(c + usdiv(gamma2, 10**4))
+    c = i256(c + usdiv(i256(usdiv(wi(4 * ann_gamma2), 400000000) * x_j), D))
+    c = i256(c - usdiv(wi(4 * ann_gamma2), 400000000))
+
+    d = i256(-usdiv(i256(wi(10**18 + gamma) ** 2), 10**4))
+
+    delta0 = i256(i256(sdiv(i256(i256(3 * a) * c), b)) - b)
+    delta1 = i256(i256(3 * delta0) + b)
+    delta1 = i256(delta1 - i256(sdiv(i256(i256(sdiv(i256(27 * i256(a**2)), b)) * d), b)))
+
+    divider = 1
+    threshold = min(i256(abs(delta0)), i256(abs(delta1)), a)
+    for limit, _divider in _DIVIDERS:
+        if threshold > limit:
+            divider = _divider
+            break
+
+    a = usdiv(a, divider)
+    b = usdiv(b, divider)
+    c = usdiv(c, divider)
+    d = usdiv(d, divider)
+
+    delta0 = i256(usdiv(wi(wi(3 * a) * c), b) - b)
+    delta1 = i256(i256(3 * delta0) + b)
+    delta1 = i256(delta1 - usdiv(wi(usdiv(wi(27 * i256(a**2)), b) * d), b))
+    sqrt_arg = i256(i256(delta1**2) + wi(usdiv(i256(4 * i256(delta0**2)), b) * delta0))
+
+    if sqrt_arg <= 0:
+        return _newton_y(_ANN, _gamma, x, _D, i, lim_mul), 0
+    sqrt_val = isqrt(sqrt_arg)
+
+    b_cbrt = cbrt(b) if b > 0 else -cbrt(i256(-b))
+    if delta1 > 0:
+        second_cbrt = cbrt(u(wi(delta1 + sqrt_val)) // 2)
+    else:
+        second_cbrt = -cbrt(u(wi(sqrt_val - delta1)) // 2)
+
+    C1 = usdiv(wi(usdiv(i256(b_cbrt**2), 10**18) * second_cbrt), 10**18)
+    root = i256(wi(10**18 * C1) - wi(10**18 * b))
+    root = i256(root - i256(i256(sdiv(wi(10**18 * b), C1)) * delta0))
+    root = i256(sdiv(root, wi(3 * a)))
+
+    out = u(usdiv(usdiv(wi(usdiv(i256(D**2), x_j) * root), 4), 10**18)), u(root)
+    frac = udiv(u(out[0] * 10**18), _D)
+    if not udiv(10**36 // N_COINS, lim_mul) <= frac <= udiv(lim_mul, N_COINS):
+        raise Revert("unsafe value for y")
+    return out
+
+
+def newton_D(ANN: int, gamma: int, x_unsorted: list[int], K0_prev: int = 0) -> int:
+    """
+    D invariant by newton's method, same as math.newton_D
+
+    Args:
+    ANN (int): A * N**N * A_MULTIPLIER, as A() of the pool
+    gamma (int): Gamma of the pool
+    x_unsorted (list[int]): Balances in common precision
+    K0_prev (int): Warm start, K0 returned by get_y for the trade leading to x (0 starts from geometric mean)
+    Returns:
+    int: D
+    """
+    _check_A_gamma(ANN, gamma)
+
+    x = sorted(x_unsorted, reverse=True)
+    if not 10**9 <= x[0] <= 10**15 * 10**18:
+        raise Revert("unsafe values x[0]")
+    if udiv(u(x[1] * 10**18), x[0]) < 10**14:
+        raise Revert("unsafe values x[i] (input)")
+
+    S = w(x[0] + x[1])
+    if K0_prev == 0:
+        D = u(N_COINS * isqrt(w(x[0] * x[1])))
+    else:
+        D = isqrt(w(udiv(w(w(4 * x[0]) * x[1]), K0_prev) * 10**18))
+        if S < D:
+            D = S
+
+    __g1k0 = u(gamma + 10**18)
+    for _ in range(255):
+        D_prev = D
+        if D == 0:
+            raise Revert("D is zero")
+
+        K0 = udiv(u(udiv(u(10**18 * N_COINS**2 * x[0]), D) * x[1]), D)
+
+        _g1k0 = __g1k0
+        if _g1k0 > K0:
+            _g1k0 = w(w(_g1k0 - K0) + 1)
+        else:
+            _g1k0 = w(w(K0 - _g1k0) + 1)
+
+        mul1 = udiv(u(u(udiv(u(udiv(u(10**18 * D), gamma) * _g1k0), gamma) * _g1k0) * A_MULTIPLIER), ANN)
+        mul2 = udiv(u(2 * 10**18 * N_COINS * K0), _g1k0)
+        neg_fprime = u(u(u(S + udiv(u(S * mul2), 10**18)) + u(mul1 * N_COINS) // K0) - udiv(u(mul2 * D), 10**18))
+
+        D_plus = u(D * u(neg_fprime + S)) // neg_fprime
+        D_minus = udiv(u(D * D), neg_fprime)
+        if 10**18 > K0:
+            D_minus = u(D_minus + udiv(u(udiv(u(D * udiv(mul1, neg_fprime)), 10**18) * w(10**18 - K0)), K0))
+        else:
+            D_minus = u(D_minus - udiv(u(udiv(u(D * udiv(mul1, neg_fprime)), 10**18) * w(K0 - 10**18)), K0))
+
+        if D_plus > D_minus:
+            D = w(D_plus - D_minus)
+        else:
+            D = w(D_minus - D_plus) // 2
+
+        if u(abs(D - D_prev) * 10**14) < max(10**16, D):
+            for _x in x:
+                frac = u(_x * 10**18) // D
+                if not 10**16 // N_COINS - 1 < frac < 10**20 // N_COINS + 1:
+                    raise Revert("unsafe values x[i]")
+            return D
+    raise Revert("Did not converge")
+
+
+def get_p(xp: list[int], D: int, A_gamma: list[int]) -> int:
+    """
+    dx/dy price of coin 1 in coin 0 (to be multiplied by price_scale), same as math.get_p
+    """
+    if not 10**17 <= D <= 10**15 * 10**18:
+        raise Revert("unsafe D values")
+
+    K0 = udiv(u(udiv(u(u(4 * xp[0]) * xp[1]), D) * 10**36), D)
+    GK0 = u(
+        u(udiv(u(udiv(u(u(2 * K0) * K0), 10**36) * K0), 10**36) + w(w(A_gamma[1] + 10**18) ** 2))
+        - udiv(u(udiv(w(K0**2), 10**36) * w(w(2 * A_gamma[1]) + 3 * 10**18)), 10**18)
+    )
+    NNAG2 = udiv(w(A_gamma[0] * w(A_gamma[1] ** 2)), A_MULTIPLIER)
+    denominator = u(GK0 + udiv(u(udiv(u(NNAG2 * xp[0]), D) * K0), 10**36))
+    return udiv(u(u(xp[0] * u(GK0 + udiv(u(udiv(u(NNAG2 * xp[1]), D) * K0), 10**36))) // xp[1] * 10**18), denominator)
+
+
+def _xcp(D: int, price_scale: int) -> int:
+    return u(D * PRECISION) // N_COINS // isqrt(u(PRECISION * price_scale))
+
+
+def _check_index(i: int) -> None:
+    # j = 1 - i underflows in the pool for any other index
+    if i not in (0, 1):
+        raise Revert("uint256 underflow")
+
+
+def _atomic(method):
+    # state changes of an operation that reverts are rolled back, as on chain
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        snapshot = copy.deepcopy(self.__dict__)
+        try:
+            return method(self, *args, **kwargs)
+        except BaseException:
+            self.__dict__.update(snapshot)
+            raise
+
+    return wrapper
+
+
+@dataclass
+class TwocryptoState:
+    """
+    Storage of twocrypto-ng (implementation_v_300) pool. Unlike other states it is mutable: exchange, add_liquidity
+    and remove_liquidity_* apply the operation at given block timestamp the way the pool does (price oracle, price_scale
+    rebalancing, profits, admin fees and donations included), so the state can be evolved over long sequences of
+    operations. Pools with a POLICY contract set are not supported. Admin fees are accumulated in admin_balances,
+    claiming them does not change pool math.
+    """
+
+    balances: list[int]  # balances(k)
+    precisions: tuple[int, int]  # precisions()
+    A: int  # future A (A() when not ramping)
+    gamma: int  # future gamma (gamma() when not ramping)
+    D: int  # D()
+    price_scale: int  # price_scale()
+    price_oracle: int  # cached_price_oracle, equal to price_oracle() in block of last_timestamp
+    last_prices: int  # last_prices()
+    last_timestamp: int  # last_timestamp()
+    mid_fee: int  # mid_fee()
+    out_fee: int  # out_fee()
+    fee_gamma: int  # fee_gamma()
+    adjustment_step_min: int  # adjustment_step()[0]
+    adjustment_step_max: int  # adjustment_step()[1]
+    ma_time: int  # packed_rebalancing_params() & (2**64 - 1), ma_time() getter is rescaled
+    total_supply: int  # totalSupply()
+    virtual_price: int  # virtual_price()
+    xcp_profit: int  # xcp_profit()
+    lp_xcp_profit: int  # lp_xcp_profit()
+    reserved_profit_fraction: int = FEE_PRECISION * 50 // 100  # reserved_profit_fraction()
+    admin_fee: int = FEE_PRECISION * 50 // 100  # admin_fee()
+    admin_balances: list[int] = field(default_factory=lambda: [0, 0])  # admin_balances(k)
+    donation_shares: int = 0  # donation_shares()
+    donation_shares_max_ratio: int = 10 * PRECISION // 100  # donation_shares_max_ratio()
+    donation_duration: int = 7 * 86400  # donation_duration()
+    last_donation_release_ts: int = 0  # last_donation_release_ts()
+    donation_protection_expiry_ts: int = 0  # donation_protection_expiry_ts()
+    donation_protection_period: int = 600  # donation_protection_period()
+    donation_protection_lp_threshold: int = 20 * PRECISION // 100  # donation_protection_lp_threshold()
+    donation_protection_extension_remainder: int = 0  # storage only
+    initial_A: int = 0  # initial_A_gamma() >> 128
+    initial_gamma: int = 0  # initial_A_gamma() & (2**128 - 1)
+    initial_A_gamma_time: int = 0  # initial_A_gamma_time()
+    future_A_gamma_time: int = 0  # future_A_gamma_time()
+
+    # ------------------------------------------------------------- internals
+
+    def _A_gamma(self, timestamp: int) -> list[int]:
+        A1, gamma1 = self.A, self.gamma
+        t1 = self.future_A_gamma_time
+        if timestamp < t1:
+            t0 = self.initial_A_gamma_time
+            t1 = u(t1 - t0)
+            t0 = u(timestamp - t0)
+            t2 = u(t1 - t0)
+            A1 = u(u(self.initial_A * t2) + u(A1 * t0)) // t1
+            gamma1 = u(u(self.initial_gamma * t2) + u(gamma1 * t0)) // t1
+        return [A1, gamma1]
+
+    def _is_ramping(self) -> bool:
+        return self.future_A_gamma_time > self.last_timestamp
+
+    def _xp(self, balances: list[int], price_scale: int) -> list[int]:
+        return [
+            u(balances[0] * self.precisions[0]),
+            udiv(u(u(balances[1] * self.precisions[1]) * price_scale), PRECISION),
+        ]
+
+    def _get_D(self, A_gamma: list[int], xp: list[int]) -> int:
+        if self._is_ramping():
+            return newton_D(A_gamma[0], A_gamma[1], xp, 0)
+        return self.D
+
+    def fee_calc(self, xp: list[int]) -> int:
+        """
+        Same as pool.fee_calc(xp)
+        """
+        B = u(xp[0] + xp[1])
+        B = u(u(PRECISION * N_COINS**N_COINS * xp[0]) // B * xp[1]) // B
+        B = u(self.fee_gamma * B) // u(u(udiv(u(self.fee_gamma * B), 10**18) + 10**18) - B)
+        fee = udiv(u(u(self.mid_fee * B) + u(self.out_fee * u(10**18 - B))), 10**18)
+        return min(MAX_FEE, max(MIN_FEE, fee))
+
+    def _protection_factor(self, timestamp: int) -> int:
+        expiry = self.donation_protection_expiry_ts
+        if expiry > timestamp:
+            return min(udiv(u(w(expiry - timestamp) * PRECISION), self.donation_protection_period), PRECISION)
+        return 0
+
+    def _donation_shares(self, timestamp: int, donation_protection: bool = True) -> int:
+        donation_shares = self.donation_shares
+        if donation_shares == 0:
+            return 0
+
+        elapsed = u(timestamp - self.last_donation_release_ts)
+        unlocked_shares = min(donation_shares, udiv(u(donation_shares * elapsed), self.donation_duration))
+        if not donation_protection:
+            return unlocked_shares
+        return udiv(u(unlocked_shares * (PRECISION - self._protection_factor(timestamp))), PRECISION)
+
+    def _calc_token_fee(
+        self,
+        amounts: list[int],
+        xp: list[int],
+        timestamp: int,
+        donation: bool = False,
+        deposit: bool = False,
+        from_view: bool = False,
+    ) -> int:
+        if donation:
+            return NOISE_FEE
+
+        surplus_amounts = [0, 0] if from_view and deposit else amounts
+        balances_ratio = u(u(u(self.balances[0] - surplus_amounts[0]) * self.precisions[0]) * PRECISION) // u(
+            u(self.balances[1] - surplus_amounts[1]) * self.precisions[1]
+        )
+        amounts = self._xp(amounts, balances_ratio)
+
+        fee = w(self.fee_calc(xp) * N_COINS) // (4 * (N_COINS - 1))
+        S = u(amounts[0] + amounts[1])
+        avg = S // N_COINS
+        Sdiff = u(abs(amounts[0] - avg) + abs(amounts[1] - avg))
+
+        lp_spam_penalty_fee = 0
+        if deposit and self.donation_protection_expiry_ts > timestamp:
+            lp_spam_penalty_fee = min(
+                fee,
+                udiv(
+                    u(u(self._protection_factor(timestamp) * fee) * self.donation_shares) // self.total_supply,
+                    self.donation_shares_max_ratio,
+                ),
+            )
+        return u(u(u(fee * Sdiff) // S + NOISE_FEE) + lp_spam_penalty_fee)
+
+    def _calc_withdraw_fixed_out(
+        self, A_gamma: list[int], lp_token_amount: int, i: int, amount_i: int, timestamp: int
+    ) -> tuple[int, int, list[int], int]:
+        token_supply = self.total_supply
+        if lp_token_amount > token_supply:
+            raise Revert("!amount")
+        _check_index(i)
+        j = 1 - i
+
+        price_scale = self.price_scale
+        xp = self._xp(self.balances, price_scale)
+        D = self._get_D(A_gamma, xp)
+
+        dD = udiv(u(lp_token_amount * D), token_supply)
+        xp_new = list(xp)
+        price_scales = [PRECISION * self.precisions[0], u(price_scale * self.precisions[1])]
+
+        amountsp = [0, 0]
+        amountsp[i] = udiv(u(u(amount_i * price_scales[i]) + PRECISION - 1), PRECISION)
+        xp_new[i] = u(xp_new[i] - amountsp[i])
+
+        y = u(get_y(A_gamma[0], A_gamma[1], xp_new, u(D - dD), j)[0] + 1)
+        amountsp[j] = u(xp[j] - y)
+        xp_new[j] = y
+
+        amounts = [0, 0]
+        amounts[i] = amount_i
+        if i == 0:
+            amounts[1] = u(amountsp[1] * PRECISION) // self.precisions[1] // price_scale
+        else:
+            amounts[0] = amountsp[0] // self.precisions[0]
+        if u(amounts[0] + amounts[1]) == 0:
+            raise Revert("!tokens")
+
+        approx_fee = self._calc_token_fee(amounts, xp_new, timestamp)
+        dD = u(dD - u(u(dD * approx_fee) // FEE_PRECISION + 1))
+
+        y = u(get_y(A_gamma[0], A_gamma[1], xp_new, u(D - dD), j)[0] + 1)
+        dy = u(u(xp[j] - y) * PRECISION) // price_scales[j]
+        xp_new[j] = y
+        return dy, u(D - dD), xp_new, approx_fee
+
+    def _apply_admin_d_token_fee(self, local_balances: list[int], d_token_fee: int, fee_supply: int) -> list[int]:
+        admin_d_token_fee = udiv(
+            u(u(d_token_fee * self.reserved_profit_fraction) * self.admin_fee), FEE_PRECISION * FEE_PRECISION
+        )
+        local_balances = list(local_balances)
+        if admin_d_token_fee > 0:
+            for k in range(N_COINS):
+                admin_amount = udiv(u(local_balances[k] * admin_d_token_fee), fee_supply)
+                self.admin_balances[k] = u(self.admin_balances[k] + admin_amount)
+                self.balances[k] = u(self.balances[k] - admin_amount)
+                local_balances[k] = u(local_balances[k] - admin_amount)
+        return local_balances
+
+    @staticmethod
+    def _assert_balance(xp: list[int]) -> None:
+        if not (xp[0] > 0 and xp[1] > 0 and max(xp) // min(xp) < 1_000):
+            raise Revert("!balance")
+
+    def tweak_price(self, A_gamma: list[int], _xp: list[int], D: int, vp_preop: int, timestamp: int) -> int:
+        """
+        Same as pool.tweak_price: updates price oracle, last price, profits and rebalances price_scale
+
+        Returns:
+        int: New price_scale
+        """
+        price_oracle = self.price_oracle
+        price_scale = self.price_scale
+        is_ramping = self._is_ramping()
+
+        last_timestamp = self.last_timestamp
+        if last_timestamp < timestamp:
+            alpha = u(wad_exp(-i256(udiv(u(w(timestamp - last_timestamp) * 10**18), self.ma_time))))
+            capped_price = min(max(self.last_prices, price_scale // 2), u(2 * price_scale))
+            price_oracle = udiv(u(u(capped_price * u(10**18 - alpha)) + u(price_oracle * alpha)), 10**18)
+            self.price_oracle = price_oracle
+            self.last_timestamp = timestamp
+
+        last_prices = udiv(u(get_p(_xp, D, A_gamma) * price_scale), 10**18)
+        self.last_prices = last_prices
+
+        total_supply = self.total_supply
+        donation_shares = self._donation_shares(timestamp)
+        locked_supply = u(total_supply - donation_shares)
+
+        old_virtual_price = self.virtual_price
+        xcp = _xcp(D, price_scale)
+        virtual_price = u(10**18 * xcp) // total_supply
+        if not (virtual_price >= vp_preop and (is_ramping or virtual_price >= old_virtual_price)):
+            raise Revert("virtual price decreased")
+
+        old_xcp_profit = self.xcp_profit
+        xcp_profit = old_xcp_profit
+        lp_xcp_profit = self.lp_xcp_profit
+        if virtual_price > old_virtual_price:
+            xcp_profit = u(xcp_profit + (virtual_price - old_virtual_price))
+            if xcp_profit > PRECISION:
+                d_profit = w(xcp_profit - max(old_xcp_profit, PRECISION))
+                reserved_fraction, admin_fee = self.reserved_profit_fraction, self.admin_fee
+                lp_xcp_profit = u(
+                    lp_xcp_profit
+                    + udiv(
+                        u(u(d_profit * reserved_fraction) * u(FEE_PRECISION - admin_fee)),
+                        u(FEE_PRECISION * FEE_PRECISION - u(reserved_fraction * admin_fee)),
+                    )
+                )
+        else:
+            vp_delta = old_virtual_price - virtual_price
+            xcp_profit = u(xcp_profit - vp_delta)
+            if lp_xcp_profit > PRECISION and vp_delta <= lp_xcp_profit - PRECISION:
+                lp_xcp_profit -= vp_delta
+            else:
+                lp_xcp_profit = PRECISION
+        self.lp_xcp_profit = lp_xcp_profit
+        self.xcp_profit = xcp_profit
+
+        vp_boosted = u(10**18 * xcp) // locked_supply
+        if vp_boosted < virtual_price:
+            raise Revert("negative donation")
+        if vp_boosted > lp_xcp_profit and timestamp > last_timestamp:
+            target_price = price_oracle
+            norm = udiv(u(target_price * PRECISION), price_scale)
+            norm = abs(norm - 10**18)
+            adjustment_step = min(norm // 5, self.adjustment_step_max)
+
+            p_new = price_scale
+            if adjustment_step > self.adjustment_step_min:
+                p_new = udiv(u(u(price_scale * (norm - adjustment_step)) + u(adjustment_step * target_price)), norm)
+
+            if p_new != price_scale:
+                xp = [_xp[0], udiv(u(_xp[1] * p_new), price_scale)]
+                new_D = newton_D(A_gamma[0], A_gamma[1], xp, 0)
+                new_xcp = _xcp(new_D, p_new)
+                new_virtual_price = u(10**18 * new_xcp) // total_supply
+
+                donation_shares_to_burn = 0
+                goal_vp = max(lp_xcp_profit, virtual_price)
+                if new_virtual_price < goal_vp:
+                    tweaked_supply = u(10**18 * new_xcp) // goal_vp
+                    if tweaked_supply >= total_supply:
+                        raise Revert("tweaked supply must shrink")
+                    donation_shares_to_burn = min(total_supply - tweaked_supply, donation_shares)
+                    new_virtual_price = u(10**18 * new_xcp) // u(total_supply - donation_shares_to_burn)
+
+                if new_virtual_price > 10**18 and new_virtual_price >= lp_xcp_profit:
+                    self.D = new_D
+                    self.virtual_price = new_virtual_price
+                    self.price_scale = p_new
+
+                    if donation_shares_to_burn > 0:
+                        shares_unlocked = self._donation_shares(timestamp, False)
+                        shares_unlocked_new = u(
+                            shares_unlocked - u(donation_shares_to_burn * shares_unlocked) // donation_shares
+                        )
+                        new_total = u(self.donation_shares - donation_shares_to_burn)
+                        new_elapsed = 0
+                        if new_total > 0 and shares_unlocked_new > 0:
+                            new_elapsed = u(shares_unlocked_new * self.donation_duration) // new_total
+
+                        self.donation_shares = new_total
+                        self.total_supply = u(self.total_supply - donation_shares_to_burn)
+                        self.last_donation_release_ts = u(timestamp - new_elapsed)
+
+                    self._assert_balance(xp)
+                    return p_new
+
+        self.D = D
+        self.virtual_price = virtual_price
+        self._assert_balance(_xp)
+        return price_scale
+
+    # ------------------------------------------------------------ operations
+
+    @_atomic
+    def exchange(self, i: int, j: int, dx: int, timestamp: int) -> int:
+        """
+        Apply pool.exchange(i, j, dx) in block with given timestamp
+
+        Returns:
+        int: dy received
+        """
+        if i == j:
+            raise Revert("same coin")
+        if dx == 0:
+            raise Revert("zero dx")
+        _check_index(i)
+        _check_index(j)
+        self.balances[i] = u(self.balances[i] + dx)
+
+        A_gamma = self._A_gamma(timestamp)
+        balances = list(self.balances)
+        y = balances[j]
+        x0 = u(balances[i] - dx)
+
+        price_scale = self.price_scale
+        xp = self._xp(balances, price_scale)
+        if self._is_ramping():
+            x0 = u(x0 * self.precisions[i])
+            if i > 0:
+                x0 = udiv(u(x0 * price_scale), PRECISION)
+            xp_old = list(xp)
+            xp_old[i] = x0
+            self.D = newton_D(A_gamma[0], A_gamma[1], xp_old, 0)
+
+        D = self.D
+        vp_preop = u(10**18 * _xcp(D, price_scale)) // self.total_supply
+
+        y_out = get_y(A_gamma[0], A_gamma[1], xp, D, j)
+        dy = u(xp[j] - y_out[0])
+        xp[j] -= dy
+        dy = u(dy - 1)
+        if j > 0:
+            dy = u(dy * PRECISION) // price_scale
+        dy //= self.precisions[j]
+
+        fee = udiv(u(self.fee_calc(xp) * dy), FEE_PRECISION)
+        dy = u(dy - fee)
+        y = u(y - dy)
+
+        admin_fee_amount = udiv(
+            u(u(fee * self.reserved_profit_fraction) * self.admin_fee), FEE_PRECISION * FEE_PRECISION
+        )
+        if admin_fee_amount > 0:
+            self.admin_balances[j] = u(self.admin_balances[j] + admin_fee_amount)
+            self.balances[j] = u(self.balances[j] - admin_fee_amount)
+            y = u(y - admin_fee_amount)
+
+        y = u(y * self.precisions[j])
+        if j > 0:
+            y = udiv(u(y * price_scale), PRECISION)
+        xp[j] = y
+
+        # warm started with K0 of the trade
+        D = newton_D(A_gamma[0], A_gamma[1], xp, y_out[1])
+        self.tweak_price(A_gamma, xp, D, vp_preop, timestamp)
+
+        self.balances[j] = u(self.balances[j] - dy)
+        return dy
+
+    @_atomic
+    def add_liquidity(self, amounts: list[int], timestamp: int, donation: bool = False) -> int:
+        """
+        Apply pool.add_liquidity(amounts, 0, donation=donation) in block with given timestamp
+
+        Returns:
+        int: LP tokens minted (or added to donation shares)
+        """
+        if u(amounts[0] + amounts[1]) == 0:
+            raise Revert("!amounts")
+
+        old_balances = list(self.balances)
+        amounts_received = list(amounts)
+        for k in range(N_COINS):
+            self.balances[k] = u(self.balances[k] + amounts[k])
+        balances = list(self.balances)
+
+        price_scale = self.price_scale
+        xp = self._xp(balances, price_scale)
+        old_xp = self._xp(old_balances, price_scale)
+        if self.D == 0 and donation:
+            raise Revert("donation not allowed on empty pool")
+
+        A_gamma = self._A_gamma(timestamp)
+        old_D = self._get_D(A_gamma, old_xp)
+        D = newton_D(A_gamma[0], A_gamma[1], xp, 0)
+
+        token_supply = self.total_supply
+        vp_preop = self.virtual_price
+        if old_D > 0:
+            vp_preop = u(10**18 * _xcp(old_D, price_scale)) // token_supply
+            d_token = u(u(token_supply * D) // old_D - token_supply)
+        else:
+            d_token = _xcp(D, price_scale)
+        if d_token == 0:
+            raise Revert("nothing minted")
+
+        if old_D == 0:
+            if d_token <= MINIMUM_LIQUIDITY:
+                raise Revert("initial liquidity too low")
+            self.D = D
+            self.virtual_price = 10**18
+            self.xcp_profit = 10**18
+            self.lp_xcp_profit = 10**18
+            self.total_supply = u(self.total_supply + d_token)
+            return d_token - MINIMUM_LIQUIDITY
+
+        fee = self._calc_token_fee(amounts_received, xp, timestamp, donation, True)
+        d_token_fee = u(fee * d_token) // FEE_PRECISION + 1
+        d_token = u(d_token - d_token_fee)
+
+        if donation:
+            new_donation_shares = u(self.donation_shares + d_token)
+            if u(new_donation_shares * PRECISION) // u(token_supply + d_token) > self.donation_shares_max_ratio:
+                raise Revert("donation above cap!")
+            new_elapsed = u(self._donation_shares(timestamp, False) * self.donation_duration) // new_donation_shares
+            self.last_donation_release_ts = u(timestamp - new_elapsed)
+            self.donation_shares = new_donation_shares
+            self.total_supply = u(self.total_supply + d_token)
+        else:
+            if d_token_fee > 0 and self.reserved_profit_fraction > 0 and self.admin_fee > 0:
+                fee_supply = u(u(token_supply + d_token) + d_token_fee)
+                xp = self._xp(self._apply_admin_d_token_fee(balances, d_token_fee, fee_supply), price_scale)
+                D = newton_D(A_gamma[0], A_gamma[1], xp, 0)
+
+            relative_lp_add = u(d_token * PRECISION) // u(token_supply + d_token)
+            if relative_lp_add > 0 and self.donation_shares > 0:
+                protection_period = self.donation_protection_period
+                lp_threshold = self.donation_protection_lp_threshold
+                raw_extension = w(w(relative_lp_add * protection_period) + self.donation_protection_extension_remainder)
+                extension_seconds = udiv(raw_extension, lp_threshold)
+                current_expiry = max(self.donation_protection_expiry_ts, timestamp)
+                max_expiry = w(timestamp + protection_period)
+                uncapped_expiry = w(current_expiry + extension_seconds)
+                if uncapped_expiry >= max_expiry:
+                    self.donation_protection_expiry_ts = max_expiry
+                    self.donation_protection_extension_remainder = 0
+                else:
+                    self.donation_protection_expiry_ts = uncapped_expiry
+                    self.donation_protection_extension_remainder = raw_extension % lp_threshold
+
+            self.total_supply = u(self.total_supply + d_token)
+
+        self.tweak_price(A_gamma, xp, D, vp_preop, timestamp)
+        return d_token
+
+    @_atomic
+    def remove_liquidity_fixed_out(self, token_amount: int, i: int, amount_i: int, timestamp: int) -> int:
+        """
+        Apply pool.remove_liquidity_fixed_out(token_amount, i, amount_i, 0) in block with given timestamp
+
+        Returns:
+        int: Amount of coin 1 - i received
+        """
+        A_gamma = self._A_gamma(timestamp)
+        dy, D, xp, approx_fee = self._calc_withdraw_fixed_out(A_gamma, token_amount, i, amount_i, timestamp)
+
+        price_scale_preop = self.price_scale
+        D_preop = self._get_D(A_gamma, self._xp(self.balances, price_scale_preop))
+        vp_preop = u(10**18 * _xcp(D_preop, price_scale_preop)) // self.total_supply
+
+        j = 1 - i
+        d_token_fee = u(approx_fee * token_amount) // FEE_PRECISION + 1
+        if d_token_fee > 0 and self.reserved_profit_fraction > 0 and self.admin_fee > 0:
+            fee_supply = u(u(self.total_supply - token_amount) + d_token_fee)
+            local_balances = list(self.balances)
+            local_balances[i] = u(local_balances[i] - amount_i)
+            local_balances[j] = u(local_balances[j] - dy)
+            local_balances = self._apply_admin_d_token_fee(local_balances, d_token_fee, fee_supply)
+            xp = self._xp(local_balances, price_scale_preop)
+            D = newton_D(A_gamma[0], A_gamma[1], xp, 0)
+
+        self.total_supply = u(self.total_supply - token_amount)
+        self.tweak_price(A_gamma, xp, D, vp_preop, timestamp)
+
+        self.balances[i] = u(self.balances[i] - amount_i)
+        self.balances[j] = u(self.balances[j] - dy)
+        return dy
+
+    def remove_liquidity_one_coin(self, token_amount: int, i: int, timestamp: int) -> int:
+        """
+        Apply pool.remove_liquidity_one_coin(token_amount, i, 0) in block with given timestamp
+
+        Returns:
+        int: Amount of coin i received
+        """
+        _check_index(i)
+        return self.remove_liquidity_fixed_out(token_amount, 1 - i, 0, timestamp)
+
+    # ----------------------------------------------------------------- views
+
+    def _prep_calc(self, timestamp: int | None) -> tuple[list[int], int]:
+        # views._prep_calc, A and gamma at timestamp (last_timestamp by default) matter only while ramping
+        A_gamma = self._A_gamma(self.last_timestamp if timestamp is None else timestamp)
+        D = self.D
+        if self._is_ramping():
+            D = newton_D(A_gamma[0], A_gamma[1], self._xp(self.balances, self.price_scale), 0)
+        return A_gamma, D
+
+    def get_dy(self, i: int, j: int, dx: int, timestamp: int | None = None) -> int:
+        """
+        Same as pool.get_dy(i, j, dx) (views.get_dy)
+        """
+        if i == j or i not in (0, 1) or j not in (0, 1):
+            raise Revert("coin index out of range")
+        if dx == 0:
+            raise Revert("do not exchange 0 coins")
+        A_gamma, D = self._prep_calc(timestamp)
+
+        balances = list(self.balances)
+        balances[i] = u(balances[i] + dx)
+        xp = self._xp(balances, self.price_scale)
+
+        y = get_y(A_gamma[0], A_gamma[1], xp, D, j)[0]
+        if y >= xp[j]:
+            raise Revert("unsafe value for y")
+        dy = xp[j] - y - 1
+        xp[j] = y
+        if j > 0:
+            dy = u(dy * PRECISION) // self.price_scale
+        dy //= self.precisions[j]
+        return u(dy - u(self.fee_calc(xp) * dy) // FEE_PRECISION)
+
+    def get_dx(self, i: int, j: int, dy: int, n_iter: int = 5, timestamp: int | None = None) -> int:
+        """
+        Same as pool.get_dx(i, j, dy, n_iter) (views.get_dx)
+        """
+        if i == j or i not in (0, 1) or j not in (0, 1):
+            raise Revert("coin index out of range")
+        if dy == 0:
+            raise Revert("do not exchange out 0 coins")
+        A_gamma, D = self._prep_calc(timestamp)
+
+        dx = 0
+        _dy = dy
+        for _ in range(n_iter):
+            balances = list(self.balances)
+            balances[j] = u(balances[j] - _dy)
+            xp = self._xp(balances, self.price_scale)
+
+            x = get_y(A_gamma[0], A_gamma[1], xp, D, i)[0]
+            dx = u(x - xp[i])
+            xp[i] = x
+            if i > 0:
+                dx = u(dx * PRECISION) // self.price_scale
+            dx //= self.precisions[i]
+
+            _dy = u(u(dy + u(self.fee_calc(xp) * _dy) // FEE_PRECISION) + 1)
+        return dx
+
+    def calc_withdraw_one_coin(self, token_amount: int, i: int, timestamp: int | None = None) -> int:
+        """
+        Same as pool.calc_withdraw_one_coin(token_amount, i)
+        """
+        _check_index(i)
+        timestamp = self.last_timestamp if timestamp is None else timestamp
+        return self._calc_withdraw_fixed_out(self._A_gamma(timestamp), token_amount, 1 - i, 0, timestamp)[0]
+
+
+def get_dy_batch(
+    quotes: Iterable[tuple[TwocryptoState, int, int, int]], allow_failure: bool = False
+) -> list[int | None]:
+    """
+    Evaluate many get_dy quotes without changing states
+
+    Args:
+    quotes (Iterable[tuple[TwocryptoState, int, int, int]]): (state, i, j, dx) of every quote
+    allow_failure (bool): Return None for quotes the contract would revert on instead of raising
+    Returns:
+    list[int | None]: dy of every quote
+    """
+    return call_many(((state.get_dy, (i, j, dx)) for state, i, j, dx in quotes), allow_failure)
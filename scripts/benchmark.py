@@ -0,0 +1,208 @@
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+import click
+
+from scripts.fleet import get_chain_config_files
+from scripts.logging_config import get_logger
+from settings.config import BASE_DIR, CACHE_DIR, get_chain_settings
+
+logger = get_logger()
+
+BENCHMARKS_DIR = Path(CACHE_DIR, "benchmarks")
+
+
+def _get_peak_memory_mb() -> float:
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return max_rss / 1024**2 if sys.platform == "darwin" else max_rss / 1024
+
+
+def _get_commit_hash() -> str | None:
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    return result.stdout.strip()
+
+
+def _get_deployment_files(chain_config_file: str) -> list[Path]:
+    deployment_file = Path(BASE_DIR, "deployments", get_chain_settings(chain_config_file).file_path)
+    return [deployment_file] + [
+        deployment_file.with_suffix(suffix) for suffix in (".journal.jsonl", ".costs.json", ".ownership.json")
+    ]
+
+
+def _run_benchmark(chain_config_file: str, provider_url: str, compilation_cache_dir: str | None, kwargs: dict) -> dict:
+    # runs in a fresh process, so that peak memory and caches belong to this deployment only
+    from scripts.deploy import compiler
+    from scripts.deploy.infra import deploy_all
+    from scripts.network import setup_network_env
+    from scripts.tracing import start_tracing, stop_tracing
+    from settings.config import settings
+
+    settings.DEBUG = False
+    if compilation_cache_dir is not None:
+        compiler.set_compilation_cache_dir(Path(compilation_cache_dir))
+
+    setup_network_env(provider_url)
+    start_tracing()
+    started_at = time.perf_counter()
+    result = {}
+    try:
+        result["cost"] = deploy_all(chain_config_file, fresh=True, **kwargs)
+        result["status"] = "ok"
+    except Exception as e:  # report failure of the config instead of stopping the benchmark
+        logger.error(traceback.format_exc())
+        result.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+    result["wall_time"] = time.perf_counter() - started_at
+
+    tracer = stop_tracing()
+    result.update(
+        {
+            "phases": tracer.get_totals("phase"),
+            "steps": tracer.get_totals("step"),
+            "spans": tracer.summary(),
+            "peak_memory_mb": _get_peak_memory_mb(),
+        }
+    )
+    return result
+
+
+def run_benchmark(
+    chain_config_files: list[str],
+    cold_compile: bool = False,
+    block_time: float = 0,
+    latency: float = 0,
+    **kwargs,
+) -> dict:
+    """
+    Deploy and test every chain config against a fresh local devnet, one config at a time
+
+    Args:
+    chain_config_files (list[str]): Chain config files relative to settings/chains
+    cold_compile (bool): Compile into empty compilation cache, so that compile time is included
+    block_time (float): Seconds between devnet blocks, 0 to mine every transaction right away
+    latency (float): Seconds added by devnet to every request
+    kwargs: Arguments of deploy_all (workers, max_in_flight)
+    Returns:
+    dict: Benchmark report
+    """
+    from scripts.devnet import create_devnet
+    from scripts.devnet.server import FaultConfig
+
+    report = {
+        "commit": _get_commit_hash(),
+        "timestamp": int(time.time()),
+        "python": platform.python_version(),
+        "settings": {"cold_compile": cold_compile, "block_time": block_time, "latency": latency, **kwargs},
+        "results": {},
+    }
+    for chain_config_file in chain_config_files:
+        deployment_files = _get_deployment_files(chain_config_file)
+        if any(file.exists() for file in deployment_files):
+            # deployment on a fresh devnet must start from scratch, never touch existing deployment
+            logger.warning(f"{chain_config_file}: deployment file exists, skipping.")
+            report["results"][chain_config_file] = {"status": "skipped", "error": "deployment file exists"}
+            continue
+
+        chain_settings = get_chain_settings(chain_config_file)
+        server = create_devnet(
+            chain_settings.chain_id, block_time=block_time, faults=FaultConfig(latency=latency)
+        ).start()
+        logger.info(f"{chain_config_file}: benchmarking against devnet at {server.url} ...")
+        try:
+            with (
+                tempfile.TemporaryDirectory() as compilation_cache_dir,
+                ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor,
+            ):
+                result = executor.submit(
+                    _run_benchmark,
+                    chain_config_file,
+                    server.url,
+                    compilation_cache_dir if cold_compile else None,
+                    kwargs,
+                ).result()
+        finally:
+            server.stop()
+            for file in deployment_files:
+                file.unlink(missing_ok=True)
+
+        result["rpc_calls"] = sum(server.stats.values())
+        result["rpc_methods"] = dict(server.stats.most_common())
+        report["results"][chain_config_file] = result
+        logger.info(
+            f"{chain_config_file}: {result['status']} in {result['wall_time']:.1f}s, "
+            f"{result['rpc_calls']} rpc calls, peak memory {result['peak_memory_mb']:.0f} MB"
+        )
+    return report
+
+
+def log_comparison(report: dict, baseline: dict) -> None:
+    logger.info(f"Compared to {baseline.get('commit') or 'baseline'}:")
+    for chain_config_file, result in report["results"].items():
+        previous = baseline["results"].get(chain_config_file)
+        if previous is None or result["status"] != "ok" or previous["status"] != "ok":
+            continue
+
+        changes = []
+        for metric in ("wall_time", "rpc_calls", "peak_memory_mb"):
+            if previous.get(metric):
+                changes.append(f"{metric} {(result[metric] / previous[metric] - 1) * 100:+.1f}%")
+        logger.info(f"  {chain_config_file}: {', '.join(changes)}")
+
+
+@click.command("benchmark", short_help="benchmark deploy all on local devnet")
+@click.argument("pattern", type=click.STRING, default="examples/*.yaml")
+@click.option("--output", default=None, type=click.Path(dir_okay=False), help="Report file")
+@click.option("--baseline", default=None, type=click.Path(exists=True, dir_okay=False), help="Report to compare with")
+@click.option("--cold-compile", is_flag=True, default=False, help="Include compilation into empty cache")
+@click.option("--block-time", default=0.0, type=click.FLOAT, help="Seconds between devnet blocks")
+@click.option("--latency", default=0.0, type=click.FLOAT, help="Seconds added to every rpc request")
+@click.option("--workers", default=4, type=click.INT, help="Number of deployment steps running concurrently")
+@click.option(
+    "--max-in-flight", default=1, type=click.INT, help="Number of transactions sent without waiting for receipt"
+)
+def run_benchmark_command(
+    pattern: str,
+    output: str | None,
+    baseline: str | None,
+    cold_compile: bool,
+    block_time: float,
+    latency: float,
+    workers: int,
+    max_in_flight: int,
+) -> None:
+    chain_config_files = get_chain_config_files(pattern)
+    if not chain_config_files:
+        raise click.BadParameter(f"No chain config files match {pattern}")
+
+    report = run_benchmark(
+        chain_config_files,
+        cold_compile=cold_compile,
+        block_time=block_time,
+        latency=latency,
+        workers=workers,
+        max_in_flight=max_in_flight,
+    )
+
+    if output is None:
+        BENCHMARKS_DIR.mkdir(parents=True, exist_ok=True)
+        output = Path(BENCHMARKS_DIR, f"{time.strftime('%Y%m%d_%H%M%S')}_{(report['commit'] or 'unknown')[:8]}.json")
+    with open(output, "w") as file:
+        json.dump(report, file, indent=4)
+    logger.info(f"Benchmark report written to {output}")
+
+    if baseline is not None:
+        with open(baseline, "r") as file:
+            log_comparison(report, json.load(file))
@@ -1,32 +1,15 @@
-import os
-from pathlib import Path
-
 import click
 
+from scripts.fleet import get_chain_config_files, run_fleet
 from scripts.logging_config import get_logger
-from scripts.tests.post_deploy import test_post_deploy
-from scripts.tests.pre_deployment import test_pre_deploy
-from settings.config import BASE_DIR, get_chain_settings, settings
-from settings.models import RollupType
-
-from .amm.stableswap import deploy_stableswap
-from .amm.tricrypto import deploy_tricrypto
-from .amm.twocrypto import deploy_twocrypto
-from .deployment_utils import dump_initial_chain_settings, get_deployment_config, get_deployment_obj
-from .gauge.child_gauge import deploy_liquidity_gauge_infra
-from .governance.xgov import deploy_dao_vault, deploy_xgov, transfer_ownership
-from .helpers.deposit_and_stake_zap import deploy_deposit_and_stake_zap
-from .helpers.rate_provider import deploy_rate_provider
-from .helpers.router import deploy_router
-from .helpers.stable_swap_meta_zap import deploy_stable_swap_meta_zap
-from .models import Pool, Token
-from .registries.address_provider import deploy_address_provider, update_address_provider
-from .registries.metaregistry import deploy_metaregistry, update_metaregistry
-from .test_pools import add_liquidity, deploy_pool, deploy_tokens, swap
-from .test_pools.deploy_pool import deploy_pool
+from scripts.network import get_provider_url, requires_network, setup_network_env
+from settings.config import get_chain_settings, settings
 
 logger = get_logger()
 
+# Deployment scripts (and boa with the compiler they need) are imported by commands when they run,
+# so that `--help` and offline commands like `deploy plan` start without them.
+
 
 @click.group(name="deploy")
 def deploy_commands():
@@ -34,113 +17,114 @@ def deploy_commands():
     pass
 
 
-@deploy_commands.command("all", short_help="deploy all to chain")
+@click.command("compile", short_help="compile all latest contracts")
 @click.argument("chain_config_file", type=click.STRING)
-def run_deploy_all(chain_config_file: str) -> None:
+@click.option("--workers", default=None, type=click.INT, help="Number of compiler processes")
+def run_compile(chain_config_file: str, workers: int | None = None) -> None:
+    from .compiler import precompile_contracts
 
-    # in case we have a few deployed contracts not deployed via curve-core
-    # we will ignore them, e.g. relayer, agent blueprint etc. needed for testing
-    # xgov.
-    ignore_tests = []
     chain_settings = get_chain_settings(chain_config_file)
-    if chain_settings.rollup_type == RollupType.zksync:
-        raise NotImplementedError("zksync currently not supported")
-
-    # If we are in debug mode, we want to remove the existing deployment file
-    # so that there are no errors while trying to fetch state from a non-existent forked deployment
-    if settings.DEBUG:
-
-        # create debug filepath
-        debug_filepath = Path(BASE_DIR, "deployments", "debug")
-        if not debug_filepath.exists():
-            os.mkdir(debug_filepath)
-
-        deployment_file_path = Path(BASE_DIR, "deployments", "debug", f"{chain_settings.file_name}.yaml")
-        if deployment_file_path.exists():
-            logger.info(f"Removing existing deployment file {deployment_file_path} for debug deployment")
-            deployment_file_path.unlink()
-
-    # pre-deployment tests:
-    test_pre_deploy(chain_settings.chain_id)
-
-    logger.info(f"Using EVM version: {chain_settings.evm_version}")
-    dump_initial_chain_settings(chain_settings)
-
-    # check if there is a need to deploy xgov:
-    if chain_settings.dao.ownership_admin and chain_settings.dao.parameter_admin and chain_settings.dao.emergency_admin:
-        logger.info("No xgov for L1, setting admins from chain_settings file ...")
-        admins = (
-            chain_settings.dao.ownership_admin,
-            chain_settings.dao.parameter_admin,
-            chain_settings.dao.emergency_admin,
-        )
-        ignore_tests.append("xgov")
-
-    else:
-
-        logger.info("Deploying xgov ...")
-        admins = deploy_xgov(chain_settings)
+    precompile_contracts(chain_settings.evm_version, max_workers=workers)
 
-        # get updated chain settings from deployment file
-        chain_settings = get_deployment_config(chain_settings).config
 
-    # Check if there is a need to deploy dao vault
-    if chain_settings.dao.vault:
-        dao_vault = chain_settings.dao.vault
-    else:
-        logger.info("Deploying Vault ...")
-        dao_vault = deploy_dao_vault(chain_settings, admins[0]).address
-        chain_settings = get_deployment_config(chain_settings).config
-
-    # Old compatibility
-    fee_receiver = dao_vault
-
-    # deploy (reward-only) gauge factory and contracts
-    child_gauge_factory = deploy_liquidity_gauge_infra(chain_settings)
-
-    # address provider:
-    address_provider = deploy_address_provider(chain_settings)
-
-    # metaregistry
-    gauge_type = -1  # we set gauge type to -1 until there's an actual gauge type later
-    deploy_metaregistry(chain_settings, child_gauge_factory.address, gauge_type)
-
-    # router
-    deploy_router(chain_settings)
-
-    # deploy amms:
-    deploy_stableswap(chain_settings, fee_receiver)
-    deploy_tricrypto(chain_settings, fee_receiver)
-    deploy_twocrypto(chain_settings, fee_receiver)
-
-    # deposit and stake zap
-    deploy_deposit_and_stake_zap(chain_settings)
-
-    # meta zap
-    deploy_stable_swap_meta_zap(chain_settings)
-
-    # rate provider
-    deploy_rate_provider(chain_settings, address_provider.address)
-
-    # update metaregistry
-    update_metaregistry(chain_settings)
-
-    # update address provider
-    update_address_provider(chain_settings)
-
-    # transfer ownership to the dao
-    transfer_ownership(chain_settings)
-
-    # test post deployment
-    test_post_deploy(chain_config_file, ignore_tests)
+@deploy_commands.command("all", short_help="deploy all to chain")
+@click.argument("chain_config_file", type=click.STRING)
+@click.option("--fresh", is_flag=True, default=False, help="Ignore unfinished deployment in journal")
+@click.option("--workers", default=4, type=click.INT, help="Number of deployment steps running concurrently")
+@click.option(
+    "--max-in-flight", default=1, type=click.INT, help="Number of transactions sent without waiting for receipt"
+)
+@click.option(
+    "--fork-latest", is_flag=True, default=False, help="Debug mode: fork latest block instead of the pinned one"
+)
+@click.option(
+    "--create2",
+    is_flag=True,
+    default=False,
+    help="Deploy blueprints and contracts without owner in constructor via CREATE2 deployer",
+)
+def run_deploy_all(
+    chain_config_file: str,
+    fresh: bool = False,
+    workers: int = 4,
+    max_in_flight: int = 1,
+    fork_latest: bool = False,
+    create2: bool = False,
+) -> None:
+    from .infra import deploy_all, get_fork_block
+
+    # not requires_network: debug fork is set up at the pinned block right away
+    setup_network_env(settings.WEB3_PROVIDER_URL, get_fork_block(chain_config_file, fork_latest))
+    deploy_all(
+        chain_config_file,
+        fresh=fresh,
+        workers=workers,
+        max_in_flight=max_in_flight,
+        create2=create2,
+    )
+
+
+@deploy_commands.command("fleet", short_help="deploy all to several chains concurrently")
+@click.argument("pattern", type=click.STRING)
+@click.option("--jobs", default=None, type=click.INT, help="Number of chains deployed at the same time")
+@click.option("--fresh", is_flag=True, default=False, help="Ignore unfinished deployments in journals")
+@click.option("--workers", default=4, type=click.INT, help="Number of deployment steps running concurrently per chain")
+@click.option(
+    "--max-in-flight", default=1, type=click.INT, help="Number of transactions sent without waiting for receipt"
+)
+def run_deploy_fleet(
+    pattern: str, jobs: int | None = None, fresh: bool = False, workers: int = 4, max_in_flight: int = 1
+) -> None:
+    from .compiler import precompile_contracts
+    from .infra import deploy_all, get_fork_block
+
+    chain_config_files = get_chain_config_files(pattern)
+    if not chain_config_files:
+        raise click.BadParameter(f"No chain config files match {pattern}")
+    # fail before any chain sends transactions if some chain has no rpc url
+    for chain_config_file in chain_config_files:
+        chain_settings = get_chain_settings(chain_config_file)
+        try:
+            get_provider_url(chain_settings)
+        except ValueError:
+            raise click.BadParameter(
+                f"No rpc url for {chain_settings.network_name} ({chain_config_file}), "
+                f'add "{chain_settings.file_name}" to WEB3_PROVIDER_URLS',
+            )
+
+    # compile once here, chain processes only read the compilation cache
+    for evm_version in {get_chain_settings(file).evm_version for file in chain_config_files}:
+        precompile_contracts(evm_version)
+
+    results = run_fleet(
+        "deploy",
+        deploy_all,
+        chain_config_files,
+        max_workers=jobs,
+        get_fork_block=get_fork_block,
+        fresh=fresh,
+        workers=workers,
+        max_in_flight=max_in_flight,
+    )
+    if any(result["status"] != "ok" for result in results):
+        raise click.ClickException("Fleet deployment failed")
+
+
+@deploy_commands.command("plan", short_help="show what deploy all would do (offline)")
+@click.argument("chain_config_file", type=click.STRING)
+def run_deploy_plan(chain_config_file: str) -> None:
+    from .plan import DeployPlan, log_plan
 
-    # final!
-    logger.info("Infra deployed and tested!")
+    chain_settings = get_chain_settings(chain_config_file)
+    log_plan(chain_settings, DeployPlan(chain_settings).build())
 
 
 @deploy_commands.command("governance", short_help="deploy governance")
 @click.argument("chain_config_file", type=click.STRING)
+@requires_network
 def run_deploy_governance(chain_config_file: str) -> None:
+    from .governance.xgov import deploy_dao_vault, deploy_xgov
+
     chain_settings = get_chain_settings(chain_config_file)
     admins = deploy_xgov(chain_settings)
     deploy_dao_vault(chain_settings, admins[0])
@@ -148,14 +132,20 @@ def run_deploy_governance(chain_config_file: str) -> None:
 
 @deploy_commands.command("router", short_help="deploy router")
 @click.argument("chain_config_file", type=click.STRING)
+@requires_network
 def run_deploy_router(chain_config_file: str) -> None:
+    from .helpers.router import deploy_router
+
     chain_settings = get_chain_settings(chain_config_file)
     deploy_router(chain_settings)
 
 
 @deploy_commands.command("address_provider", short_help="deploy address provider")
 @click.argument("chain_config_file", type=click.STRING)
+@requires_network
 def run_deploy_address_provider(chain_config_file: str) -> None:
+    from .registries.address_provider import deploy_address_provider
+
     chain_settings = get_chain_settings(chain_config_file)
     deploy_address_provider(chain_settings)
 
@@ -163,7 +153,10 @@ def run_deploy_address_provider(chain_config_file: str) -> None:
 @deploy_commands.command("stableswap", short_help="deploy stableswap infra")
 @click.argument("chain_config_file", type=click.STRING)
 @click.argument("fee_receiver", type=click.STRING)
+@requires_network
 def run_deploy_stableswap(chain_config_file: str, fee_receiver: str) -> None:
+    from .amm.stableswap import deploy_stableswap
+
     chain_settings = get_chain_settings(chain_config_file)
     deploy_stableswap(chain_settings, fee_receiver)
 
@@ -171,7 +164,10 @@ def run_deploy_stableswap(chain_config_file: str, fee_receiver: str) -> None:
 @deploy_commands.command("tricrypto", short_help="deploy tricrypto infra")
 @click.argument("chain_config_file", type=click.STRING)
 @click.argument("fee_receiver", type=click.STRING)
+@requires_network
 def run_deploy_tricrypto(chain_config_file: str, fee_receiver: str) -> None:
+    from .amm.tricrypto import deploy_tricrypto
+
     chain_settings = get_chain_settings(chain_config_file)
     deploy_tricrypto(chain_settings, fee_receiver)
 
@@ -179,7 +175,10 @@ def run_deploy_tricrypto(chain_config_file: str, fee_receiver: str) -> None:
 @deploy_commands.command("twocrypto", short_help="deploy twocrypto infra")
 @click.argument("chain_config_file", type=click.STRING)
 @click.argument("fee_receiver", type=click.STRING)
+@requires_network
 def run_deploy_twocrypto(chain_config_file: str, fee_receiver: str) -> None:
+    from .amm.twocrypto import deploy_twocrypto
+
     chain_settings = get_chain_settings(chain_config_file)
     deploy_twocrypto(chain_settings, fee_receiver)
 
@@ -189,14 +188,22 @@ def run_deploy_twocrypto(chain_config_file: str, fee_receiver: str) -> None:
 @click.argument("name", type=click.STRING)
 @click.argument("symbol", type=click.STRING)
 @click.argument("coins", type=click.STRING)
+@requires_network
 def run_deploy_twocrypto(chain: str, name: str, symbol: str, coins: str) -> None:
+    from .test_pools import deploy_pool
+
     deploy_pool(chain, name, symbol, coins.split(","))
 
 
 @deploy_commands.command("test_tokens", short_help="deploy test tokens and pool on devnet")
 @click.argument("chain", type=click.STRING)
 @click.option("--receiver", default=None, type=click.STRING)
+@requires_network
 def run_test_tokens_deployment(chain: str, receiver: str | None = None) -> None:
+    from .deployment_file import get_deployment_obj
+    from .models import Token
+    from .test_pools import deploy_tokens
+
     chain_settings = get_chain_settings(f"{chain}.yaml")
     assert chain_settings.is_testnet, "Only for devnets"
 
@@ -212,7 +219,12 @@ def run_test_tokens_deployment(chain: str, receiver: str | None = None) -> None:
 
 @deploy_commands.command("test_pools", short_help="deploy test tokens and pool on devnet")
 @click.argument("chain", type=click.STRING)
+@requires_network
 def run_test_pools_deployment(chain: str) -> None:
+    from .deployment_file import get_deployment_obj
+    from .models import Pool, Token
+    from .test_pools import add_liquidity, deploy_pool, deploy_tokens, swap
+
     chain_settings = get_chain_settings(f"{chain}.yaml")
     assert chain_settings.is_testnet, "Only for devnets"
 
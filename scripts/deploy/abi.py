@@ -0,0 +1,73 @@
+import json
+from pathlib import Path
+
+import boa
+from boa.contracts.abi.abi_contract import ABIContract, ABIContractFactory
+
+from scripts.logging_config import get_logger
+from settings.config import BASE_DIR
+
+from .compiler import compile_contract
+from .scheduler import run_on_graph_thread
+from .utils import get_relative_path
+
+logger = get_logger()
+
+# factories already built in this process, keyed by contract path relative to repo
+_factories: dict[Path, ABIContractFactory] = {}
+
+
+def get_abi_path(contract_path: str | Path) -> Path:
+    """
+    Get path of the abi stored by deploy_contract for a contract source
+
+    Args:
+    contract_path (str | Path): Contract path from deployment file (`/contracts/...`) or path to vyper source
+    Returns:
+    Path: abi/... json file mirroring contracts/... folder structure
+    """
+    relative_path = get_relative_path(Path(contract_path))
+    return Path(BASE_DIR, "abi", *relative_path.parts[2:]).with_suffix(".json")
+
+
+def load_abi(contract_path: str | Path, evm_version: str | None = None) -> ABIContractFactory:
+    """
+    Build contract factory from abi stored in abi/ folder, so that read paths never compile.
+    Falls back to compilation cache if abi of the contract was never stored.
+
+    Args:
+    contract_path (str | Path): Contract path from deployment file (`/contracts/...`) or path to vyper source
+    evm_version (str | None): Target evm version, used only if contract has to be compiled
+    Returns:
+    ABIContractFactory: Factory of abi-only contract handles
+    """
+    relative_path = get_relative_path(Path(contract_path))
+    if relative_path in _factories:
+        return _factories[relative_path]
+
+    abi_path = get_abi_path(relative_path)
+    if abi_path.exists():
+        with open(abi_path, "r") as file:
+            abi = json.load(file)
+    else:
+        logger.debug(f"No abi stored for {relative_path}, compiling ...")
+        abi = compile_contract(BASE_DIR / Path(*relative_path.parts[1:]), evm_version)["abi"]
+
+    factory = boa.loads_abi(json.dumps(abi), name=relative_path.stem)
+    _factories[relative_path] = factory
+    return factory
+
+
+def get_contract_at(contract_path: str | Path, address: str, evm_version: str | None = None) -> ABIContract:
+    """
+    Get abi-only handle of a deployed contract
+
+    Args:
+    contract_path (str | Path): Contract path from deployment file (`/contracts/...`) or path to vyper source
+    address (str): Contract address
+    evm_version (str | None): Target evm version, used only if contract has to be compiled
+    Returns:
+    ABIContract: Contract handle
+    """
+    factory = load_abi(contract_path, evm_version)
+    return run_on_graph_thread(lambda: factory.at(address, nowarn=True))
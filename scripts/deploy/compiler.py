@@ -0,0 +1,306 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import boa
+import vvm
+import vyper
+from boa.contracts.vvm.vvm_contract import VVMDeployer
+
+from scripts.logging_config import get_logger
+from scripts.tracing import span
+from settings.config import BASE_DIR, CACHE_DIR
+
+from .utils import fetch_latest_contract, get_relative_path
+
+logger = get_logger()
+
+COMPILATION_CACHE_DIR = Path(CACHE_DIR, "compiled")
+
+# compilation cache of this process, see set_compilation_cache_dir
+_cache_dir = COMPILATION_CACHE_DIR
+
+# deployers already built in this process, keyed by compilation key
+_deployers: dict[str, VVMDeployer] = {}
+
+# `import a.b as c` and `from a.b import c, d`, builtin interfaces (vyper.interfaces, ethereum.ercs) don't resolve
+_IMPORT_PATTERN = re.compile(r"^(?:from[ \t]+(?P<package>[\w.]+)[ \t]+)?import[ \t]+(?P<names>[^#\n]+)", re.MULTILINE)
+_MODULE_SUFFIXES = (".vy", ".vyi", ".json")
+
+
+def get_compiler_version(source_code: str) -> str:
+    match = re.search(r"# pragma version ([\d.]+)", source_code)
+    if match:
+        return match.group(1)
+    return vyper.__version__
+
+
+def get_optimisation_level(source_code: str) -> str:
+    match = re.search(r"# pragma optimize ([a-z]+)", source_code)
+    if match:
+        return match.group(1)
+    return "UNKNOWN"
+
+
+def _resolve_module(module: str, contract_dir: Path) -> Path | None:
+    # relative imports start from contract folder, absolute ones are searched like vyper does: contract folder,
+    # repo root, then python path (e.g. snekmate)
+    level = len(module) - len(module.lstrip("."))
+    parts = module.lstrip(".").split(".")
+    if level > 0:
+        search_paths = [contract_dir if level == 1 else contract_dir.parents[level - 2]]
+    else:
+        search_paths = [contract_dir, BASE_DIR, *(Path(path) for path in sys.path if path)]
+
+    for search_path in search_paths:
+        for suffix in _MODULE_SUFFIXES:
+            module_file = Path(search_path, *parts[:-1], parts[-1] + suffix)
+            if module_file.is_file():
+                return module_file.resolve()
+    return None
+
+
+def get_imported_files(contract_file: Path) -> list[Path]:
+    """
+    Get files imported by contract, directly or through other imported modules
+
+    Args:
+    contract_file (Path): Path to vyper source
+    Returns:
+    list[Path]: Resolved paths of imported modules and interfaces, sorted
+    """
+    contract_file = Path(contract_file).resolve()
+    imported: set[Path] = set()
+    queue = [contract_file]
+    while queue:
+        module_file = queue.pop()
+        if module_file.suffix == ".json":
+            continue
+        with open(module_file, "r") as file:
+            source_code = file.read()
+
+        for match in _IMPORT_PATTERN.finditer(source_code):
+            package = match.group("package")
+            for name in match.group("names").split(","):
+                name = name.split(" as ")[0].strip()
+                if not name:
+                    continue
+                if package is None:
+                    candidates = [name]
+                else:
+                    # `from a import b` imports module b of package a or interface b defined in module a
+                    candidates = [f"{package}{name}" if package.endswith(".") else f"{package}.{name}", package]
+                resolved = None
+                for module in candidates:
+                    resolved = _resolve_module(module, module_file.parent)
+                    if resolved is not None:
+                        break
+                if resolved is not None and resolved != contract_file and resolved not in imported:
+                    imported.add(resolved)
+                    queue.append(resolved)
+    return sorted(imported)
+
+
+def get_compilation_key(
+    source_code: str,
+    compiler_version: str,
+    evm_version: str | None,
+    optimisation_level: str,
+    imported_sources: tuple[str, ...] = (),
+):
+    """
+    Get content-addressed key of a compilation
+
+    Args:
+    source_code (str): Contract source code
+    compiler_version (str): Vyper version the source is compiled with
+    evm_version (str | None): Target evm version (None for compiler default)
+    optimisation_level (str): Optimisation mode set in source pragma
+    imported_sources (tuple[str, ...]): Sources of modules and interfaces the contract imports (see get_imported_files)
+    Returns:
+    str: sha256 hex digest
+    """
+    source_hashes = [hashlib.sha256(source.encode()).hexdigest() for source in (source_code, *imported_sources)]
+    key = ":".join((*source_hashes, compiler_version, evm_version or "default", optimisation_level))
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def _compile(contract_file: Path, evm_version: str | None) -> dict:
+    compiler_args = {"evm_version": evm_version} if evm_version else None
+    with span(contract_file.name, "compile", evm_version=evm_version):
+        deployer = boa.load_partial(contract_file, compiler_args=compiler_args)
+
+    if isinstance(deployer, VVMDeployer):
+        return {"abi": deployer.abi, "bytecode": "0x" + deployer.bytecode.hex()}
+
+    # contract compiled with installed vyper version
+    from vyper.compiler.output import build_abi_output
+
+    compiler_data = deployer.compiler_data
+    return {"abi": build_abi_output(compiler_data), "bytecode": "0x" + compiler_data.bytecode.hex()}
+
+
+def _read_artifact(artifact_path: Path) -> dict | None:
+    if not artifact_path.exists():
+        return None
+    try:
+        with open(artifact_path, "r") as file:
+            return json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring broken compilation artifact {artifact_path}: {e}")
+        return None
+
+
+def _write_artifact(artifact_path: Path, artifact: dict) -> None:
+    artifact_path.parent.mkdir(parents=True, exist_ok=True)
+
+    # write to temporary file first so concurrent runs never read a partial artifact
+    tmp_path = artifact_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(artifact, file)
+    os.replace(tmp_path, artifact_path)
+
+
+def _get_source(contract_file: Path) -> tuple[str, str, str]:
+    with open(contract_file, "r") as file:
+        source_code = file.read()
+    compiler_version = get_compiler_version(source_code)
+    return source_code, compiler_version, get_optimisation_level(source_code)
+
+
+def get_contract_compilation_key(contract_file: Path, evm_version: str | None = None) -> str:
+    """
+    Get compilation key of a contract file, covering sources of everything it imports
+
+    Args:
+    contract_file (Path): Path to vyper source
+    evm_version (str | None): Target evm version
+    Returns:
+    str: sha256 hex digest
+    """
+    source_code, compiler_version, optimisation_level = _get_source(contract_file)
+    imported_sources = []
+    for imported_file in get_imported_files(contract_file):
+        with open(imported_file, "r") as file:
+            imported_sources.append(file.read())
+    return get_compilation_key(source_code, compiler_version, evm_version, optimisation_level, tuple(imported_sources))
+
+
+def set_compilation_cache_dir(cache_dir: Path) -> None:
+    """
+    Use another compilation cache in this process, e.g. an empty one to include compile time in benchmarks.
+    Worker processes of precompile_contracts get it as an argument, whatever their start method is.
+
+    Args:
+    cache_dir (Path): Folder of compiled artifacts
+    """
+    global _cache_dir
+
+    _cache_dir = Path(cache_dir)
+
+
+def compile_contract(contract_file: Path, evm_version: str | None = None, cache_dir: Path | None = None) -> dict:
+    """
+    Compile contract unless its artifact is already cached on disk
+
+    Args:
+    contract_file (Path): Path to vyper source
+    evm_version (str | None): Target evm version
+    cache_dir (Path | None): Folder of compiled artifacts, compilation cache of this process if None
+    Returns:
+    dict: Artifact with abi and bytecode
+    """
+    contract_file = Path(contract_file)
+    key = get_contract_compilation_key(contract_file, evm_version)
+
+    artifact_path = Path(cache_dir or _cache_dir, f"{key}.json")
+    artifact = _read_artifact(artifact_path)
+    if artifact is None:
+        compiler_version = _get_source(contract_file)[1]
+        logger.debug(f"Compiling {contract_file.name} (vyper {compiler_version}, evm {evm_version or 'default'})")
+        artifact = _compile(contract_file, evm_version)
+        _write_artifact(artifact_path, artifact)
+    return artifact
+
+
+def is_compiled(contract_file: Path, evm_version: str | None = None) -> bool:
+    key = get_contract_compilation_key(Path(contract_file), evm_version)
+    return key in _deployers or Path(_cache_dir, f"{key}.json").exists()
+
+
+def load_partial(contract_file: Path, evm_version: str | None = None) -> VVMDeployer:
+    """
+    Drop-in replacement for boa.load_partial backed by on-disk compilation cache.
+    Artifacts are keyed by hashes of source and its imports, compiler version, evm version and optimisation level,
+    so unchanged sources are never compiled twice across runs and chains.
+
+    Args:
+    contract_file (Path): Path to vyper source
+    evm_version (str | None): Target evm version
+    Returns:
+    VVMDeployer: Deployer built from cached abi and bytecode
+    """
+    contract_file = Path(contract_file)
+    key = get_contract_compilation_key(contract_file, evm_version)
+
+    if key in _deployers:
+        return _deployers[key]
+
+    artifact = compile_contract(contract_file, evm_version)
+    deployer = VVMDeployer.from_compiler_output(
+        {"abi": artifact["abi"], "bytecode": artifact["bytecode"]},
+        name=contract_file.stem,
+        filename=str(contract_file),
+    )
+    _deployers[key] = deployer
+    return deployer
+
+
+def get_latest_contracts(contracts_dir: Path = Path(BASE_DIR, "contracts")) -> list[Path]:
+    """
+    Get latest version of every contract under contracts dir
+
+    Args:
+    contracts_dir (Path): Root folder to search
+    Returns:
+    list[Path]: Latest contract file of each contract folder
+    """
+    latest_contracts = []
+    for contract_folder in sorted({file.parent for file in contracts_dir.rglob("*.vy")}):
+        try:
+            latest_contracts.append(fetch_latest_contract(contract_folder))
+        except FileNotFoundError:
+            continue
+    return latest_contracts
+
+
+def precompile_contracts(evm_version: str | None = None, max_workers: int | None = None) -> None:
+    """
+    Compile latest versions of all contracts in a process pool, so that deployment
+    only reads artifacts from the compilation cache
+
+    Args:
+    evm_version (str | None): Target evm version
+    max_workers (int | None): Number of worker processes (defaults to number of cpus)
+    """
+    contract_files = [file for file in get_latest_contracts() if not is_compiled(file, evm_version)]
+    if not contract_files:
+        logger.info("All contracts are already compiled.")
+        return
+
+    # install compilers upfront, so workers don't race for the same binaries
+    compiler_versions = {_get_source(file)[1] for file in contract_files}
+    for compiler_version in compiler_versions - {vyper.__version__}:
+        vvm.install_vyper(compiler_version)
+
+    logger.info(f"Compiling {len(contract_files)} contracts for EVM version {evm_version or 'default'} ...")
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # cache dir is passed explicitly, spawned workers don't inherit set_compilation_cache_dir
+        futures = {executor.submit(compile_contract, file, evm_version, _cache_dir): file for file in contract_files}
+        for future in as_completed(futures):
+            future.result()
+            logger.info(f"Compiled {get_relative_path(futures[future])}")
@@ -0,0 +1,183 @@
+import json
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from scripts.logging_config import get_logger
+
+logger = get_logger()
+
+# deployment steps of `deploy all` by subsystem
+SUBSYSTEMS = {
+    "xgov": "governance",
+    "vault": "governance",
+    "transfer_ownership": "governance",
+    "gauge": "gauge",
+    "address_provider": "registries",
+    "metaregistry": "registries",
+    "update_metaregistry": "registries",
+    "update_address_provider": "registries",
+    "stableswap": "amm",
+    "tricrypto": "amm",
+    "twocrypto": "amm",
+    "router": "helpers",
+    "deposit_and_stake_zap": "helpers",
+    "stable_swap_meta_zap": "helpers",
+    "rate_provider": "helpers",
+}
+
+
+def get_intrinsic_gas(data: bytes, is_create: bool) -> int:
+    # base cost, calldata cost and initcode word cost (EIP-3860)
+    gas = 21_000 + sum(16 if byte else 4 for byte in data)
+    if is_create:
+        gas += 32_000 + 2 * ((len(data) + 31) // 32)
+    return gas
+
+
+@dataclass
+class TransactionCost:
+    step: str | None
+    kind: str  # deploy, blueprint or call
+    target: str
+    calldata_size: int
+    gas_used: int
+    gas_price: int | None  # effective gas price, wei
+    l1_fee: int = 0  # data fee of rollups that report it in receipt, wei
+    tx_hash: str | None = None
+
+    @property
+    def cost(self) -> int | None:
+        if self.gas_price is None:
+            return None
+        return self.gas_used * self.gas_price + self.l1_fee
+
+
+class CostReport:
+    """
+    Gas and native currency spent by deployment, per transaction, step and subsystem
+    """
+
+    def __init__(self, native_currency_symbol: str, gas_price: int | None = None):
+        self.native_currency_symbol = native_currency_symbol
+        # gas price for transactions without receipt (forks), None if unknown
+        self.gas_price = gas_price
+        self.transactions: list[TransactionCost] = []
+        self._lock = threading.Lock()
+
+    def record(self, transaction: TransactionCost) -> None:
+        with self._lock:
+            self.transactions.append(transaction)
+
+    def _aggregate(self, key) -> dict[str, dict]:
+        groups: dict[str, dict] = {}
+        for transaction in self.transactions:
+            group = groups.setdefault(
+                key(transaction), {"transactions": 0, "gas_used": 0, "calldata_size": 0, "cost": 0}
+            )
+            group["transactions"] += 1
+            group["gas_used"] += transaction.gas_used
+            group["calldata_size"] += transaction.calldata_size
+            group["cost"] += transaction.cost or 0
+        for group in groups.values():
+            group["cost"] = group["cost"] / 10**18
+        return groups
+
+    def summary(self) -> dict:
+        with self._lock:
+            total_cost = sum(transaction.cost or 0 for transaction in self.transactions)
+            return {
+                "native_currency_symbol": self.native_currency_symbol,
+                "transactions": len(self.transactions),
+                "gas_used": sum(transaction.gas_used for transaction in self.transactions),
+                "cost": total_cost / 10**18,
+                "by_subsystem": self._aggregate(lambda tx: SUBSYSTEMS.get(tx.step, "other")),
+                "by_step": self._aggregate(lambda tx: tx.step or "other"),
+            }
+
+    def write(self, file_path: Path) -> None:
+        with self._lock:
+            transactions = [{**asdict(transaction), "cost": transaction.cost} for transaction in self.transactions]
+        with open(file_path, "w") as file:
+            json.dump({**self.summary(), "transactions": transactions}, file, indent=4)
+
+    def log(self) -> None:
+        summary = self.summary()
+        symbol = self.native_currency_symbol
+        logger.info(f"Deployment cost: {summary['gas_used']} gas, {summary['cost']:.6f} {symbol}")
+        for subsystem, group in sorted(summary["by_subsystem"].items(), key=lambda item: -item[1]["gas_used"]):
+            logger.info(
+                f"  {subsystem:<12} {group['transactions']:>4} txs {group['gas_used']:>12} gas "
+                f"{group['cost']:.6f} {symbol}"
+            )
+
+
+_report: CostReport | None = None
+_local = threading.local()
+
+
+@contextmanager
+def recording_costs(report: CostReport):
+    """
+    Record costs of transactions sent by `deploy` and `transact` into report
+    """
+    global _report
+
+    _report = report
+    try:
+        yield report
+    finally:
+        _report = None
+
+
+@contextmanager
+def cost_step(name: str):
+    """
+    Attribute transactions sent from the calling thread to deployment step
+    """
+    previous, _local.step = getattr(_local, "step", None), name
+    try:
+        yield
+    finally:
+        _local.step = previous
+
+
+def get_current_step() -> str | None:
+    return getattr(_local, "step", None)
+
+
+def record_receipt(step: str | None, kind: str, target: str, data: bytes, receipt: dict) -> None:
+    if _report is None:
+        return
+
+    gas_price = receipt.get("effectiveGasPrice")
+    _report.record(
+        TransactionCost(
+            step=step,
+            kind=kind,
+            target=target,
+            calldata_size=len(data),
+            gas_used=int(receipt["gasUsed"], 16),
+            gas_price=int(gas_price, 16) if gas_price is not None else None,
+            l1_fee=int(receipt.get("l1Fee") or "0x0", 16),
+            tx_hash=receipt["transactionHash"],
+        )
+    )
+
+
+def record_execution(kind: str, target: str, data: bytes, execution_gas: int) -> None:
+    # transaction executed locally (fork), receipt gas is execution gas plus intrinsic gas
+    if _report is None:
+        return
+
+    _report.record(
+        TransactionCost(
+            step=get_current_step(),
+            kind=kind,
+            target=target,
+            calldata_size=len(data),
+            gas_used=execution_gas + get_intrinsic_gas(data, is_create=kind != "call"),
+            gas_price=_report.gas_price,
+        )
+    )
@@ -0,0 +1,213 @@
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from eth_utils import keccak, to_checksum_address
+
+from .compiler import load_partial
+from .constants import CREATE2_SALT, CREATE2DEPLOYER_ADDRESS
+from .utils import fetch_filename_from_version, fetch_latest_contract, get_initcode
+
+# salt of deterministic deployments, None for regular deploys
+_salt: bytes | None = None
+
+
+def get_create2_address(initcode: bytes, salt: bytes = CREATE2_SALT, deployer: str = CREATE2DEPLOYER_ADDRESS) -> str:
+    """
+    Compute address of contract deployed via CREATE2, same as create2deployer.computeAddress
+
+    Args:
+    initcode (bytes): Deployment bytecode (with constructor args or blueprint preamble)
+    salt (bytes): 32-byte salt
+    deployer (str): Address of CREATE2 deployer contract
+    Returns:
+    str: Checksummed contract address
+    """
+    deployer_bytes = bytes.fromhex(deployer.removeprefix("0x"))
+    return to_checksum_address(keccak(b"\xff" + deployer_bytes + salt + keccak(initcode))[12:])
+
+
+def can_deploy_via_create2(contract_file: Path, as_blueprint: bool = False) -> bool:
+    """
+    Check if contract keeps the same state when deployed via CREATE2 deployer. Constructor that reads
+    msg.sender (e.g. to set owner) would see the deployer contract instead of deployer account, so such contracts
+    are deployed regularly. Blueprint constructors never run on deployment.
+
+    Args:
+    contract_file (Path): Path to vyper source
+    as_blueprint (bool): Deploy as ERC-5202 blueprint
+    Returns:
+    bool: True if contract can be deployed via CREATE2 deployer
+    """
+    if as_blueprint:
+        return True
+
+    with open(contract_file) as f:
+        source_code = f.read()
+    # constructor body: indented lines up to the next top-level statement
+    match = re.search(r"^def __init__\(.*?(?=^[@\w]|\Z)", source_code, re.MULTILINE | re.DOTALL)
+    if match is None:
+        return True
+    # initializers of modules and internal functions may read msg.sender as well
+    return re.search(r"msg\.sender|tx\.origin|\.__init__\(|self\.\w+\(", match.group(0)) is None
+
+
+@dataclass(frozen=True)
+class Ref:
+    """
+    Constructor argument referencing address of another contract in the same plan
+    """
+
+    name: str
+
+
+@dataclass
+class PlannedDeployment:
+    name: str
+    contract_folder: Path
+    contract_file: Path
+    ctor_args: tuple
+    as_blueprint: bool
+    initcode: bytes
+    address: str
+
+
+class Create2Planner:
+    """
+    Precomputes CREATE2 addresses of a set of contracts before any transaction is sent.
+    Constructor args may reference other contracts of the plan with `Ref(name)`:
+
+        planner = Create2Planner(evm_version)
+        agent = planner.add("agent", Path(BASE_DIR, "contracts", "governance", "agent"), as_blueprint=True)
+        planner.add("relayer", relayer_folder, broadcaster, agent, messenger)
+        addresses = planner.get_address_map()
+
+    Contracts deployed before (e.g. in a previous run) are added with `add_deployed`, so that references
+    to them resolve to their actual address.
+    """
+
+    def __init__(self, evm_version: str | None = None, salt: bytes = CREATE2_SALT):
+        self.evm_version = evm_version
+        self.salt = salt
+        self._entries: dict[str, tuple[Path, Path, tuple, bool]] = {}
+        self._deployed: dict[str, str] = {}
+
+    def _check_name(self, name: str) -> None:
+        if name in self._entries or name in self._deployed:
+            raise ValueError(f"Contract '{name}' is already planned")
+
+    def add(
+        self,
+        name: str,
+        contract_folder: Path,
+        *ctor_args,
+        as_blueprint: bool = False,
+        deploy_contract_version: str = "v_000",
+    ) -> Ref:
+        """
+        Add contract to the plan
+
+        Args:
+        name (str): Unique name of the contract in the plan
+        contract_folder (Path): Folder with all versions of the contract
+        ctor_args: Constructor arguments, `Ref` for addresses of other planned contracts
+        as_blueprint (bool): Deploy as ERC-5202 blueprint
+        deploy_contract_version (str): Version to deploy, "v_000" for the latest one
+        Returns:
+        Ref: Reference to the contract for constructor args of other contracts
+        """
+        self._check_name(name)
+        if deploy_contract_version == "v_000":
+            contract_file = fetch_latest_contract(contract_folder)
+        else:
+            contract_file = fetch_filename_from_version(contract_folder, deploy_contract_version)
+        if not can_deploy_via_create2(contract_file, as_blueprint):
+            raise ValueError(f"{contract_file.name} can't be deployed via CREATE2 deployer")
+
+        self._entries[name] = (contract_folder, contract_file, ctor_args, as_blueprint)
+        return Ref(name)
+
+    def add_deployed(self, name: str, address: str) -> Ref:
+        """
+        Add contract that is already deployed, it is only used to resolve references
+
+        Args:
+        name (str): Unique name of the contract in the plan
+        address (str): Address of the deployed contract
+        Returns:
+        Ref: Reference to the contract for constructor args of other contracts
+        """
+        self._check_name(name)
+        self._deployed[name] = str(address)
+        return Ref(name)
+
+    def plan(self) -> dict[str, PlannedDeployment]:
+        """
+        Resolve references and compute addresses of all planned contracts (compilation cache only, no rpc)
+
+        Returns:
+        dict[str, PlannedDeployment]: Planned deployments, referenced contracts before the ones referencing them
+        """
+        addresses = dict(self._deployed)
+        planned: dict[str, PlannedDeployment] = {}
+        remaining = dict(self._entries)
+        while remaining:
+            progress = False
+            for name, (contract_folder, contract_file, ctor_args, as_blueprint) in list(remaining.items()):
+                refs = [arg.name for arg in ctor_args if isinstance(arg, Ref)]
+                unknown = [ref for ref in refs if ref not in self._entries and ref not in self._deployed]
+                if unknown:
+                    raise ValueError(f"Contract '{name}' references unknown contracts: {unknown}")
+                if any(ref not in addresses for ref in refs):
+                    continue
+
+                args = tuple(addresses[arg.name] if isinstance(arg, Ref) else arg for arg in ctor_args)
+                initcode = get_initcode(load_partial(contract_file, self.evm_version), args, as_blueprint)
+                planned[name] = PlannedDeployment(
+                    name=name,
+                    contract_folder=contract_folder,
+                    contract_file=contract_file,
+                    ctor_args=args,
+                    as_blueprint=as_blueprint,
+                    initcode=initcode,
+                    address=get_create2_address(initcode, self.salt),
+                )
+                addresses[name] = planned[name].address
+                del remaining[name]
+                progress = True
+
+            if not progress:
+                raise ValueError(f"Reference cycle between contracts: {list(remaining)}")
+        return planned
+
+    def get_address_map(self) -> dict[str, str]:
+        """
+        Get addresses of all contracts of the plan, including already deployed ones
+        """
+        return {**self._deployed, **{name: planned.address for name, planned in self.plan().items()}}
+
+
+def get_create2_salt() -> bytes | None:
+    """
+    Get salt of deterministic deployments, None if contracts are deployed regularly
+    """
+    return _salt
+
+
+@contextmanager
+def create2_deployments(salt: bytes | None = CREATE2_SALT):
+    """
+    Deploy contracts that allow it (see can_deploy_via_create2) via CREATE2 deployer, so that their addresses
+    only depend on initcode and salt and are known before deployment.
+
+    Args:
+    salt (bytes | None): 32-byte salt, None for regular deploys
+    """
+    global _salt
+
+    _salt = salt
+    try:
+        yield
+    finally:
+        _salt = None
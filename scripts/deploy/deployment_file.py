@@ -1,37 +1,141 @@
+import copy
+import os
 import re
+import threading
 import time
+from contextlib import contextmanager
+from functools import wraps
 from pathlib import Path
 
 import yaml
-from boa.contracts.abi.abi_contract import ABIFunction
-from boa.contracts.vyper.vyper_contract import VyperContract
-from boa.util.abi import abi_encode
 from pydantic import BaseModel
 from pydantic.v1.utils import deep_update
 
 import scripts.deploy.models as DataModels
 from scripts.logging_config import get_logger
+from scripts.tracing import span
 from settings.config import BASE_DIR, settings
 from settings.models import ChainConfig
 
-from .utils import get_latest_commit_hash, get_relative_path
+from .utils import (
+    encode_constructor_args,
+    fetch_filename_from_version,
+    fetch_latest_contract,
+    get_github_url,
+    get_relative_path,
+    get_version_from_filename,
+    version_a_gt_version_b,
+)
 
 logger = get_logger()
 
 
+def synchronized(method):
+    # deployment steps may update the same deployment file from several threads
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
 class YamlDeploymentFile:
 
     def __init__(self, _file_path: Path):
         self.file_path = _file_path
         self.file_name = _file_path.stem
 
-    def get_deployment_config(self) -> DataModels.DeploymentConfig | None:
+        # in-memory state of the deployment file, written back on flush
+        self._data: dict | None = None
+        self._deployment_config: DataModels.DeploymentConfig | None = None
+        self._mtime: int | None = None
+        self._loaded = False
+        self._dirty: set[str] = set()
+        self._session_depth = 0
+        self._lock = threading.RLock()
+
+    def _get_file_mtime(self) -> int | None:
         if not self.file_path.exists():
             return None
-        with open(self.file_path, "r") as file:
-            deployments = yaml.safe_load(file)
+        return self.file_path.stat().st_mtime_ns
+
+    @synchronized
+    def _load(self) -> None:
+        # unflushed changes always win over file contents
+        if self._dirty:
+            return
+
+        mtime = self._get_file_mtime()
+        if self._loaded and mtime == self._mtime:
+            return
+
+        if mtime is None:
+            self._data, self._deployment_config = None, None
+        else:
+            with span("load", "yaml", file=self.file_path.name), open(self.file_path, "r") as file:
+                self._data = yaml.safe_load(file)
+                self._deployment_config = DataModels.DeploymentConfig.model_validate(self._data)
+
+        self._mtime = mtime
+        self._loaded = True
 
-        return DataModels.DeploymentConfig.model_validate(deployments)
+    @synchronized
+    def _set(self, data: dict, deployment_config: DataModels.DeploymentConfig, dirty_keys: set[str]) -> None:
+        self._data = data
+        self._deployment_config = deployment_config
+        self._loaded = True
+        self._dirty |= dirty_keys
+
+        if self._session_depth == 0:
+            self.flush()
+
+    @synchronized
+    def flush(self) -> None:
+        """
+        Atomically write pending changes to deployment file
+        """
+        if not self._dirty:
+            return
+
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.file_path.with_suffix(f".{os.getpid()}.tmp")
+        with span("flush", "yaml", file=self.file_path.name):
+            with open(tmp_path, "w") as file:
+                yaml.safe_dump(self._data, file)
+            os.replace(tmp_path, self.file_path)
+
+        logger.debug(f"Flushed {', '.join(sorted(self._dirty))} to {self.file_path}")
+        self._mtime = self._get_file_mtime()
+        self._dirty = set()
+
+    @contextmanager
+    def session(self):
+        """
+        Serve deployment from memory and defer writes to the end of the session.
+        Pending changes are flushed on exit even if session fails, call `flush` for intermediate checkpoints.
+        Sessions can be nested, only the outermost one flushes.
+        """
+        self._session_depth += 1
+        try:
+            yield self
+        finally:
+            self._session_depth -= 1
+            if self._session_depth == 0:
+                self.flush()
+
+    @synchronized
+    def _get_shared_deployment_config(self) -> DataModels.DeploymentConfig | None:
+        # in-memory state of the session, never handed out
+        self._load()
+        return self._deployment_config
+
+    def get_deployment_config(self) -> DataModels.DeploymentConfig | None:
+        """
+        Get copy of deployment config, changes to it never reach deployment file (use update_deployment_config)
+        """
+        deployment_config = self._get_shared_deployment_config()
+        return deployment_config.model_copy(deep=True) if deployment_config is not None else None
 
     def get_contract_deployment(self, config_keys: tuple) -> DataModels.Contract | None:
         """
@@ -40,9 +144,9 @@ class YamlDeploymentFile:
         Args:
         config_keys (list): A list of keys that define contract path
         Returns:
-        Contract | None: Contract if exits
+        Contract | None: Copy of contract if exits
         """
-        current_level = self.get_deployment_config()
+        current_level = self._get_shared_deployment_config()
         if current_level is None:
             return None
 
@@ -58,12 +162,13 @@ class YamlDeploymentFile:
                 current_level = getattr(current_level, key)
             else:
                 return None
-        return current_level
+        return copy.deepcopy(current_level)
 
+    @synchronized
     def save_deployment_config(self, deployment: DataModels.DeploymentConfig) -> None:
-        with open(self.file_path, "w") as file:
-            yaml.safe_dump(deployment.model_dump(), file)
+        self._set(deployment.model_dump(), deployment, {"*"})
 
+    @synchronized
     def update_deployment_config(self, data: dict) -> None:
         """
         Update whole deployment
@@ -71,17 +176,16 @@ class YamlDeploymentFile:
         Args:
         data (dict): Data of any size for updating deployment (should have same nested values)
         """
-        deployment_config = self.get_deployment_config()
+        deployment_config = self._get_shared_deployment_config()
         if deployment_config is not None:
             updated_deployment_config = deep_update(deployment_config.model_dump(), data)
         else:
             updated_deployment_config = data
 
         # Validate data
-        DataModels.DeploymentConfig.model_validate(updated_deployment_config)
+        validated_deployment_config = DataModels.DeploymentConfig.model_validate(updated_deployment_config)
 
-        with open(self.file_path, "w") as file:
-            yaml.safe_dump(updated_deployment_config, file)
+        self._set(updated_deployment_config, validated_deployment_config, set(data.keys()))
 
     @staticmethod
     def ensure_nested_dict(d: dict, keys: tuple) -> dict:
@@ -101,15 +205,16 @@ class YamlDeploymentFile:
             d = d[key]
         return d
 
+    @synchronized
     def update_contract_deployment(
         self,
         contract_path: Path,
-        contract_object: VyperContract,
+        contract_object,
         ctor_args: tuple,
         chain_settings: ChainConfig,
         as_blueprint: bool = False,
     ):
-        deployment_config_dict = self.get_deployment_config().model_dump()
+        deployment_config_dict = self._get_shared_deployment_config().model_dump()
         contract_path_keys = contract_path.parts[contract_path.parts.index("contracts") : -1]
 
         # fill nested keys if they don't exist and return the innermost nest based on contract_folder:
@@ -117,11 +222,7 @@ class YamlDeploymentFile:
 
         # get abi-encoded ctor args:
         if ctor_args:
-            ctor_abi_object = ABIFunction(
-                next(i for i in contract_object.abi if i["type"] == "constructor"), contract_name="ctor_abi"
-            )
-            abi_args = ctor_abi_object._merge_kwargs(*ctor_args)
-            encoded_args = abi_encode(ctor_abi_object.signature, abi_args).hex()
+            encoded_args = encode_constructor_args(contract_object.abi, ctor_args).hex()
         else:
             encoded_args = None
 
@@ -136,13 +237,9 @@ class YamlDeploymentFile:
         else:
             raise ValueError("Compiler Version is set incorrectly")
 
-        # latest git commit hash:
-        latest_git_commit_for_file = get_latest_commit_hash(contract_object.filename)
+        # github url at latest git commit:
         contract_relative_path = get_relative_path(contract_path)
-        github_url = (
-            f"https://github.com/curvefi/curve-lite/blob/{latest_git_commit_for_file}/"
-            f"{'/'.join(contract_relative_path.parts[1:])}"
-        )
+        github_url = get_github_url(contract_object.filename)
 
         optimisation_level = "UNKNOWN"  # it's not in VVM contract, backward compatibility
         pattern = r"# pragma optimize ([a-z]+)"
@@ -152,16 +249,17 @@ class YamlDeploymentFile:
 
         evm_version = chain_settings.evm_version
 
-        if not as_blueprint:
-            version = contract_object.version().strip()
-        else:
-            pattern = 'version: public\(constant\(String\[8\]\)\) = "([\d.]+)"'
-            match = re.search(pattern, source_code)
+        # version constant is read from source, so that contract doesn't need to be mined yet
+        pattern = r'version: public\(constant\(String\[\d+\]\)\) = "(v?[\d.]+)"'
+        match = re.search(pattern, source_code)
+        if match:
+            version = match.group(1)
+        elif not as_blueprint:
+            from .multicall import call
 
-            if match:
-                version = match.group(1)
-            else:
-                raise ValueError("Contract version is set incorrectly")
+            version = call(contract_object.version).strip()
+        else:
+            raise ValueError("Contract version is set incorrectly")
 
         # store contract deployment metadata:
         contract_deployment.update(
@@ -181,7 +279,11 @@ class YamlDeploymentFile:
             }
         )
 
-        self.save_deployment_config(DataModels.DeploymentConfig.model_validate(deployment_config_dict))
+        self._set(
+            deployment_config_dict,
+            DataModels.DeploymentConfig.model_validate(deployment_config_dict),
+            {".".join(contract_path_keys)},
+        )
 
     def dump_initial_chain_settings(self, chain_settings: ChainConfig):
         update_parameters = {
@@ -192,13 +294,13 @@ class YamlDeploymentFile:
         self.update_deployment_config(update_parameters)
 
     def get_deployed_contracts(self):
-        contracts = self.get_deployment_config().contracts
+        contracts = self._get_shared_deployment_config().contracts
         contract_info = []
 
         def process_contracts(obj, path):
             if isinstance(obj, DataModels.Contract):
                 contract_info.append(
-                    {"contract": obj.get_contract(), "is_blueprint": obj.deployment_type == "blueprint"}
+                    {"name": path, "contract": obj.get_contract(), "is_blueprint": obj.deployment_type == "blueprint"}
                 )
             elif isinstance(obj, BaseModel):
                 for field_name, _ in obj.__fields__.items():
@@ -208,10 +310,54 @@ class YamlDeploymentFile:
         return contract_info
 
 
+def get_contract_to_deploy(
+    deployment_file: YamlDeploymentFile, contract_folder: Path, deploy_contract_version: str = "v_000"
+) -> tuple[Path, DataModels.Contract | None]:
+    """
+    Decide whether contract has to be (re)deployed, based on versions in repo and in deployment file only
+
+    Args:
+    deployment_file (YamlDeploymentFile): Deployment file of the chain
+    contract_folder (Path): Folder with all versions of the contract
+    deploy_contract_version (str): Version to deploy, "v_000" for the latest one
+    Returns:
+    tuple[Path, Contract | None]: Contract file to deploy (or latest one) and existing deployment
+    if it is up to date (None if contract has to be deployed)
+    """
+    if deploy_contract_version != "v_000":
+        return fetch_filename_from_version(contract_folder, deploy_contract_version), None
+
+    # fetch latest contract
+    latest_contract = fetch_latest_contract(contract_folder)
+    version_latest_contract = get_version_from_filename(latest_contract)
+
+    # check if it has been deployed already
+    parts = contract_folder.parts
+    yaml_keys = contract_folder.parts[parts.index("contracts") :]
+    deployed_contract = deployment_file.get_contract_deployment(yaml_keys)
+
+    # if deployed, fetch deployed version
+    deployed_contract_version = "0.0.0"  # contract has never been deployed
+    if deployed_contract:
+        deployed_contract_version = deployed_contract.contract_version  # contract has been deployed
+
+    # deploy contract if nothing has been deployed, or if deployed contract is old
+    if version_a_gt_version_b(version_latest_contract, deployed_contract_version):
+        return latest_contract, None
+    return latest_contract, deployed_contract
+
+
+_deployment_files: dict[Path, YamlDeploymentFile] = {}
+
+
 def get_deployment_obj(chain_settings: ChainConfig) -> YamlDeploymentFile:
     config_filepath: Path = Path(chain_settings.file_path)
     deployment_file: str = chain_settings.file_path
     if settings.DEBUG:
         deployment_file = f"debug/{config_filepath.stem}.yaml"
     deployment_file_path = Path(BASE_DIR, "deployments", deployment_file)
-    return YamlDeploymentFile(deployment_file_path)
+
+    # share one in-memory deployment per file within the process
+    if deployment_file_path not in _deployment_files:
+        _deployment_files[deployment_file_path] = YamlDeploymentFile(deployment_file_path)
+    return _deployment_files[deployment_file_path]
@@ -3,23 +3,23 @@ import os
 from pathlib import Path
 
 import boa
-from eth_utils import keccak
+from boa.network import NetworkEnv
 
-from scripts.deploy.deployment_file import YamlDeploymentFile, get_deployment_obj
+from scripts.deploy.deployment_file import YamlDeploymentFile, get_contract_to_deploy, get_deployment_obj
 from scripts.deploy.models import PoolType
 from scripts.deploy.presets import CryptoPoolPresets
 from scripts.logging_config import get_logger
 from settings.config import BASE_DIR, settings
 from settings.models import ChainConfig
 
+from .abi import get_contract_at
+from .compiler import load_partial
 from .constants import CREATE2_SALT, CREATE2DEPLOYER_ABI, CREATE2DEPLOYER_ADDRESS
-from .utils import (
-    fetch_filename_from_version,
-    fetch_latest_contract,
-    get_relative_path,
-    get_version_from_filename,
-    version_a_gt_version_b,
-)
+from .create2 import Create2Planner, Ref, can_deploy_via_create2, get_create2_address, get_create2_salt
+from .journal import journaling_deployment
+from .scheduler import run_on_graph_thread
+from .transactions import after_mined, deploy, transact
+from .utils import get_initcode, get_relative_path, get_version_from_filename
 
 logger = get_logger()
 
@@ -47,50 +47,50 @@ def deploy_contract(
 
     # ---------------------------------------------- FETCH CONTRACT ----------------------------------------------
 
-    if deploy_contract_version != "v_000":
-
-        contract_to_deploy = fetch_filename_from_version(contract_folder, deploy_contract_version)
-
-    else:
-
-        # fetch latest contract
-        latest_contract = fetch_latest_contract(contract_folder)
-        version_latest_contract = get_version_from_filename(latest_contract)
-
-        # check if it has been deployed already
-        parts = contract_folder.parts
-        yaml_keys = contract_folder.parts[parts.index("contracts") :]
-        contract_designation = parts[-1]
-        deployed_contract = deployment_file.get_contract_deployment(yaml_keys)
-
-        # if deployed, fetch deployed version
-        deployed_contract_version = "0.0.0"  # contract has never been deployed
-        if deployed_contract:
-            deployed_contract_version = deployed_contract.contract_version  # contract has been deployed
+    contract_to_deploy, deployed_contract = get_contract_to_deploy(
+        deployment_file, contract_folder, deploy_contract_version
+    )
+    if deployed_contract is not None:
+        # return contract object of existing deployment
+        logger.info(
+            f"{contract_folder.parts[-1]} contract already deployed at {deployed_contract.address}. Fetching ..."
+        )
+        return get_contract_at(contract_to_deploy, deployed_contract.address, chain_settings.evm_version)
+
+    logger.info(
+        f"Deploying {os.path.basename(contract_to_deploy)} version {get_version_from_filename(contract_to_deploy)}"
+    )
 
-        # deploy contract if nothing has been deployed, or if deployed contract is old
-        if version_a_gt_version_b(version_latest_contract, deployed_contract_version):
+    # ---------------------------------------------------- DEPLOY ----------------------------------------------------
+    contract_deployer = load_partial(contract_to_deploy, chain_settings.evm_version)
 
-            logger.info(f"Deploying {os.path.basename(latest_contract)} version {version_latest_contract}")
-            contract_to_deploy = latest_contract
+    salt = get_create2_salt()
+    if salt is not None and not can_deploy_via_create2(contract_to_deploy, as_blueprint):
+        salt = None
 
+    with journaling_deployment(contract_to_deploy, args, as_blueprint, salt):
+        if salt is not None:
+            deployed_contract = deploy_via_create2(contract_deployer, *args, as_blueprint=as_blueprint, salt=salt)
         else:
+            deployed_contract = deploy(contract_deployer, *args, as_blueprint=as_blueprint)
 
-            # return contract object of existing deployment
-            logger.info(
-                f"{contract_designation} contract already deployed at {deployed_contract.address}. Fetching ..."
-            )
-            return boa.load_partial(latest_contract, compiler_args={"evm_version": chain_settings.evm_version}).at(
-                deployed_contract.address
-            )
+    _store_deployment(
+        chain_settings, contract_folder, contract_to_deploy, contract_deployer, deployed_contract, args, as_blueprint
+    )
 
-    # ---------------------------------------------------- DEPLOY ----------------------------------------------------
-    contract_deployer = boa.load_partial(contract_to_deploy, compiler_args={"evm_version": chain_settings.evm_version})
+    return deployed_contract
 
-    if not as_blueprint:
-        deployed_contract = contract_deployer.deploy(*args)
-    else:
-        deployed_contract = contract_deployer.deploy_as_blueprint(*args)
+
+def _store_deployment(
+    chain_settings: ChainConfig,
+    contract_folder: Path,
+    contract_to_deploy: Path,
+    contract_deployer,
+    deployed_contract,
+    args: tuple,
+    as_blueprint: bool,
+):
+    deployment_file = get_deployment_obj(chain_settings)
 
     # store abi
     relpath = get_relative_path(contract_folder / os.path.basename(contract_to_deploy))
@@ -110,34 +110,151 @@ def deploy_contract(
             json.dump(contract_deployer.abi, abi_file, indent=4)
             abi_file.write("\n")
 
-    # update deployment yaml file
-    deployment_file.update_contract_deployment(
-        contract_to_deploy,
-        deployed_contract,
-        args,
-        chain_settings,
-        as_blueprint=as_blueprint,
+    # update deployment yaml file once contract is created, so that flushed deployment never has unmined addresses
+    after_mined(
+        lambda: deployment_file.update_contract_deployment(
+            contract_to_deploy,
+            deployed_contract,
+            args,
+            chain_settings,
+            as_blueprint=as_blueprint,
+        )
     )
 
-    return deployed_contract
+
+def plan_contract(
+    planner: Create2Planner,
+    chain_settings: ChainConfig,
+    name: str,
+    contract_folder: Path,
+    *args,
+    as_blueprint: bool = False,
+    deploy_contract_version: str = "v_000",
+) -> Ref | None:
+    """
+    Add contract to CREATE2 plan, unless its deployment in deployment file is up to date.
+    Contracts that can't be deployed via CREATE2 deployer (see can_deploy_via_create2) are left out of the plan.
+
+    Args:
+    planner (Create2Planner): Plan of deterministic deployments
+    chain_settings (ChainConfig): Chain the plan is deployed to
+    name (str): Unique name of the contract in the plan
+    contract_folder (Path): Folder with all versions of the contract
+    args: Constructor arguments, `Ref` for addresses of other planned contracts
+    as_blueprint (bool): Deploy as ERC-5202 blueprint
+    deploy_contract_version (str): Version to deploy, "v_000" for the latest one
+    Returns:
+    Ref | None: Reference to the contract for constructor args of other contracts, None if it is left out
+    """
+    contract_to_deploy, deployed_contract = get_contract_to_deploy(
+        get_deployment_obj(chain_settings), contract_folder, deploy_contract_version
+    )
+    if deployed_contract is not None:
+        return planner.add_deployed(name, deployed_contract.address)
+    if not can_deploy_via_create2(contract_to_deploy, as_blueprint):
+        return None
+    return planner.add(
+        name, contract_folder, *args, as_blueprint=as_blueprint, deploy_contract_version=deploy_contract_version
+    )
 
 
-def deploy_via_create2(chain_settings: ChainConfig, contract_file, abi_encoded_ctor="", is_blueprint=False):
-    create2deployer = boa.loads_abi(CREATE2DEPLOYER_ABI).at(CREATE2DEPLOYER_ADDRESS)
-    contract_obj = boa.load_partial(contract_file, compiler_args={"evm_version": chain_settings.evm_version})
-    compiled_bytecode = contract_obj.compiler_data.bytecode
-    deployment_bytecode = compiled_bytecode + abi_encoded_ctor
-    if is_blueprint:
-        blueprint_preamble = b"\xFE\x71\x00"
-        # Add blueprint preamble to disable calling the contract:
-        blueprint_bytecode = blueprint_preamble + deployment_bytecode
-        # Add code for blueprint deployment:
-        len_blueprint_bytecode = len(blueprint_bytecode).to_bytes(2, "big")
-        deployment_bytecode = b"\x61" + len_blueprint_bytecode + b"\x3d\x81\x60\x0a\x3d\x39\xf3" + blueprint_preamble
-
-    precomputed_address = create2deployer.computeAddress(CREATE2_SALT, keccak(deployment_bytecode))
-    create2deployer.deploy(0, CREATE2_SALT, deployment_bytecode)
-    return contract_obj.at(precomputed_address)
+def has_code(code: str | None) -> bool:
+    """
+    Check eth_getCode result: accounts without code return "0x" (or "0x0" on some nodes)
+    """
+    return code not in (None, "0x", "0x0")
+
+
+def get_deployed_addresses(addresses: list[str]) -> set[str]:
+    """
+    Get addresses that have code, read in one batch on network
+    """
+    if not isinstance(boa.env, NetworkEnv):
+        return {address for address in addresses if is_deployed(address)}
+
+    codes = boa.env._rpc.fetch_multi([("eth_getCode", [address, "latest"]) for address in addresses])
+    return {address for address, code in zip(addresses, codes) if has_code(code)}
+
+
+def deploy_planned(chain_settings: ChainConfig, planner: Create2Planner) -> dict[str, str]:
+    """
+    Deploy planned contracts via CREATE2 deployer and record them in deployment file.
+    Addresses are known upfront, so deployments don't wait for each other: transactions go out back to back
+    (pipelined with managed transactions), contracts that already have code are only recorded.
+
+    Args:
+    chain_settings (ChainConfig): Chain to deploy to
+    planner (Create2Planner): Plan of deterministic deployments
+    Returns:
+    dict[str, str]: Addresses of all contracts of the plan
+    """
+    planned = planner.plan()
+    deployed = get_deployed_addresses([deployment.address for deployment in planned.values()])
+    create2deployer = run_on_graph_thread(
+        lambda: boa.loads_abi(CREATE2DEPLOYER_ABI, name="Create2Deployer").at(CREATE2DEPLOYER_ADDRESS)
+    )
+
+    for deployment in planned.values():
+        contract_deployer = load_partial(deployment.contract_file, chain_settings.evm_version)
+        if deployment.address in deployed:
+            logger.info(f"{contract_deployer.name} is already deployed via CREATE2 at {deployment.address}")
+        else:
+            logger.info(f"Deploying {contract_deployer.name} via CREATE2 to {deployment.address}")
+            with journaling_deployment(
+                deployment.contract_file, deployment.ctor_args, deployment.as_blueprint, planner.salt
+            ):
+                transact(create2deployer.deploy, 0, planner.salt, deployment.initcode)
+
+        address = deployment.address
+        deployed_contract = run_on_graph_thread(lambda: contract_deployer.at(address, nowarn=True))
+        _store_deployment(
+            chain_settings,
+            deployment.contract_folder,
+            deployment.contract_file,
+            contract_deployer,
+            deployed_contract,
+            deployment.ctor_args,
+            deployment.as_blueprint,
+        )
+
+    return planner.get_address_map()
+
+
+def is_deployed(address: str) -> bool:
+    """
+    Check if address has code. On network it is a plain eth_getCode, fork is read on the thread owning boa env.
+    """
+    if isinstance(boa.env, NetworkEnv):
+        return has_code(boa.env._rpc.fetch("eth_getCode", [address, "latest"]))
+    return len(run_on_graph_thread(lambda: boa.env.get_code(address))) > 0
+
+
+def deploy_via_create2(contract_deployer, *args, as_blueprint: bool = False, salt: bytes = CREATE2_SALT):
+    """
+    Deploy contract (or its blueprint) via CREATE2 deployer at address computed locally from initcode and salt.
+    Contract with the same initcode and salt is deployed only once, existing one is returned.
+
+    Args:
+    contract_deployer: boa deployer of the contract
+    args: Constructor arguments
+    as_blueprint (bool): Deploy as ERC-5202 blueprint
+    salt (bytes): 32-byte salt
+    Returns:
+    Contract handle at deployed address
+    """
+    initcode = get_initcode(contract_deployer, args, as_blueprint)
+    address = get_create2_address(initcode, salt)
+    if is_deployed(address):
+        logger.info(f"{contract_deployer.name} is already deployed via CREATE2 at {address}")
+    else:
+        logger.info(f"Deploying {contract_deployer.name} via CREATE2 to {address}")
+        create2deployer = run_on_graph_thread(
+            lambda: boa.loads_abi(CREATE2DEPLOYER_ABI, name="Create2Deployer").at(CREATE2DEPLOYER_ADDRESS)
+        )
+        transact(create2deployer.deploy, 0, salt, initcode)
+
+    # handle creation reads code through boa env, local fork may lag behind the chain, don't warn about missing code
+    return run_on_graph_thread(lambda: contract_deployer.at(address, nowarn=True))
 
 
 def deploy_pool(
@@ -2,6 +2,8 @@ from pathlib import Path
 
 from scripts.deploy.constants import ROOT_GAUGE_FACTORY, ROOT_GAUGE_IMPLEMENTATION, ZERO_ADDRESS
 from scripts.deploy.deployment_utils import deploy_contract
+from scripts.deploy.multicall import Multicall
+from scripts.deploy.transactions import transact
 from scripts.logging_config import get_logger
 from settings.config import BASE_DIR
 from settings.models import ChainConfig
@@ -25,17 +27,19 @@ def deploy_liquidity_gauge_infra(chain_settings: ChainConfig):
         child_gauge_factory.address,
     )
 
+    with Multicall(chain_settings.multicall3) as multicall:
+        current_implementation = multicall.add(child_gauge_factory.get_implementation)
+        crv_address = multicall.add(child_gauge_factory.crv)
+
     # set child gauge implementation on the child gauge factory
-    current_implementation = child_gauge_factory.get_implementation()
-    if not current_implementation == child_gauge_implementation.address:
-        logger.info(f"Current liquidity child gauge implementation: {current_implementation}")
-        child_gauge_factory.set_implementation(child_gauge_implementation.address)
+    if not current_implementation.value == child_gauge_implementation.address:
+        logger.info(f"Current liquidity child gauge implementation: {current_implementation.value}")
+        transact(child_gauge_factory.set_implementation, child_gauge_implementation.address)
         logger.info(f"Set liquidity child gauge implementation to {child_gauge_implementation.address}.")
 
     if chain_settings.dao and chain_settings.dao.crv:
-        crv_address = child_gauge_factory.crv()
-        if crv_address != chain_settings.dao.crv:
-            child_gauge_factory.set_crv(chain_settings.dao.crv)
+        if crv_address.value != chain_settings.dao.crv:
+            transact(child_gauge_factory.set_crv, chain_settings.dao.crv)
 
     logger.info("Liquidity Gauge Factory infra deployed.")
 
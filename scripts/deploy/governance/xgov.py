@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 
 import boa
@@ -5,7 +6,9 @@ import boa
 from scripts.deploy.constants import BROADCASTERS
 from scripts.deploy.deployment_file import get_deployment_obj
 from scripts.deploy.deployment_utils import deploy_contract, update_deployment_chain_config
-from scripts.deploy.utils import get_relative_path
+from scripts.deploy.multicall import Multicall
+from scripts.deploy.transactions import transact
+from scripts.deploy.utils import get_agent_version
 from scripts.logging_config import get_logger
 from settings.config import BASE_DIR
 from settings.models import ChainConfig, RollupType
@@ -13,23 +16,17 @@ from settings.models import ChainConfig, RollupType
 logger = get_logger()
 
 
-def deploy_xgov(chain_settings: ChainConfig):
+def get_relayer_args(chain_settings: ChainConfig, agent_blueprint) -> tuple:
+    """
+    Get constructor arguments of relayer
 
+    Args:
+    chain_settings (ChainConfig): Chain settings
+    agent_blueprint: Address of agent blueprint (or its reference in CREATE2 plan)
+    Returns:
+    tuple: Constructor arguments
+    """
     rollup_type = chain_settings.rollup_type
-
-    # for specific rollup types we shall deploy v_100 agent since it is
-    # vyper 0.3.10:
-    version_to_deploy = "v_000"  # just deploy latest version!
-    if rollup_type in ["arb_orbit", "op_stack", "polygon_cdk"]:
-        version_to_deploy = "v_100"
-
-    agent_blueprint = deploy_contract(
-        chain_settings,
-        Path(BASE_DIR, "contracts", "governance", "agent"),
-        as_blueprint=True,
-        deploy_contract_version=version_to_deploy,
-    )
-
     match rollup_type:
         case RollupType.op_stack:
             r_args = ("0x4200000000000000000000000000000000000007",)  # messenger
@@ -49,34 +46,50 @@ def deploy_xgov(chain_settings: ChainConfig):
             raise NotImplementedError(f"{rollup_type} currently not supported")
 
     if rollup_type == RollupType.not_rollup:
-        args = (
-            agent_blueprint.address,
-            *r_args,
-        )
-    else:
-        args = (
-            BROADCASTERS[rollup_type],
-            agent_blueprint.address,
+        return (
+            agent_blueprint,
             *r_args,
         )
+    return (
+        BROADCASTERS[rollup_type],
+        agent_blueprint,
+        *r_args,
+    )
+
+
+def deploy_xgov(chain_settings: ChainConfig):
+
+    agent_blueprint = deploy_contract(
+        chain_settings,
+        Path(BASE_DIR, "contracts", "governance", "agent"),
+        as_blueprint=True,
+        deploy_contract_version=get_agent_version(chain_settings.rollup_type),
+    )
+
+    args = get_relayer_args(chain_settings, agent_blueprint.address)
 
     relayer = deploy_contract(
         chain_settings,
         Path(BASE_DIR, "contracts", "governance", "relayer", chain_settings.rollup_type),
         *args,
     )
+    with Multicall(chain_settings.multicall3) as multicall:
+        ownership_agent = multicall.add(relayer.OWNERSHIP_AGENT)
+        parameter_agent = multicall.add(relayer.PARAMETER_AGENT)
+        emergency_agent = multicall.add(relayer.EMERGENCY_AGENT)
+
     update_deployment_chain_config(
         chain_settings,
         {
             "dao": {
-                "emergency_admin": str(relayer.EMERGENCY_AGENT()),
-                "ownership_admin": str(relayer.OWNERSHIP_AGENT()),
-                "parameter_admin": str(relayer.PARAMETER_AGENT()),
+                "emergency_admin": str(emergency_agent.value),
+                "ownership_admin": str(ownership_agent.value),
+                "parameter_admin": str(parameter_agent.value),
             }
         },
     )
 
-    return relayer.OWNERSHIP_AGENT(), relayer.PARAMETER_AGENT(), relayer.EMERGENCY_AGENT()
+    return ownership_agent.value, parameter_agent.value, emergency_agent.value
 
 
 def deploy_dao_vault(chain_settings: ChainConfig, owner: str):
@@ -85,30 +98,87 @@ def deploy_dao_vault(chain_settings: ChainConfig, owner: str):
     return vault
 
 
-def transfer_ownership(chain_settings):
+def _read_owners(multicall_address: str, contracts: dict[str, tuple]) -> dict[str, str | None]:
+    # one batch for all contracts, getters that revert are reported as None
+    with Multicall(multicall_address) as multicall:
+        owners = {name: multicall.add(getter, allow_failure=True) for name, (_, getter) in contracts.items()}
+    return {name: str(owner.value) if owner.success else None for name, owner in owners.items()}
+
 
+def get_ownership_report_path(chain_settings: ChainConfig) -> Path:
+    return get_deployment_obj(chain_settings).file_path.with_suffix(".ownership.json")
+
+
+def transfer_ownership(chain_settings: ChainConfig) -> dict:
+    """
+    Transfer ownership of all deployed contracts to ownership admin in two phases: owners of all contracts
+    are read in one multicall batch, then `set_owner` is sent (pipelined) only where owner differs.
+    Contracts whose owner getter reverted are skipped and listed as `unread` in the report.
+    Owners before and after transfer are written to `{chain_name}.ownership.json` next to deployment file.
+
+    Args:
+    chain_settings (ChainConfig): Chain settings
+    Returns:
+    dict: Ownership report
+    """
     deployment_file = get_deployment_obj(chain_settings)
     deployment_config = deployment_file.get_deployment_config()
     if deployment_config is None:
         raise ValueError(f"Deployment config not found for {chain_settings.network_name}")
 
-    deployments = deployment_file.get_deployed_contracts()
     owner = chain_settings.dao.ownership_admin
 
-    for deployment in deployments:
+    # contracts with an owner getter, blueprints can't be called
+    contracts = {}
+    for deployment in deployment_file.get_deployed_contracts():
         contract = deployment["contract"]
-        is_blueprint = deployment["is_blueprint"]
-        if is_blueprint:
+        if deployment["is_blueprint"]:
             continue
-
-        deployment_name = get_relative_path(contract.contract_name)
-        deployment_address = contract.address
-
-        for attr in ("admin", "owner"):
-            if hasattr(contract, attr):
-                current_owner = getattr(contract, attr)()
-                if current_owner != owner:
-                    logger.info(f"Current {deployment_name} ({deployment_address}) owner: {current_owner}")
-                    contract.set_owner(owner)
-                    logger.info(f"Set {deployment_name} owner to {owner}.")
-                break
+        getter = next((getattr(contract, attr) for attr in ("admin", "owner") if hasattr(contract, attr)), None)
+        if getter is not None:
+            contracts[deployment["name"]] = (contract, getter)
+
+    owners_before = _read_owners(chain_settings.multicall3, contracts)
+
+    transferred, unread = [], []
+    for name, (contract, getter) in contracts.items():
+        current_owner = owners_before[name]
+        if current_owner is None:
+            # never send transactions based on a failed read
+            logger.warning(f"Couldn't read {getter.name} of {name} ({contract.address}), ownership not transferred")
+            unread.append(name)
+            continue
+        if current_owner.lower() == owner.lower():
+            continue
+        logger.info(f"Current {name} ({contract.address}) owner: {current_owner}")
+        transact(contract.set_owner, owner)
+        transferred.append(name)
+
+    # multicall waits for receipts of the transactions sent above
+    owners_after = _read_owners(chain_settings.multicall3, contracts) if transferred else owners_before
+    logger.info(f"Set owner of {len(transferred)} out of {len(contracts)} contracts to {owner}.")
+    if unread:
+        logger.warning(f"Owner of {len(unread)} contracts couldn't be read: {unread}")
+
+    report = {
+        "owner": owner,
+        "unread": unread,
+        "contracts": {
+            name: {
+                "address": str(contract.address),
+                "getter": getter.name,
+                "owner_before": owners_before[name],
+                "owner_after": owners_after[name],
+                "transferred": name in transferred,
+                "unread": name in unread,
+            }
+            for name, (contract, getter) in contracts.items()
+        },
+    }
+    for name in transferred:
+        if (owners_after[name] or "").lower() != owner.lower():
+            logger.warning(f"{name} owner is {owners_after[name]} after transfer to {owner}")
+
+    with open(get_ownership_report_path(chain_settings), "w") as file:
+        json.dump(report, file, indent=4)
+    return report
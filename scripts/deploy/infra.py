@@ -0,0 +1,354 @@
+import os
+from pathlib import Path
+
+from scripts.logging_config import get_logger
+from scripts.network import get_fork_block_number, get_gas_price
+from scripts.tests.post_deploy import test_post_deploy
+from scripts.tests.pre_deployment import test_pre_deploy
+from scripts.tracing import span
+from settings.config import BASE_DIR, get_chain_settings, settings
+from settings.models import ChainConfig, RollupType
+
+from .amm.stableswap import deploy_stableswap
+from .amm.tricrypto import deploy_tricrypto
+from .amm.twocrypto import deploy_twocrypto
+from .compiler import precompile_contracts
+from .constants import CREATE2_SALT, CREATE2DEPLOYER_ADDRESS
+from .costs import CostReport, recording_costs
+from .create2 import Create2Planner, create2_deployments
+from .deployment_utils import (
+    deploy_planned,
+    dump_initial_chain_settings,
+    get_deployment_config,
+    get_deployment_obj,
+    is_deployed,
+    plan_contract,
+)
+from .gauge.child_gauge import deploy_liquidity_gauge_infra
+from .governance.xgov import deploy_dao_vault, deploy_xgov, get_relayer_args, transfer_ownership
+from .helpers.deposit_and_stake_zap import deploy_deposit_and_stake_zap
+from .helpers.rate_provider import deploy_rate_provider
+from .helpers.router import deploy_router
+from .helpers.stable_swap_meta_zap import deploy_stable_swap_meta_zap
+from .journal import DeploymentJournal
+from .registries.address_provider import deploy_address_provider, update_address_provider
+from .registries.metaregistry import deploy_metaregistry, update_metaregistry
+from .scheduler import DeployGraph
+from .transactions import managed_transactions
+from .utils import get_agent_version
+
+logger = get_logger()
+
+
+def get_fork_block(chain_config_file: str, fork_latest: bool = False) -> int | None:
+    """
+    Get block to fork the chain at in debug mode: rehearsals fork the same block as the previous one, so that fork
+    reads hit the disk cache
+
+    Args:
+    chain_config_file (str): Chain config file relative to settings/chains
+    fork_latest (bool): Fork latest block instead of the block pinned in debug deployment file
+    Returns:
+    int | None: Block number, None for latest
+    """
+    if not settings.DEBUG or fork_latest:
+        return None
+    previous_deployment = get_deployment_config(get_chain_settings(chain_config_file))
+    return previous_deployment.fork_block if previous_deployment is not None else None
+
+
+def plan_create2_deployments(chain_settings: ChainConfig, with_xgov: bool = True) -> Create2Planner:
+    """
+    Plan contracts of `deploy all` that are deployed via CREATE2 deployer before the steps using them:
+    blueprints and contracts whose constructor args are known upfront or are addresses of other planned contracts
+
+    Args:
+    chain_settings (ChainConfig): Chain settings
+    with_xgov (bool): Plan agent blueprint and relayer as well
+    Returns:
+    Create2Planner: Plan with addresses resolved from initcode
+    """
+    planner = Create2Planner(chain_settings.evm_version)
+    contracts_dir = Path(BASE_DIR, "contracts")
+
+    if with_xgov:
+        agent_blueprint = plan_contract(
+            planner,
+            chain_settings,
+            "agent",
+            Path(contracts_dir, "governance", "agent"),
+            as_blueprint=True,
+            deploy_contract_version=get_agent_version(chain_settings.rollup_type),
+        )
+        plan_contract(
+            planner,
+            chain_settings,
+            "relayer",
+            Path(contracts_dir, "governance", "relayer", chain_settings.rollup_type),
+            *get_relayer_args(chain_settings, agent_blueprint),
+        )
+
+    for amm in ("stableswap", "tricryptoswap", "twocryptoswap"):
+        plan_contract(planner, chain_settings, f"{amm}.math", Path(contracts_dir, "amm", amm, "math"))
+        plan_contract(planner, chain_settings, f"{amm}.views", Path(contracts_dir, "amm", amm, "views"))
+        plan_contract(
+            planner,
+            chain_settings,
+            f"{amm}.implementation",
+            Path(contracts_dir, "amm", amm, "implementation"),
+            as_blueprint=True,
+        )
+    plan_contract(
+        planner,
+        chain_settings,
+        "stableswap.meta_implementation",
+        Path(contracts_dir, "amm", "stableswap", "meta_implementation"),
+        as_blueprint=True,
+    )
+
+    plan_contract(
+        planner,
+        chain_settings,
+        "router",
+        Path(contracts_dir, "helpers", "router"),
+        chain_settings.wrapped_native_token,
+        chain_settings.native_token,
+    )
+    plan_contract(
+        planner, chain_settings, "deposit_and_stake_zap", Path(contracts_dir, "helpers", "deposit_and_stake_zap")
+    )
+    plan_contract(
+        planner, chain_settings, "stable_swap_meta_zap", Path(contracts_dir, "helpers", "stable_swap_meta_zap")
+    )
+    return planner
+
+
+def deploy_all(
+    chain_config_file: str,
+    fresh: bool = False,
+    workers: int = 4,
+    max_in_flight: int = 1,
+    create2: bool = False,
+) -> dict:
+    """
+    Deploy and test all infra on the chain of current boa env. In debug mode the env is a fork set up at the block
+    of get_fork_block
+
+    Args:
+    chain_config_file (str): Chain config file relative to settings/chains
+    fresh (bool): Ignore unfinished deployment in journal
+    workers (int): Number of deployment steps running concurrently
+    max_in_flight (int): Number of transactions sent without waiting for receipt
+    create2 (bool): Deploy contracts that allow it via CREATE2 deployer (see can_deploy_via_create2). Addresses of
+        planned ones (see plan_create2_deployments) are computed upfront and their transactions are sent together
+        before any other step
+    Returns:
+    dict: Cost summary of the deployment
+    """
+    # in case we have a few deployed contracts not deployed via curve-core
+    # we will ignore them, e.g. relayer, agent blueprint etc. needed for testing
+    # xgov.
+    ignore_tests = []
+    chain_settings = get_chain_settings(chain_config_file)
+    if chain_settings.rollup_type == RollupType.zksync:
+        raise NotImplementedError("zksync currently not supported")
+
+    # compile everything upfront, so that deployment only reads the compilation cache
+    with span("compile", "phase"):
+        precompile_contracts(chain_settings.evm_version)
+
+    # If we are in debug mode, we want to remove the existing deployment file
+    # so that there are no errors while trying to fetch state from a non-existent forked deployment
+    fork_block = None
+    if settings.DEBUG:
+
+        # pinned in debug deployment file for the next rehearsal
+        fork_block = get_fork_block_number()
+
+        # create debug filepath
+        debug_filepath = Path(BASE_DIR, "deployments", "debug")
+        if not debug_filepath.exists():
+            os.mkdir(debug_filepath)
+
+        deployment_file_path = Path(BASE_DIR, "deployments", "debug", f"{chain_settings.file_name}.yaml")
+        if deployment_file_path.exists():
+            logger.info(f"Removing existing deployment file {deployment_file_path} for debug deployment")
+            deployment_file_path.unlink()
+
+        # forked state is gone as well, nothing to resume
+        fresh = True
+
+        # forked env is not thread-safe
+        workers = 1
+
+    # pre-deployment tests:
+    test_pre_deploy(chain_settings.chain_id)
+    if create2 and not is_deployed(CREATE2DEPLOYER_ADDRESS):
+        raise ValueError(f"No CREATE2 deployer at {CREATE2DEPLOYER_ADDRESS}, deploy without create2")
+
+    def current_settings():
+        # chain settings updated by governance steps
+        return get_deployment_config(chain_settings).config
+
+    graph = DeployGraph()
+    governance_steps = []
+
+    has_dao_admins = bool(
+        chain_settings.dao.ownership_admin and chain_settings.dao.parameter_admin and chain_settings.dao.emergency_admin
+    )
+
+    # deterministic deployments don't depend on any other step, every step may use them
+    if create2:
+        graph.add(
+            "create2",
+            lambda results: deploy_planned(
+                current_settings(), plan_create2_deployments(current_settings(), with_xgov=not has_dao_admins)
+            ),
+        )
+        governance_steps.append("create2")
+
+    # check if there is a need to deploy xgov:
+    if has_dao_admins:
+        logger.info("No xgov for L1, setting admins from chain_settings file ...")
+        admins = [
+            chain_settings.dao.ownership_admin,
+            chain_settings.dao.parameter_admin,
+            chain_settings.dao.emergency_admin,
+        ]
+        ignore_tests.append("xgov")
+    else:
+        admins = None
+        graph.add(
+            "xgov",
+            lambda results: [str(admin) for admin in deploy_xgov(current_settings())],
+            depends_on=governance_steps,
+        )
+        governance_steps = governance_steps + ["xgov"]
+
+    # Check if there is a need to deploy dao vault
+    if not chain_settings.dao.vault:
+        graph.add(
+            "vault",
+            lambda results: str(deploy_dao_vault(current_settings(), (admins or results["xgov"])[0]).address),
+            depends_on=governance_steps,
+        )
+        governance_steps = governance_steps + ["vault"]
+
+    def fee_receiver():
+        # Old compatibility
+        return current_settings().dao.vault
+
+    # deploy (reward-only) gauge factory and contracts
+    graph.add(
+        "gauge",
+        lambda results: str(deploy_liquidity_gauge_infra(current_settings()).address),
+        depends_on=governance_steps,
+    )
+
+    # address provider:
+    graph.add(
+        "address_provider",
+        lambda results: str(deploy_address_provider(current_settings()).address),
+        depends_on=governance_steps,
+    )
+
+    # metaregistry
+    gauge_type = -1  # we set gauge type to -1 until there's an actual gauge type later
+    graph.add(
+        "metaregistry",
+        lambda results: str(deploy_metaregistry(current_settings(), results["gauge"], gauge_type).address),
+        depends_on=["gauge"],
+    )
+
+    # router
+    graph.add("router", lambda results: str(deploy_router(current_settings()).address), depends_on=governance_steps)
+
+    # deploy amms:
+    graph.add(
+        "stableswap",
+        lambda results: str(deploy_stableswap(current_settings(), fee_receiver()).address),
+        depends_on=governance_steps,
+    )
+    graph.add(
+        "tricrypto",
+        lambda results: str(deploy_tricrypto(current_settings(), fee_receiver()).address),
+        depends_on=governance_steps,
+    )
+    graph.add(
+        "twocrypto",
+        lambda results: str(deploy_twocrypto(current_settings(), fee_receiver()).address),
+        depends_on=governance_steps,
+    )
+
+    # deposit and stake zap
+    graph.add(
+        "deposit_and_stake_zap",
+        lambda results: str(deploy_deposit_and_stake_zap(current_settings()).address),
+        depends_on=governance_steps,
+    )
+
+    # meta zap
+    graph.add(
+        "stable_swap_meta_zap",
+        lambda results: str(deploy_stable_swap_meta_zap(current_settings()).address),
+        depends_on=governance_steps,
+    )
+
+    # rate provider
+    graph.add(
+        "rate_provider",
+        lambda results: str(deploy_rate_provider(current_settings(), results["address_provider"]).address),
+        depends_on=["address_provider"],
+    )
+
+    # update metaregistry
+    graph.add(
+        "update_metaregistry",
+        lambda results: str(update_metaregistry(current_settings()).address),
+        depends_on=["metaregistry", "stableswap", "tricrypto", "twocrypto"],
+    )
+
+    # update address provider
+    graph.add(
+        "update_address_provider",
+        lambda results: update_address_provider(current_settings()),
+        depends_on=graph.get_order(),
+    )
+
+    # transfer ownership to the dao
+    graph.add(
+        "transfer_ownership",
+        lambda results: transfer_ownership(current_settings()),
+        depends_on=["update_address_provider"],
+    )
+
+    # serve deployment file from memory, journal flushes it after every finished step
+    deployment_file = get_deployment_obj(chain_settings)
+    journal = DeploymentJournal(deployment_file, chain_settings)
+    # forked transactions have no receipts, their cost is estimated at current gas price
+    cost_report = CostReport(chain_settings.native_currency_symbol, get_gas_price() if settings.DEBUG else None)
+    with (
+        span("deploy", "phase"),
+        deployment_file.session(),
+        journal.run(fresh=fresh),
+        recording_costs(cost_report),
+        managed_transactions(max_in_flight),
+        create2_deployments(CREATE2_SALT if create2 else None),
+    ):
+        logger.info(f"Using EVM version: {chain_settings.evm_version}")
+        dump_initial_chain_settings(chain_settings)
+        if fork_block is not None:
+            get_deployment_obj(chain_settings).update_deployment_config({"fork_block": fork_block})
+
+        graph.run(journal.step, max_workers=workers)
+
+    cost_report.log()
+    cost_report.write(deployment_file.file_path.with_suffix(".costs.json"))
+
+    # test post deployment
+    with span("post_deploy", "phase"):
+        test_post_deploy(chain_config_file, ignore_tests)
+
+    # final!
+    logger.info("Infra deployed and tested!")
+    return cost_report.summary()
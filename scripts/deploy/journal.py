@@ -0,0 +1,288 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable
+
+import boa
+from boa.network import NetworkEnv
+
+from scripts.logging_config import get_logger
+from scripts.tracing import span
+from settings.config import BASE_DIR
+from settings.models import ChainConfig
+
+from .compiler import load_partial
+from .costs import cost_step
+from .create2 import get_create2_address
+from .deployment_file import YamlDeploymentFile
+from .transactions import confirm_pending
+from .utils import get_initcode, get_relative_path
+
+logger = get_logger()
+
+RECEIPT_TIMEOUT = 600  # seconds
+
+# journal of the running deployment, see journaling_deployment
+_journal: "DeploymentJournal | None" = None
+
+
+@contextmanager
+def journaling_deployment(contract_file: Path, ctor_args: tuple, as_blueprint: bool, salt: bytes | None = None):
+    """
+    Journal contract deployed by transactions signed on the calling thread inside the context, so that deployment
+    interrupted before the step is finished records the contract on resume instead of deploying it again
+
+    Args:
+    contract_file (Path): Path to vyper source
+    ctor_args (tuple): Constructor arguments
+    as_blueprint (bool): Deployed as ERC-5202 blueprint
+    salt (bytes | None): Salt if contract is deployed via CREATE2 deployer
+    """
+    journal = _journal
+    if journal is None:
+        yield
+        return
+
+    journal._local.deployment = {
+        "contract_file": str(get_relative_path(Path(contract_file))),
+        # addresses of boa, pydantic and others are journaled as plain strings
+        "ctor_args": [arg if isinstance(arg, int) else str(arg) for arg in ctor_args],
+        "as_blueprint": as_blueprint,
+        "salt": salt.hex() if salt is not None else None,
+    }
+    try:
+        yield
+    finally:
+        journal._local.deployment = None
+
+
+class JournalingAccount:
+    """
+    Account wrapper that writes transaction hash to the journal before transaction is broadcast
+    """
+
+    def __init__(self, account, journal: "DeploymentJournal"):
+        self._account = account
+        self._journal = journal
+        self.address = account.address
+
+    def sign_transaction(self, tx_data: dict):
+        signed = self._account.sign_transaction(tx_data)
+        self._journal.record_transaction("0x" + bytes(signed.hash).hex(), tx_data.get("nonce"))
+        return signed
+
+
+class DeploymentJournal:
+    """
+    Append-only write-ahead log of finished deployment steps and sent transactions (with contracts they deploy).
+    Stored next to deployment file, so interrupted deployment resumes from the first unfinished step.
+    """
+
+    def __init__(self, deployment_file: YamlDeploymentFile, chain_settings: ChainConfig):
+        self.deployment_file = deployment_file
+        self.chain_settings = chain_settings
+        self.file_path = deployment_file.file_path.with_suffix(".journal.jsonl")
+
+        self._finished_steps: dict[str, Any] = {}
+        self._pending_transactions: list[str] = []
+        # contracts deployed by pending transactions, keyed by tx hash
+        self._pending_deployments: dict[str, dict] = {}
+        # steps may run concurrently, each thread tracks the step its transactions belong to
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    @property
+    def _current_step(self) -> str | None:
+        return getattr(self._local, "step", None)
+
+    @_current_step.setter
+    def _current_step(self, step: str | None) -> None:
+        self._local.step = step
+
+    def _append(self, event: str, **data) -> None:
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.file_path, "a") as file:
+            file.write(json.dumps({"event": event, "timestamp": int(time.time()), **data}) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _read(self) -> list[dict]:
+        if not self.file_path.exists():
+            return []
+
+        events = []
+        with open(self.file_path, "r") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    events.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # torn write at the end of journal, everything after it is unreliable
+                    logger.warning(f"Journal {self.file_path} has a broken entry, ignoring the rest of it.")
+                    break
+        return events
+
+    def _load_unfinished_run(self) -> bool:
+        events = self._read()
+        run_starts = [i for i, event in enumerate(events) if event["event"] == "run_started"]
+        if not run_starts:
+            return False
+
+        run_events = events[run_starts[-1] :]
+        if run_events[-1]["event"] == "run_finished":
+            return False
+
+        for event in run_events:
+            if event["event"] == "step_finished":
+                self._finished_steps[event["step"]] = event.get("result")
+
+        resolved = {event["tx_hash"] for event in run_events if event["event"] in ("tx_confirmed", "tx_dropped")}
+        pending_events = [
+            event
+            for event in run_events
+            if event["event"] == "tx_sent"
+            and event["step"] not in self._finished_steps
+            and event["tx_hash"] not in resolved
+        ]
+        self._pending_transactions = [event["tx_hash"] for event in pending_events]
+
+        # transactions re-sent with bumped fees are signed off the deploying thread, they share nonce with the original
+        deployments = {event["nonce"]: event["deployment"] for event in pending_events if event.get("deployment")}
+        self._pending_deployments = {
+            event["tx_hash"]: deployments[event["nonce"]] for event in pending_events if event["nonce"] in deployments
+        }
+        return True
+
+    def _record_deployment(self, deployment: dict, receipt: dict) -> None:
+        contract_file = Path(BASE_DIR, *Path(deployment["contract_file"]).parts[1:])
+        ctor_args = tuple(deployment["ctor_args"])
+        as_blueprint = deployment["as_blueprint"]
+        contract_deployer = load_partial(contract_file, self.chain_settings.evm_version)
+
+        if deployment["salt"] is not None:
+            initcode = get_initcode(contract_deployer, ctor_args, as_blueprint)
+            address = get_create2_address(initcode, bytes.fromhex(deployment["salt"]))
+        else:
+            address = receipt["contractAddress"]
+
+        logger.info(f"Recording {contract_file.name} deployed by pending transaction at {address}")
+        if self.deployment_file.get_deployment_config() is None:
+            self.deployment_file.dump_initial_chain_settings(self.chain_settings)
+        self.deployment_file.update_contract_deployment(
+            contract_file,
+            contract_deployer.at(address, nowarn=True),
+            ctor_args,
+            self.chain_settings,
+            as_blueprint=as_blueprint,
+        )
+
+    def _confirm_pending_transactions(self) -> None:
+        if not self._pending_transactions:
+            return
+
+        if not isinstance(boa.env, NetworkEnv):
+            logger.warning("Pending transactions in journal can only be confirmed on network, skipping.")
+            return
+
+        for tx_hash in self._pending_transactions:
+            if boa.env._rpc.fetch("eth_getTransactionByHash", [tx_hash]) is None:
+                logger.warning(f"Transaction {tx_hash} was never broadcast or has been dropped.")
+                self._append("tx_dropped", tx_hash=tx_hash)
+                continue
+
+            logger.info(f"Waiting for pending transaction {tx_hash} ...")
+            receipt = boa.env._rpc.wait_for_tx_receipt(tx_hash, RECEIPT_TIMEOUT)
+            status = int(receipt["status"], 16)
+            if status != 1:
+                logger.warning(f"Pending transaction {tx_hash} reverted.")
+            elif tx_hash in self._pending_deployments:
+                # steps record contracts only once they finish, rerun of the step must find it in deployment file
+                self._record_deployment(self._pending_deployments[tx_hash], receipt)
+            self._append("tx_confirmed", tx_hash=tx_hash, status=status)
+
+        self.deployment_file.flush()
+        self._pending_transactions = []
+        self._pending_deployments = {}
+
+    def record_transaction(self, tx_hash: str, nonce: int | None = None) -> None:
+        deployment = getattr(self._local, "deployment", None)
+        self._append("tx_sent", step=self._current_step, tx_hash=tx_hash, nonce=nonce, deployment=deployment)
+
+    @contextmanager
+    def _journal_transactions(self):
+        account = None
+        if isinstance(boa.env, NetworkEnv):
+            account = boa.env._accounts.get(str(boa.env.eoa))
+
+        if account is None:
+            yield
+            return
+
+        boa.env.add_account(JournalingAccount(account, self), force_eoa=True)
+        try:
+            yield
+        finally:
+            boa.env.add_account(account, force_eoa=True)
+
+    @contextmanager
+    def run(self, fresh: bool = False):
+        """
+        Start new deployment run or resume unfinished one
+
+        Args:
+        fresh (bool): Ignore unfinished run in journal and start over
+        """
+        global _journal
+
+        if not fresh and self._load_unfinished_run():
+            logger.info(f"Resuming deployment from {self.file_path}: {len(self._finished_steps)} steps finished.")
+            self._confirm_pending_transactions()
+        else:
+            self._finished_steps = {}
+            self._pending_transactions = []
+            self._pending_deployments = {}
+            self._append("run_started")
+
+        _journal = self
+        try:
+            with self._journal_transactions():
+                yield self
+        finally:
+            _journal = None
+
+        self.deployment_file.flush()
+        self._append("run_finished")
+
+    def step(self, name: str, func: Callable[[], Any]) -> Any:
+        """
+        Run deployment step unless it is already finished in journal
+
+        Args:
+        name (str): Unique step name
+        func (Callable): Step to run, should return json-serializable result
+        Returns:
+        Any: Result of the step (from journal if step is already finished)
+        """
+        if name in self._finished_steps:
+            logger.info(f"Step '{name}' is already finished, skipping.")
+            return self._finished_steps[name]
+
+        self._append("step_started", step=name)
+        self._current_step = name
+        try:
+            with cost_step(name), span(name, "step"):
+                result = func()
+                # transactions of the step must be mined before it is marked as finished
+                confirm_pending()
+        finally:
+            self._current_step = None
+
+        # deployment file must be durable before step is marked as finished
+        self.deployment_file.flush()
+        self._append("step_finished", step=name, result=result)
+        self._finished_steps[name] = result
+        return result
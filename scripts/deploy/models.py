@@ -1,11 +1,8 @@
 from enum import StrEnum, auto
-from pathlib import Path
 
-import boa
 from pydantic import BaseModel
 from pydantic import ConfigDict as BaseModelConfigDict
 
-from settings.config import BASE_DIR
 from settings.models import ChainConfig
 
 #  <-------------------------- Chain Config -------------------------->
@@ -47,11 +44,9 @@ class Contract(BaseModel):
     deployment_type: DeploymentType
 
     def get_contract(self):
-        contract_path = BASE_DIR / Path(self.contract_path.lstrip("/"))
-        compiler_args = {}
-        if self.compiler_settings.evm_version:
-            compiler_args["evm_version"] = self.compiler_settings.evm_version
-        return boa.load_partial(contract_path, compiler_args=compiler_args).at(self.address)
+        from scripts.deploy.abi import get_contract_at
+
+        return get_contract_at(self.contract_path, self.address, self.compiler_settings.evm_version)
 
 
 #  <-------------------------- Deployments -------------------------->
@@ -153,6 +148,7 @@ class ContractsDeployment(BaseModel):
 
 class DeploymentConfig(BaseModel):
     config: ChainConfig
+    fork_block: int | None = None  # block the debug deployment is forked at
     contracts: ContractsDeployment | None = None
     tokens: list[Token] | None = None
     pools: list[Pool] | None = None
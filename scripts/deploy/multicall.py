@@ -0,0 +1,198 @@
+import boa
+from boa.contracts.abi.abi_contract import ABIContract, ABIFunction
+from boa.network import NetworkEnv
+from boa.util.abi import Address, abi_decode
+
+from scripts.logging_config import get_logger
+from scripts.tracing import span
+
+from .constants import MULTICALL3_ABI, MULTICALL3_ADDRESS
+from .scheduler import run_on_graph_thread
+from .transactions import confirm_pending
+
+logger = get_logger()
+
+# Multicall3 handles already built in this process, keyed by boa env and address
+_contracts: dict[tuple, ABIContract] = {}
+# whether Multicall3 is deployed, keyed by boa env and address
+_available: dict[tuple, bool] = {}
+
+
+def _abi_type(abi_item: dict) -> str:
+    abi_type = abi_item["type"]
+    if not abi_type.startswith("tuple"):
+        return abi_type
+    components = ",".join(_abi_type(component) for component in abi_item["components"])
+    return f"({components}){abi_type.removeprefix('tuple')}"
+
+
+def _to_python(abi_item: dict, value):
+    if abi_item["type"] == "address":
+        return Address(value)
+    return value
+
+
+def decode_output(function: ABIFunction, return_data: bytes):
+    outputs = function._abi["outputs"]
+    schema = f"({','.join(_abi_type(output) for output in outputs)})"
+    decoded = [_to_python(output, value) for output, value in zip(outputs, abi_decode(schema, return_data))]
+    if not decoded:
+        return None
+    return decoded[0] if len(decoded) == 1 else tuple(decoded)
+
+
+def call(function: ABIFunction, *args, block_identifier: int | str = "latest"):
+    """
+    Run view call. On network it is a plain eth_call that doesn't touch boa's local fork state,
+    so it is safe to use from several threads and sees transactions sent outside of boa.
+    Block identifier applies to network only, forks are read at their block.
+    """
+    if not isinstance(boa.env, NetworkEnv):
+        with span(function.name, "view"):
+            return function(*args)
+
+    # read own writes: transactions sent from this thread must be mined first
+    confirm_pending()
+
+    calldata = function.prepare_calldata(*args)
+    if isinstance(block_identifier, int):
+        block_identifier = hex(block_identifier)
+    with span(function.name, "view"):
+        return_data = boa.env._rpc.fetch(
+            "eth_call", [{"to": str(function.contract.address), "data": "0x" + calldata.hex()}, block_identifier]
+        )
+    return decode_output(function, bytes.fromhex(return_data.removeprefix("0x")))
+
+
+class DeferredCall:
+    """
+    Result of a view call, available once the batch it belongs to is executed
+    """
+
+    def __init__(self, function: ABIFunction, args: tuple, allow_failure: bool):
+        self.function = function
+        self.args = args
+        self.allow_failure = allow_failure
+
+        self.target = str(function.contract.address)
+        self.calldata = function.prepare_calldata(*args)
+
+        self._executed = False
+        self._success = False
+        self._value = None
+
+    def _set_result(self, success: bool, return_data: bytes) -> None:
+        self._executed = True
+        self._success = success
+        if not success:
+            return
+
+        self._value = decode_output(self.function, return_data)
+
+    def _execute(self, block_identifier: int | str) -> None:
+        try:
+            value = call(self.function, *self.args, block_identifier=block_identifier)
+        except Exception:
+            if not self.allow_failure:
+                raise
+            self._executed, self._success = True, False
+            return
+
+        self._executed, self._success, self._value = True, True, value
+
+    @property
+    def success(self) -> bool:
+        if not self._executed:
+            raise ValueError(f"{self.function.name} is not executed yet")
+        return self._success
+
+    @property
+    def value(self):
+        if not self.success:
+            raise ValueError(f"{self.function.name}{self.args} failed at {self.target}")
+        return self._value
+
+
+class Multicall:
+    """
+    Batch of view calls executed via single Multicall3.aggregate3 eth_call.
+    On chains without Multicall3 (empty address or no code at it) calls are sent one by one.
+    Used as context manager, calls are deferred until exit from context:
+
+        with Multicall(chain_settings.multicall3) as multicall:
+            views_impl = multicall.add(factory.views_implementation)
+            pool_impl = multicall.add(factory.pool_implementations, 0)
+        views_impl.value, pool_impl.value
+    """
+
+    def __init__(self, address: str = MULTICALL3_ADDRESS, block_identifier: int | str = "latest"):
+        self.address = address
+        self.block_identifier = block_identifier
+        self.calls: list[DeferredCall] = []
+
+    @property
+    def contract(self) -> ABIContract:
+        key = (boa.env, self.address)
+        if key not in _contracts:
+            # handle creation fetches code through boa env, so it is built once, on the thread that owns the env
+            _contracts[key] = run_on_graph_thread(
+                lambda: boa.loads_abi(MULTICALL3_ABI, name="Multicall3").at(self.address, nowarn=True)
+            )
+        return _contracts[key]
+
+    @property
+    def available(self) -> bool:
+        """
+        Check if Multicall3 is deployed at the address, once per boa env
+        """
+        from .deployment_utils import is_deployed
+
+        key = (boa.env, self.address)
+        if key not in _available:
+            _available[key] = bool(self.address) and is_deployed(self.address)
+            if not _available[key]:
+                logger.warning(f"Multicall3 is not deployed at '{self.address}', view calls are sent one by one")
+        return _available[key]
+
+    def add(self, function: ABIFunction, *args, allow_failure: bool = False) -> DeferredCall:
+        call = DeferredCall(function, args, allow_failure)
+        self.calls.append(call)
+        return call
+
+    def add_block(self) -> tuple[DeferredCall, DeferredCall]:
+        """
+        Add number and timestamp of the block the batch is executed at, so that values read in the batch can be tagged
+        """
+        if not self.available:
+            raise ValueError(f"Multicall3 is not deployed at '{self.address}', block of the batch is unknown")
+        contract = self.contract
+        return self.add(contract.getBlockNumber), self.add(contract.getCurrentBlockTimestamp)
+
+    def execute(self) -> list[DeferredCall]:
+        calls, self.calls = self.calls, []
+        if not calls:
+            return calls
+
+        if not self.available:
+            for deferred_call in calls:
+                deferred_call._execute(self.block_identifier)
+            logger.debug(f"Executed {len(calls)} view calls one by one")
+            return calls
+
+        results = call(
+            self.contract.aggregate3,
+            [(c.target, c.allow_failure, c.calldata) for c in calls],
+            block_identifier=self.block_identifier,
+        )
+        for deferred_call, (success, return_data) in zip(calls, results):
+            deferred_call._set_result(success, return_data)
+
+        logger.debug(f"Executed {len(calls)} view calls in one multicall")
+        return calls
+
+    def __enter__(self) -> "Multicall":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.execute()
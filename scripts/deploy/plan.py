@@ -0,0 +1,199 @@
+from dataclasses import dataclass
+from pathlib import Path
+
+from scripts.logging_config import get_logger
+from settings.config import BASE_DIR
+from settings.models import ChainConfig
+
+from .constants import AddressProviderID
+from .deployment_file import YamlDeploymentFile, get_contract_to_deploy
+from .utils import get_agent_version, get_version_from_filename
+
+logger = get_logger()
+
+# address provider entries and contracts (or governance steps) they point to
+ADDRESS_PROVIDER_SOURCES = {
+    AddressProviderID.EXCHANGE_ROUTER: ("helpers", "router"),
+    AddressProviderID.FEE_DISTRIBUTOR: ("governance", "vault"),
+    AddressProviderID.METAREGISTRY: ("registries", "metaregistry"),
+    AddressProviderID.TRICRYPTONG_FACTORY: ("amm", "tricryptoswap", "factory"),
+    AddressProviderID.STABLESWAPNG_FACTORY: ("amm", "stableswap", "factory"),
+    AddressProviderID.TWOCRYPTONG_FACTORY: ("amm", "twocryptoswap", "factory"),
+    AddressProviderID.SPOT_RATE_PROVIDER: ("helpers", "rate_provider"),
+    AddressProviderID.GAUGE_FACTORY: ("gauge", "child_gauge", "factory"),
+    AddressProviderID.OWNERSHIP_ADMIN: ("governance", "relayer"),
+    AddressProviderID.PARAMETER_ADMIN: ("governance", "relayer"),
+    AddressProviderID.EMERGENCY_ADMIN: ("governance", "relayer"),
+    AddressProviderID.CURVEDAO_VAULT: ("governance", "vault"),
+    AddressProviderID.DEPOSIT_AND_STAKE_ZAP: ("helpers", "deposit_and_stake_zap"),
+    AddressProviderID.STABLESWAP_META_ZAP: ("helpers", "stable_swap_meta_zap"),
+}
+
+AMM_SETTERS = {
+    "stableswap": {
+        "set_views_implementation": "views",
+        "set_math_implementation": "math",
+        "set_pool_implementations": "implementation",
+        "set_metapool_implementations": "meta_implementation",
+    },
+    "tricryptoswap": {
+        "set_views_implementation": "views",
+        "set_math_implementation": "math",
+        "set_pool_implementation": "implementation",
+    },
+    "twocryptoswap": {
+        "set_views_implementation": "views",
+        "set_math_implementation": "math",
+        "set_pool_implementation": "implementation",
+    },
+}
+
+
+@dataclass
+class PlannedAction:
+    step: str
+    action: str  # deploy, upgrade, call or skip
+    target: str
+    details: str = ""
+
+
+class DeployPlan:
+    """
+    Offline diff of contracts in repo against deployment file: what `deploy all` would deploy and call.
+    Only versions in file names and deployment file are compared, no rpc and no compilation.
+    Values checked on-chain by deploy scripts are assumed to be in sync with deployment file.
+    """
+
+    def __init__(self, chain_settings: ChainConfig):
+        self.chain_settings = chain_settings
+        # debug deployments always start from scratch, so plan is made against the real deployment file
+        self.deployment_file = YamlDeploymentFile(Path(BASE_DIR, "deployments", chain_settings.file_path))
+        self.actions: list[PlannedAction] = []
+
+        self._changed: set[tuple[str, ...]] = set()
+        self._ownable: list[str] = []
+
+    def is_changed(self, *keys: str) -> bool:
+        return keys in self._changed
+
+    def contract(self, step: str, *keys: str, version: str = "v_000") -> bool:
+        """
+        Check contract the step deploys
+
+        Args:
+        step (str): Deployment step
+        keys (str): Contract folder under contracts/
+        version (str): Pinned version, "v_000" for the latest one
+        Returns:
+        bool: Contract would be (re)deployed
+        """
+        contract_file, deployed = get_contract_to_deploy(
+            self.deployment_file, Path(BASE_DIR, "contracts", *keys), version
+        )
+        if deployed is not None:
+            return False
+
+        existing = self.deployment_file.get_contract_deployment(("contracts", *keys))
+        new_version = get_version_from_filename(contract_file)
+        name = "/".join(keys)
+        if existing is not None:
+            self.actions.append(PlannedAction(step, "upgrade", name, f"{existing.contract_version} -> {new_version}"))
+        else:
+            self.actions.append(PlannedAction(step, "deploy", name, new_version))
+
+        self._changed.add(keys)
+        with open(contract_file, "r") as file:
+            if "def set_owner(" in file.read():
+                self._ownable.append(name)
+        return True
+
+    def call(self, step: str, target: str, details: str = "") -> None:
+        self.actions.append(PlannedAction(step, "call", target, details))
+
+    def build(self) -> list[PlannedAction]:
+        dao = self.chain_settings.dao
+
+        # governance
+        if not (dao.ownership_admin and dao.parameter_admin and dao.emergency_admin):
+            self.contract("xgov", "governance", "agent", version=get_agent_version(self.chain_settings.rollup_type))
+            self.contract("xgov", "governance", "relayer", self.chain_settings.rollup_type)
+        if not dao.vault:
+            self.contract("vault", "governance", "vault")
+
+        # gauge
+        factory_changed = self.contract("gauge", "gauge", "child_gauge", "factory")
+        if self.contract("gauge", "gauge", "child_gauge", "implementation") or factory_changed:
+            self.call("gauge", "gauge/child_gauge/factory.set_implementation")
+
+        # registries and helpers
+        self.contract("address_provider", "registries", "address_provider")
+        self.contract("metaregistry", "registries", "metaregistry")
+        self.contract("router", "helpers", "router")
+
+        # amms
+        for step, amm in (("stableswap", "stableswap"), ("tricrypto", "tricryptoswap"), ("twocrypto", "twocryptoswap")):
+            changed = {
+                contract: self.contract(step, "amm", amm, contract)
+                for contract in ("math", "views", "implementation", "meta_implementation", "factory")
+                if contract in AMM_SETTERS[amm].values() or contract == "factory"
+            }
+            for setter, contract in AMM_SETTERS[amm].items():
+                if changed[contract] or changed["factory"]:
+                    self.call(step, f"amm/{amm}/factory.{setter}")
+
+        self.contract("deposit_and_stake_zap", "helpers", "deposit_and_stake_zap")
+        self.contract("stable_swap_meta_zap", "helpers", "stable_swap_meta_zap")
+        self.contract("rate_provider", "helpers", "rate_provider")
+
+        # metaregistry handlers are only added to empty slots of metaregistry
+        metaregistry_changed = self.is_changed("registries", "metaregistry")
+        for amm in ("stableswap", "tricryptoswap", "twocryptoswap"):
+            handler_changed = self.contract(
+                "update_metaregistry", "registries", "metaregistry", "registry_handlers", amm
+            )
+            if metaregistry_changed:
+                self.call("update_metaregistry", "registries/metaregistry.add_registry_handler", amm)
+            elif handler_changed:
+                self.actions.append(
+                    PlannedAction(
+                        "update_metaregistry",
+                        "skip",
+                        "registries/metaregistry.add_registry_handler",
+                        f"new {amm} handler is not registered, slot is already taken",
+                    )
+                )
+
+        # address provider
+        if self.is_changed("registries", "address_provider"):
+            self.call("update_address_provider", "registries/address_provider.add_new_ids", "all ids")
+        else:
+            for address_provider_id, keys in ADDRESS_PROVIDER_SOURCES.items():
+                if keys == ("governance", "relayer"):
+                    keys = (*keys, self.chain_settings.rollup_type)
+                if self.is_changed(*keys):
+                    self.call(
+                        "update_address_provider",
+                        "registries/address_provider.update_address",
+                        f"{address_provider_id.id} ({address_provider_id.description})",
+                    )
+
+        # ownership
+        for name in self._ownable:
+            self.call("transfer_ownership", f"{name}.set_owner")
+
+        return self.actions
+
+
+def log_plan(chain_settings: ChainConfig, actions: list[PlannedAction]) -> None:
+    if not actions:
+        logger.info(f"{chain_settings.file_path}: deployment is up to date, nothing to do.")
+        return
+
+    logger.info(f"{chain_settings.file_path}: {len(actions)} actions planned")
+    step = None
+    for action in actions:
+        if action.step != step:
+            step = action.step
+            logger.info(f"[{step}]")
+        details = f" ({action.details})" if action.details else ""
+        logger.info(f"  {action.action:<8} {action.target}{details}")
@@ -5,6 +5,8 @@ import boa
 from scripts.deploy.constants import AddressProviderID
 from scripts.deploy.deployment_file import get_deployment_obj
 from scripts.deploy.deployment_utils import deploy_contract
+from scripts.deploy.multicall import Multicall
+from scripts.deploy.transactions import transact
 from scripts.logging_config import get_logger
 from settings.config import BASE_DIR
 from settings.models import ChainConfig
@@ -50,27 +52,30 @@ def update_address_provider(chain_settings: ChainConfig):
     descriptions_to_add = []
     ids_to_update = []
 
-    for key in AddressProviderID:
-        if key.id in address_provider_inputs:
-            if not address_provider.check_id_exists(key.id):
-                ids_to_add.append(key.id)
-                addresses_to_add.append(address_provider_inputs[key.id])
-                descriptions_to_add.append(key.description)
-            elif (
-                address_provider.get_address(key.id).strip().lower() != address_provider_inputs[key.id].strip().lower()
-            ):
-                ids_to_update.append(key.id)
+    keys = [key for key in AddressProviderID if key.id in address_provider_inputs]
+    with Multicall(chain_settings.multicall3) as multicall:
+        admin = multicall.add(address_provider.admin)
+        ids_exist = [multicall.add(address_provider.check_id_exists, key.id) for key in keys]
+        current_addresses = [multicall.add(address_provider.get_address, key.id) for key in keys]
+
+    for key, id_exists, current_address in zip(keys, ids_exist, current_addresses):
+        if not id_exists.value:
+            ids_to_add.append(key.id)
+            addresses_to_add.append(address_provider_inputs[key.id])
+            descriptions_to_add.append(key.description)
+        elif current_address.value.strip().lower() != address_provider_inputs[key.id].strip().lower():
+            ids_to_update.append(key.id)
 
     logger.info("Updating Address Provider.")
     if ids_to_add:
-        if address_provider.admin() != boa.env.eoa:
+        if admin.value != boa.env.eoa:
             logger.warning("Can not add new ideas, not admin anymore")
         else:
-            address_provider.add_new_ids(ids_to_add, addresses_to_add, descriptions_to_add)
+            transact(address_provider.add_new_ids, ids_to_add, addresses_to_add, descriptions_to_add)
 
     for id in ids_to_update:
         logger.info(f"Updating ID {id} in the Address Provider.")
-        if address_provider.admin() != boa.env.eoa:
+        if admin.value != boa.env.eoa:
             logger.warning("Could not update, not admin anymore")
         else:
-            address_provider.update_address(id, address_provider_inputs[id])
+            transact(address_provider.update_address, id, address_provider_inputs[id])
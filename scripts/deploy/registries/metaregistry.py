@@ -1,10 +1,10 @@
 from pathlib import Path
 
-import boa
-
 from scripts.deploy.constants import ZERO_ADDRESS
 from scripts.deploy.deployment_file import get_deployment_obj
 from scripts.deploy.deployment_utils import deploy_contract
+from scripts.deploy.multicall import Multicall
+from scripts.deploy.transactions import transact
 from scripts.logging_config import get_logger
 from settings.config import BASE_DIR
 from settings.models import ChainConfig
@@ -48,12 +48,12 @@ def update_metaregistry(chain_settings: ChainConfig):
 
     logger.info("Adding registry handlers to the Metaregistry.")
 
-    if metaregistry.get_registry(0) == ZERO_ADDRESS:
-        metaregistry.add_registry_handler(stableswap_handler)
-    if metaregistry.get_registry(1) == ZERO_ADDRESS:
-        metaregistry.add_registry_handler(tricrypto_handler)
-    if metaregistry.get_registry(2) == ZERO_ADDRESS:
-        metaregistry.add_registry_handler(twocrypto_handler)
+    with Multicall(chain_settings.multicall3) as multicall:
+        registries = [multicall.add(metaregistry.get_registry, i) for i in range(3)]
+
+    for registry, handler in zip(registries, (stableswap_handler, tricrypto_handler, twocrypto_handler)):
+        if registry.value == ZERO_ADDRESS:
+            transact(metaregistry.add_registry_handler, handler.address)
 
     logger.info("Updated Metaregistry.")
 
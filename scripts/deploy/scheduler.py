@@ -0,0 +1,151 @@
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from scripts.logging_config import get_logger
+
+logger = get_logger()
+
+# events of the running graph: finished steps and calls handed over to the thread running the graph
+_events: queue.SimpleQueue | None = None
+_graph_thread_id: int | None = None
+
+
+def run_on_graph_thread(func: Callable[[], Any]) -> Any:
+    """
+    Run function on the thread running deployment graph and wait for its result.
+    boa env must only be used from the thread that set it up (fork reads are cached in a sqlite connection),
+    so steps running on worker threads hand over everything that touches it, e.g. creation of contract handles.
+    Outside of graph workers function is called right away.
+
+    Args:
+    func (Callable): Function without arguments
+    Returns:
+    Any: Result of the function
+    """
+    events = _events
+    if events is None or threading.get_ident() == _graph_thread_id:
+        return func()
+
+    result: Future = Future()
+    events.put((func, result))
+    return result.result()
+
+
+class DeployGraph:
+    """
+    Deployment steps with explicit dependencies between them.
+    Step runs as soon as all steps it depends on are finished, independent steps run concurrently.
+    """
+
+    def __init__(self):
+        self._steps: dict[str, tuple[Callable[[dict], Any], tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: Callable[[dict], Any], depends_on: Iterable[str] = ()) -> None:
+        """
+        Add deployment step to the graph
+
+        Args:
+        name (str): Unique step name
+        func (Callable): Step, called with results of finished steps
+        depends_on (Iterable[str]): Names of steps that must finish before this one
+        """
+        if name in self._steps:
+            raise ValueError(f"Step '{name}' is already added")
+        self._steps[name] = (func, tuple(depends_on))
+
+    def get_order(self) -> list[str]:
+        """
+        Get steps in topological order (order of addition among independent steps)
+
+        Returns:
+        list[str]: Step names
+        """
+        for name, (_, depends_on) in self._steps.items():
+            unknown = [dependency for dependency in depends_on if dependency not in self._steps]
+            if unknown:
+                raise ValueError(f"Step '{name}' depends on unknown steps: {unknown}")
+
+        order = []
+        remaining = dict(self._steps)
+        while remaining:
+            ready = [name for name, (_, depends_on) in remaining.items() if all(d not in remaining for d in depends_on)]
+            if not ready:
+                raise ValueError(f"Dependency cycle between steps: {list(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
+
+    def run(self, run_step: Callable[[str, Callable[[], Any]], Any], max_workers: int = 1) -> dict[str, Any]:
+        """
+        Run all steps respecting dependencies. With one worker steps run one by one on the calling thread,
+        otherwise on worker threads, while the calling thread serves their `run_on_graph_thread` calls.
+
+        Args:
+        run_step (Callable): Runner of a single step, e.g. DeploymentJournal.step
+        max_workers (int): Number of steps running at the same time
+        Returns:
+        dict[str, Any]: Results of all steps
+        """
+        global _events, _graph_thread_id
+
+        order = self.get_order()
+        results: dict[str, Any] = {}
+        if max_workers == 1:
+            for index, name in enumerate(order):
+                try:
+                    results[name] = run_step(name, lambda: self._steps[name][0](results))
+                except Exception:
+                    logger.error(f"Step '{name}' failed, {len(order) - index - 1} steps were not started.")
+                    raise
+            return results
+
+        running: dict[Future, str] = {}
+        events: queue.SimpleQueue = queue.SimpleQueue()
+
+        def is_ready(name: str) -> bool:
+            return all(dependency in results for dependency in self._steps[name][1])
+
+        def submit(executor: ThreadPoolExecutor, name: str) -> None:
+            func = self._steps[name][0]
+            future = executor.submit(run_step, name, lambda: func(results))
+            running[future] = name
+            future.add_done_callback(events.put)
+
+        def next_finished() -> Future:
+            # serve calls of running steps until one of them finishes
+            while True:
+                event = events.get()
+                if isinstance(event, Future):
+                    return event
+                func, result = event
+                try:
+                    result.set_result(func())
+                except Exception as e:
+                    result.set_exception(e)
+
+        _events, _graph_thread_id = events, threading.get_ident()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="deploy") as executor:
+                pending = list(order)
+                while pending or running:
+                    for name in [name for name in pending if is_ready(name)][: max_workers - len(running)]:
+                        pending.remove(name)
+                        submit(executor, name)
+
+                    future = next_finished()
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        # let already running steps finish, nothing new is started
+                        while running:
+                            running.pop(next_finished())
+                        logger.error(f"Step '{name}' failed, {len(pending)} steps were not started.")
+                        raise error
+                    results[name] = future.result()
+        finally:
+            _events, _graph_thread_id = None, None
+
+        return results
@@ -0,0 +1,383 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+import boa
+import rlp
+from boa.contracts.abi.abi_contract import ABIFunction
+from boa.network import NetworkEnv
+from boa.rpc import RPCError
+from eth_utils import keccak, to_checksum_address
+
+from scripts.logging_config import get_logger
+from scripts.tracing import span
+
+from .costs import get_current_step, record_execution, record_receipt
+from .scheduler import run_on_graph_thread
+from .utils import get_initcode
+
+logger = get_logger()
+
+RECEIPT_TIMEOUT = 600  # seconds
+STUCK_TIMEOUT = 60  # seconds without receipt before fees of the lowest pending nonce are bumped
+POLL_INTERVAL = 1  # seconds between receipt polls
+FEE_BUMP = 1.125  # nodes require at least +10% to replace transaction with the same nonce
+
+
+def get_create_address(sender: str, nonce: int) -> str:
+    """
+    Get address of contract created by `sender` with `nonce`
+
+    Args:
+    sender (str): Deployer address
+    nonce (int): Nonce of deployment transaction
+    Returns:
+    str: Checksummed contract address
+    """
+    return to_checksum_address(keccak(rlp.encode([bytes.fromhex(sender.removeprefix("0x")), nonce]))[12:])
+
+
+class PendingTransaction:
+    """
+    Transaction waiting for receipt. All hashes it was broadcast with (after fee bumps) are tracked,
+    since any of them may end up mined.
+    """
+
+    def __init__(self, nonce: int, tx: dict, fee_params: dict, kind: str, target: str):
+        self.nonce = nonce
+        self.tx = tx
+        self.fee_params = fee_params
+        self.hashes: list[str] = []
+        self.sent_at = 0.0
+        self.thread_id = threading.get_ident()
+
+        # cost accounting
+        self.kind = kind
+        self.target = target
+        self.step = get_current_step()
+
+        self.receipt: dict | None = None
+        self.confirmed = threading.Event()
+
+
+class TransactionSender:
+    """
+    Signs and broadcasts transactions with a locally managed nonce sequence.
+    Transactions are sent bypassing boa env, so deployment steps can submit them from several threads.
+
+    Up to `max_in_flight` transactions are kept in a local pending pool, receipts are confirmed
+    by a background thread, transactions stuck for `stuck_timeout` are re-sent with bumped fees.
+    """
+
+    def __init__(self, account, max_in_flight: int = 1, stuck_timeout: float = STUCK_TIMEOUT):
+        self.account = account
+        self.address = str(account.address)
+        self.rpc = boa.env._rpc
+        self.max_in_flight = max_in_flight
+        self.stuck_timeout = stuck_timeout
+
+        self.chain_id = int(self.rpc.fetch("eth_chainId", []), 16)
+        self._nonce = int(self.rpc.fetch("eth_getTransactionCount", [self.address, "pending"]), 16)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+
+        self._pending: dict[int, PendingTransaction] = {}
+        self._transactions: dict[str, PendingTransaction] = {}
+        # functions waiting for transactions to be mined, see after_mined
+        self._callbacks: list[tuple[PendingTransaction, Callable[[], None]]] = []
+        self._local = threading.local()
+
+        self._stopped = threading.Event()
+        self._monitor = threading.Thread(target=self._monitor_receipts, name="receipts", daemon=True)
+        self._monitor.start()
+
+    @property
+    def pipelined(self) -> bool:
+        return self.max_in_flight > 1
+
+    def _get_fee_params(self) -> dict:
+        block = self.rpc.fetch("eth_getBlockByNumber", ["latest", False])
+        if block.get("baseFeePerGas") is None:
+            return {"gasPrice": int(self.rpc.fetch("eth_gasPrice", []), 16)}
+
+        base_fee = int(block["baseFeePerGas"], 16)
+        priority_fee = int(self.rpc.fetch("eth_maxPriorityFeePerGas", []), 16)
+        return {"maxFeePerGas": 2 * base_fee + priority_fee, "maxPriorityFeePerGas": priority_fee}
+
+    def _estimate_gas(self, tx: dict) -> int:
+        params = {**tx, "value": hex(tx["value"])}
+        try:
+            # pending state includes our transactions that are not mined yet
+            return int(self.rpc.fetch("eth_estimateGas", [params, "pending"]), 16)
+        except RPCError:
+            if not self.get_pending(current_thread_only=True):
+                raise
+
+        # transaction depends on in-flight transactions the node can't estimate against
+        self.confirm_pending(current_thread_only=True)
+        return int(self.rpc.fetch("eth_estimateGas", [params, "latest"]), 16)
+
+    def _broadcast(self, pending: PendingTransaction) -> str:
+        with span("sign_transaction", "sign", nonce=pending.nonce):
+            signed = self.account.sign_transaction({**pending.tx, **pending.fee_params, "nonce": pending.nonce})
+        raw_transaction = getattr(signed, "raw_transaction", None) or signed.rawTransaction
+        tx_hash = self.rpc.fetch("eth_sendRawTransaction", ["0x" + bytes(raw_transaction).hex()])
+
+        pending.hashes.append(tx_hash)
+        pending.sent_at = time.time()
+        self._transactions[tx_hash] = pending
+        return tx_hash
+
+    def send(self, to: str | None, data: bytes, value: int = 0, kind: str = "call", target: str = "") -> str:
+        """
+        Sign and broadcast transaction with the next nonce.
+        Blocks while `max_in_flight` transactions are waiting for receipts.
+
+        Args:
+        to (str | None): Recipient, None for contract creation
+        data (bytes): Calldata or initcode
+        value (int): Value in wei
+        kind (str): Transaction kind for cost report (deploy, blueprint or call)
+        target (str): Deployed contract or called function for cost report
+        Returns:
+        str: Transaction hash
+        """
+        tx = {"from": self.address, "data": "0x" + data.hex(), "value": value}
+        if to is not None:
+            tx["to"] = to
+
+        self._slots.acquire()
+        try:
+            tx.update({"gas": self._estimate_gas(tx), "chainId": self.chain_id})
+            fee_params = self._get_fee_params()
+
+            # nonces must be broadcast in order they are assigned
+            with self._lock:
+                pending = PendingTransaction(self._nonce, tx, fee_params, kind, target)
+                tx_hash = self._broadcast(pending)
+                self._pending[pending.nonce] = pending
+                self._nonce += 1
+            self._local.last_sent = pending
+        except Exception:
+            self._slots.release()
+            raise
+
+        logger.debug(f"Sent transaction {tx_hash} with nonce {pending.nonce}")
+        return tx_hash
+
+    def _resolve(self, pending: PendingTransaction, receipt: dict) -> None:
+        with self._lock:
+            self._pending.pop(pending.nonce, None)
+        data = bytes.fromhex(pending.tx["data"].removeprefix("0x"))
+        record_receipt(pending.step, pending.kind, pending.target, data, receipt)
+
+        pending.receipt = receipt
+        pending.confirmed.set()
+        self._slots.release()
+
+    def _bump_fees(self, pending: PendingTransaction) -> None:
+        current = self._get_fee_params()
+        pending.fee_params = {
+            key: max(int(value * FEE_BUMP) + 1, current.get(key, 0)) for key, value in pending.fee_params.items()
+        }
+        with self._lock:
+            tx_hash = self._broadcast(pending)
+        logger.warning(f"Nonce {pending.nonce} is stuck, re-sent as {tx_hash} with fees {pending.fee_params}")
+
+    def _poll(self) -> None:
+        with self._lock:
+            pending_transactions = sorted(self._pending.values(), key=lambda pending: pending.nonce)
+        if not pending_transactions:
+            return
+
+        payloads = [("eth_getTransactionReceipt", [h]) for pending in pending_transactions for h in pending.hashes]
+        receipts = {receipt["transactionHash"]: receipt for receipt in self.rpc.fetch_multi(payloads) if receipt}
+
+        for pending in pending_transactions:
+            receipt = next((receipts[h] for h in pending.hashes if h in receipts), None)
+            if receipt is not None:
+                self._resolve(pending, receipt)
+
+        # only the lowest nonce can be stuck, the rest are waiting for it
+        lowest = pending_transactions[0]
+        if not lowest.confirmed.is_set() and time.time() - lowest.sent_at > self.stuck_timeout:
+            self._bump_fees(lowest)
+
+    def _monitor_receipts(self) -> None:
+        while not self._stopped.wait(POLL_INTERVAL):
+            try:
+                self._poll()
+            except Exception as e:
+                logger.warning(f"Failed to poll transaction receipts: {e}")
+
+    def get_pending(self, current_thread_only: bool = False) -> list[PendingTransaction]:
+        with self._lock:
+            pending_transactions = list(self._pending.values())
+        if current_thread_only:
+            thread_id = threading.get_ident()
+            return [pending for pending in pending_transactions if pending.thread_id == thread_id]
+        return pending_transactions
+
+    def wait(self, tx_hash: str) -> dict:
+        """
+        Wait for receipt of transaction sent by this sender
+
+        Args:
+        tx_hash (str): Hash returned by `send`
+        Returns:
+        dict: Transaction receipt
+        """
+        pending = self._transactions[tx_hash]
+        with span("wait", "receipt", nonce=pending.nonce):
+            confirmed = pending.confirmed.wait(RECEIPT_TIMEOUT)
+        if not confirmed:
+            raise TimeoutError(f"Transaction {tx_hash} (nonce {pending.nonce}) not mined in {RECEIPT_TIMEOUT}s")
+
+        if int(pending.receipt["status"], 16) != 1:
+            raise RuntimeError(f"Transaction {pending.receipt['transactionHash']} reverted")
+        return pending.receipt
+
+    def confirm_pending(self, current_thread_only: bool = False) -> None:
+        """
+        Wait until pending transactions are mined
+
+        Args:
+        current_thread_only (bool): Only wait for transactions sent from the calling thread
+        """
+        for pending in self.get_pending(current_thread_only):
+            self.wait(pending.hashes[0])
+
+        thread_id = threading.get_ident()
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+            for callback in list(callbacks):
+                if current_thread_only and callback[0].thread_id != thread_id:
+                    callbacks.remove(callback)
+                    self._callbacks.append(callback)
+        for pending, func in callbacks:
+            # raises if transaction reverted, function is dropped then
+            self.wait(pending.hashes[0])
+            func()
+
+    def after_mined(self, func: Callable[[], None]) -> None:
+        """
+        Run function once the last transaction sent from the calling thread is mined.
+        In pipelined mode it is deferred to `confirm_pending` of that thread, otherwise transaction is mined already.
+
+        Args:
+        func (Callable): Function without arguments
+        """
+        pending = getattr(self._local, "last_sent", None)
+        if pending is None or not self.pipelined:
+            func()
+            return
+
+        with self._lock:
+            self._callbacks.append((pending, func))
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._monitor.join()
+
+
+_sender: TransactionSender | None = None
+
+
+@contextmanager
+def managed_transactions(max_in_flight: int = 1):
+    """
+    Route `deploy` and `transact` through TransactionSender of the current boa account.
+    Outside of network env (forks, DEBUG mode) boa is used directly.
+
+    Args:
+    max_in_flight (int): Number of transactions sent without waiting for receipts
+    """
+    global _sender
+
+    if not isinstance(boa.env, NetworkEnv):
+        yield None
+        return
+
+    _sender = TransactionSender(boa.env._accounts[str(boa.env.eoa)], max_in_flight=max_in_flight)
+    try:
+        yield _sender
+        _sender.confirm_pending()
+    finally:
+        _sender.close()
+        _sender = None
+
+
+def confirm_pending() -> None:
+    """
+    Wait for receipts of transactions sent from the calling thread (no-op without managed transactions)
+    """
+    if _sender is not None:
+        _sender.confirm_pending(current_thread_only=True)
+
+
+def after_mined(func: Callable[[], None]) -> None:
+    """
+    Run function once the last transaction sent from the calling thread is mined, e.g. record deployed address
+    only after the contract exists (right away without managed transactions)
+
+    Args:
+    func (Callable): Function without arguments
+    """
+    if _sender is None:
+        func()
+    else:
+        _sender.after_mined(func)
+
+
+def deploy(deployer, *args, as_blueprint: bool = False):
+    """
+    Deploy contract (or its blueprint). In pipelined mode handle at precomputed address
+    is returned right after broadcast, otherwise once transaction is mined.
+
+    Args:
+    deployer: boa deployer of the contract
+    args: Constructor arguments
+    as_blueprint (bool): Deploy as ERC-5202 blueprint
+    Returns:
+    Contract handle at deployed address
+    """
+    initcode = get_initcode(deployer, args, as_blueprint)
+    kind = "blueprint" if as_blueprint else "deploy"
+
+    if _sender is None:
+        gas_before = boa.env.get_gas_used()
+        contract = deployer.deploy_as_blueprint() if as_blueprint else deployer.deploy(*args)
+        record_execution(kind, deployer.name, initcode, boa.env.get_gas_used() - gas_before)
+        return contract
+
+    tx_hash = _sender.send(None, initcode, kind=kind, target=deployer.name)
+    address = get_create_address(_sender.address, _sender._transactions[tx_hash].nonce)
+    if not _sender.pipelined:
+        _sender.wait(tx_hash)
+
+    # handle creation reads code through boa env, local fork may lag behind the chain, don't warn about missing code
+    return run_on_graph_thread(lambda: deployer.at(address, nowarn=True))
+
+
+def transact(function: ABIFunction, *args) -> None:
+    """
+    Call state-changing contract function. Waits until transaction is mined, unless in pipelined mode.
+    Returns nothing, whatever the env: read results back with view calls.
+
+    Args:
+    function (ABIFunction): Bound contract function
+    args: Function arguments
+    """
+    calldata = function.prepare_calldata(*args)
+    target = f"{function._contract_name}.{function.name}"
+
+    if _sender is None:
+        gas_before = boa.env.get_gas_used()
+        function(*args)
+        record_execution("call", target, calldata, boa.env.get_gas_used() - gas_before)
+        return
+
+    tx_hash = _sender.send(str(function.contract.address), calldata, target=target)
+    if not _sender.pipelined:
+        _sender.wait(tx_hash)
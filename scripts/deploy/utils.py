@@ -1,14 +1,19 @@
 import os
 import re
 import subprocess
+from functools import cache
 from pathlib import Path
 
 from scripts.logging_config import get_logger
+from scripts.tracing import traced
+from settings.config import BASE_DIR
+from settings.models import RollupType
 
 logger = get_logger()
 
 
-def get_latest_commit_hash(file_path):
+@traced("git")
+def _git_log_latest_commit_hash(file_path):
     try:
         # Run the Git command to get the latest commit hash
         # for the specified file
@@ -28,6 +33,58 @@ def get_latest_commit_hash(file_path):
         return None
 
 
+@cache
+@traced("git")
+def get_commit_hash_index(folder: Path = Path(BASE_DIR, "contracts")) -> dict[Path, str]:
+    """
+    Build index of latest commit hashes for all files in folder with a single git invocation
+
+    Args:
+    folder (Path): Folder inside git repo
+    Returns:
+    dict[Path, str]: Resolved file path -> latest commit hash
+    """
+    try:
+        result = subprocess.run(
+            ["git", "log", "--pretty=format:%x00%H", "--name-only", "--relative", "--", "."],
+            cwd=folder,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        logger.warning(f"Error building commit hash index: {e}")
+        return {}
+
+    index = {}
+    commit_hash = None
+    for line in result.stdout.splitlines():
+        if line.startswith("\x00"):
+            commit_hash = line[1:]
+        elif line:
+            # log is newest first, so the first commit seen for a file is the latest one
+            index.setdefault(Path(folder, line).resolve(), commit_hash)
+    return index
+
+
+def get_latest_commit_hash(file_path):
+    commit_hash = get_commit_hash_index().get(Path(file_path).resolve())
+    if commit_hash is not None:
+        return commit_hash
+
+    # not committed yet or outside of indexed folder
+    return _git_log_latest_commit_hash(file_path)
+
+
+def get_github_url(contract_file: Path) -> str:
+    latest_git_commit_for_file = get_latest_commit_hash(contract_file)
+    contract_relative_path = get_relative_path(Path(contract_file))
+    return (
+        f"https://github.com/curvefi/curve-lite/blob/{latest_git_commit_for_file}/"
+        f"{'/'.join(contract_relative_path.parts[1:])}"
+    )
+
+
 def fetch_filename_from_version(contract_folder: Path, version: str):
 
     pattern = re.compile(rf".*_v_(\d+).vy")
@@ -74,9 +131,54 @@ def get_version_from_filename(filename: Path):
 
 
 def version_a_gt_version_b(a, b):
-    return list(map(int, a.split("."))) > list(map(int, b.split(".")))
+    # deployed versions are stored as contracts report them, some with "v" prefix (e.g. v3.0.0)
+    return list(map(int, a.removeprefix("v").split("."))) > list(map(int, b.removeprefix("v").split(".")))
+
+
+def get_agent_version(rollup_type: RollupType) -> str:
+    # for specific rollup types we shall deploy v_100 agent since it is
+    # vyper 0.3.10:
+    if rollup_type in ["arb_orbit", "op_stack", "polygon_cdk"]:
+        return "v_100"
+    return "v_000"  # just deploy latest version!
 
 
 def get_relative_path(contract_file: Path) -> Path:
     contracts_index = contract_file.parts.index("contracts")
     return Path("/").joinpath(*contract_file.parts[contracts_index:])
+
+
+def encode_constructor_args(abi: list[dict], ctor_args: tuple) -> bytes:
+    from boa.contracts.abi.abi_contract import ABIFunction
+    from boa.util.abi import abi_encode
+
+    ctor_abi_object = ABIFunction(next(i for i in abi if i["type"] == "constructor"), contract_name="ctor_abi")
+    abi_args = ctor_abi_object._merge_kwargs(*ctor_args)
+    return abi_encode(ctor_abi_object.signature, abi_args)
+
+
+def get_blueprint_initcode(bytecode: bytes, blueprint_preamble: bytes = b"\xFE\x71\x00") -> bytes:
+    # ERC-5202 blueprint: preamble disables calling the contract, initcode just returns the blueprint
+    blueprint_bytecode = blueprint_preamble + bytecode
+    len_blueprint_bytecode = len(blueprint_bytecode).to_bytes(2, "big")
+    return b"\x61" + len_blueprint_bytecode + b"\x3d\x81\x60\x0a\x3d\x39\xf3" + blueprint_bytecode
+
+
+def get_initcode(deployer, ctor_args: tuple = (), as_blueprint: bool = False) -> bytes:
+    """
+    Get deployment bytecode of a contract (or its blueprint)
+
+    Args:
+    deployer: boa deployer of the contract
+    ctor_args (tuple): Constructor arguments
+    as_blueprint (bool): Deploy as ERC-5202 blueprint
+    Returns:
+    bytes: Initcode
+    """
+    if as_blueprint:
+        if ctor_args:
+            raise ValueError("Blueprints are deployed without constructor arguments")
+        return get_blueprint_initcode(deployer.bytecode)
+    if ctor_args:
+        return deployer.bytecode + encode_constructor_args(deployer.abi, ctor_args)
+    return deployer.bytecode
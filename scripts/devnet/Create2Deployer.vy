@@ -0,0 +1,33 @@
+# pragma version 0.4.3
+
+"""
+@title Create2Deployer
+@notice deploy, computeAddress and computeAddressWithDeployer of create2deployer for local devnet, so that
+        deterministic deployments work without a fork. Initcode is capped at 49152 bytes (EIP-3860).
+"""
+
+MAX_INITCODE: constant(uint256) = 49152
+
+
+@external
+def deploy(amount: uint256, salt: bytes32, code: Bytes[MAX_INITCODE]):
+    deployed: address = raw_create(code, value=amount, salt=salt)
+
+
+@external
+@view
+def computeAddress(salt: bytes32, codeHash: bytes32) -> address:
+    return self._compute_address(salt, codeHash, self)
+
+
+@external
+@pure
+def computeAddressWithDeployer(salt: bytes32, codeHash: bytes32, deployer: address) -> address:
+    return self._compute_address(salt, codeHash, deployer)
+
+
+@internal
+@pure
+def _compute_address(salt: bytes32, codeHash: bytes32, deployer: address) -> address:
+    data: bytes32 = keccak256(concat(b"\xff", convert(deployer, bytes20), salt, codeHash))
+    return convert(convert(data, uint256) & convert(max_value(uint160), uint256), address)
@@ -0,0 +1,49 @@
+# pragma version 0.3.10
+
+"""
+@title Multicall3
+@notice aggregate3, getBlockNumber and getCurrentBlockTimestamp of Multicall3 for local devnet, so that view call
+        batching works without a fork.
+        Calldata and return data of each call are capped at 1024 bytes.
+"""
+
+MAX_CALLS: constant(uint256) = 128
+MAX_DATA: constant(uint256) = 1024
+
+
+struct Call3:
+    target: address
+    allowFailure: bool
+    callData: Bytes[MAX_DATA]
+
+
+struct Result:
+    success: bool
+    returnData: Bytes[MAX_DATA]
+
+
+@external
+@view
+def aggregate3(calls: DynArray[Call3, MAX_CALLS]) -> DynArray[Result, MAX_CALLS]:
+    results: DynArray[Result, MAX_CALLS] = []
+    for c in calls:
+        success: bool = False
+        return_data: Bytes[MAX_DATA] = b""
+        success, return_data = raw_call(
+            c.target, c.callData, max_outsize=MAX_DATA, is_static_call=True, revert_on_failure=False
+        )
+        assert success or c.allowFailure, "Multicall3: call failed"
+        results.append(Result({success: success, returnData: return_data}))
+    return results
+
+
+@external
+@view
+def getBlockNumber() -> uint256:
+    return block.number
+
+
+@external
+@view
+def getCurrentBlockTimestamp() -> uint256:
+    return block.timestamp
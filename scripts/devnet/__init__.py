@@ -0,0 +1,88 @@
+import click
+from eth_account import Account
+
+from scripts.logging_config import get_logger
+from settings.config import settings
+
+from .chain import DevnetChain
+from .server import DevnetServer, FaultConfig
+
+logger = get_logger()
+
+DEFAULT_BALANCE = 10**21  # 1000 of native currency
+
+
+def create_devnet(
+    chain_id: int,
+    fund: list[str] | None = None,
+    fork_url: str | None = None,
+    block_time: float = 0,
+    faults: FaultConfig | None = None,
+    host: str = "127.0.0.1",
+    port: int = 0,
+) -> DevnetServer:
+    """
+    Create devnet chain with Multicall3, CREATE2 deployer and funded accounts,
+    call `start` of the server to serve in background
+
+    Args:
+    chain_id (int): Chain id reported by devnet
+    fund (list[str] | None): Addresses to fund, deployer account by default
+    fork_url (str | None): RPC to fork state from, empty chain if None
+    block_time (float): Seconds between blocks, 0 to mine every transaction right away
+    faults (FaultConfig | None): Latency, rate limit and dropped requests
+    host (str): Host to listen on
+    port (int): Port to listen on, 0 for any free port
+    Returns:
+    DevnetServer: Server of the chain, its url is `server.url`
+    """
+    chain = DevnetChain(chain_id, block_time=block_time, fork_url=fork_url)
+    chain.install_multicall3()
+    chain.install_create2deployer()
+    if fund is None:
+        fund = [Account.from_key(settings.DEPLOYER_EOA_PRIVATE_KEY).address]
+    for address in fund:
+        chain.fund(address, DEFAULT_BALANCE)
+
+    return DevnetServer(chain, host, port, faults)
+
+
+@click.group(name="devnet")
+def devnet_commands():
+    """Commands related to local devnet"""
+    pass
+
+
+@devnet_commands.command("serve", short_help="run local json-rpc devnet on in-memory evm")
+@click.option("--chain-id", default=31337, type=click.INT, help="Chain id reported by devnet")
+@click.option("--fork", "fork_url", default=None, type=click.STRING, help="RPC url to fork state from")
+@click.option("--host", default="127.0.0.1", type=click.STRING)
+@click.option("--port", default=8545, type=click.INT)
+@click.option("--block-time", default=0.0, type=click.FLOAT, help="Seconds between blocks, 0 to mine every tx")
+@click.option("--latency", default=0.0, type=click.FLOAT, help="Seconds added to every request")
+@click.option("--jitter", default=0.0, type=click.FLOAT, help="Random seconds added on top of latency")
+@click.option("--rate-limit", default=0.0, type=click.FLOAT, help="Requests per second, 0 for unlimited")
+@click.option("--drop-rate", default=0.0, type=click.FLOAT, help="Share of requests dropped without response")
+@click.option("--seed", default=None, type=click.INT, help="Seed of jitter and dropped requests")
+@click.option("--fund", multiple=True, type=click.STRING, help="Address to fund (deployer account by default)")
+def run_devnet(
+    chain_id: int,
+    fork_url: str | None,
+    host: str,
+    port: int,
+    block_time: float,
+    latency: float,
+    jitter: float,
+    rate_limit: float,
+    drop_rate: float,
+    seed: int | None,
+    fund: tuple[str, ...],
+) -> None:
+    faults = FaultConfig(latency=latency, jitter=jitter, rate_limit=rate_limit, drop_rate=drop_rate, seed=seed)
+    server = create_devnet(chain_id, list(fund) or None, fork_url, block_time, faults, host, port)
+    logger.info(f"Devnet (chain id {chain_id}) is listening on {server.url}, press Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    logger.info(f"Served requests: {dict(server.stats.most_common())}")
@@ -0,0 +1,372 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import boa
+from eth_utils import keccak, to_checksum_address
+
+from scripts.deploy.compiler import load_partial
+from scripts.deploy.constants import CREATE2DEPLOYER_ADDRESS, MULTICALL3_ADDRESS
+from scripts.deploy.costs import get_intrinsic_gas
+from scripts.deploy.transactions import get_create_address
+from scripts.logging_config import get_logger
+from scripts.network import FORK_CACHE_DIR
+
+logger = get_logger()
+
+MULTICALL3_SOURCE = Path(__file__).parent / "Multicall3.vy"
+CREATE2DEPLOYER_SOURCE = Path(__file__).parent / "Create2Deployer.vy"
+
+BLOCK_GAS_LIMIT = 30_000_000
+ESTIMATE_GAS_MARGIN = 1.2  # covers gas retained by 63/64 rule of subcalls
+REPLACEMENT_FEE_BUMP = 1.1  # same nonce is only replaced with at least +10% fees
+ZERO_ADDRESS = "0x" + "00" * 20
+ZERO_HASH = "0x" + "00" * 32
+
+# block tags that resolve to the head of the chain, state is never historical
+HEAD_TAGS = {"latest", "pending", "safe", "finalized"}
+
+
+class JSONRPCError(Exception):
+    def __init__(self, message: str, code: int = -32000, data: str | None = None):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.data = data
+
+    def to_json(self) -> dict:
+        error = {"code": self.code, "message": self.message}
+        if self.data is not None:
+            error["data"] = self.data
+        return error
+
+
+@dataclass
+class PoolTransaction:
+    tx: object  # signed py-evm transaction
+    tx_hash: str
+    received_at: float
+
+
+def _to_hex_bytes(value: bytes) -> str:
+    return "0x" + value.hex()
+
+
+def _from_hex(value: str | None) -> bytes:
+    return bytes.fromhex((value or "0x").removeprefix("0x"))
+
+
+class DevnetChain:
+    """
+    Chain served by local devnet: boa's in-memory evm (optionally forked from a real chain),
+    a pool of pending transactions and blocks mined on every transaction or every `block_time` seconds.
+    Block tags of reads are accepted, but state is always served at the head of the chain.
+    """
+
+    def __init__(
+        self,
+        chain_id: int,
+        block_time: float = 0,
+        base_fee: int = 10**9,
+        priority_fee: int = 10**8,
+        fork_url: str | None = None,
+    ):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.base_fee = base_fee
+        self.priority_fee = priority_fee
+
+        self.env = boa.Env()
+        if fork_url is not None:
+            self.env.fork(fork_url, block_identifier="latest", deprecated=False, cache_dir=str(FORK_CACHE_DIR))
+        self.env.evm.patch.chain_id = chain_id
+        self.env.evm.patch.timestamp = max(self.env.evm.patch.timestamp, int(time.time()))
+
+        self.blocks: dict[int, dict] = {}
+        self.transactions: dict[str, dict] = {}
+        self.receipts: dict[str, dict] = {}
+        self._pool: dict[tuple[bytes, int], PoolTransaction] = {}
+
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._miner: threading.Thread | None = None
+
+        self._make_block([], 0)
+
+    @property
+    def block_number(self) -> int:
+        return self.env.evm.patch.block_number
+
+    def start(self) -> None:
+        if self.block_time > 0:
+            self._miner = threading.Thread(target=self._mine_blocks, name="miner", daemon=True)
+            self._miner.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._miner is not None:
+            self._miner.join()
+
+    def _mine_blocks(self) -> None:
+        while not self._stopped.wait(self.block_time):
+            self.mine()
+
+    def fund(self, address: str, amount: int) -> None:
+        with self._lock:
+            self.env.set_balance(address, amount)
+
+    def _install(self, source: Path, address: str) -> None:
+        # put contract at its canonical address unless the chain (fork) already has it
+        with self._lock:
+            if self.env.get_code(address):
+                return
+            _, runtime_code = self.env.deploy_code(bytecode=load_partial(source).bytecode)
+            self.env.set_code(address, runtime_code)
+
+    def install_multicall3(self, address: str = MULTICALL3_ADDRESS) -> None:
+        """
+        Put Multicall3 at its canonical address unless the chain (fork) already has it
+        """
+        self._install(MULTICALL3_SOURCE, address)
+
+    def install_create2deployer(self, address: str = CREATE2DEPLOYER_ADDRESS) -> None:
+        """
+        Put CREATE2 deployer at its canonical address unless the chain (fork) already has it
+        """
+        self._install(CREATE2DEPLOYER_SOURCE, address)
+
+    def _get_nonce(self, sender: bytes) -> int:
+        return self.env.evm.vm.state.get_nonce(sender)
+
+    def _make_block(self, tx_hashes: list[str], gas_used: int) -> dict:
+        number = self.block_number
+        parent = self.blocks.get(number - 1)
+        parent_hash = parent["hash"] if parent is not None else ZERO_HASH
+        block = {
+            "number": hex(number),
+            "hash": _to_hex_bytes(keccak(f"{self.chain_id}:{number}:{parent_hash}".encode())),
+            "parentHash": parent_hash,
+            "timestamp": hex(self.env.evm.patch.timestamp),
+            "gasLimit": hex(BLOCK_GAS_LIMIT),
+            "gasUsed": hex(gas_used),
+            "baseFeePerGas": hex(self.base_fee),
+            "miner": ZERO_ADDRESS,
+            "transactions": tx_hashes,
+        }
+        self.blocks[number] = block
+        return block
+
+    def _pop_ready(self, pool: dict[tuple[bytes, int], PoolTransaction]):
+        # transactions whose nonce is next for the sender, in order of arrival
+        while True:
+            ready = [key for key in pool if key[1] == self._get_nonce(key[0])]
+            if not ready:
+                return
+            yield pool.pop(min(ready, key=lambda key: pool[key].received_at))
+
+    def _execute(self, sender: str, to: str | None, data: bytes, value: int, gas: int):
+        if to is None:
+            _, computation = self.env.deploy(sender=sender, gas=gas, value=value, bytecode=data)
+            return computation
+        return self.env.execute_code(to_address=to, sender=sender, gas=gas, value=value, data=data)
+
+    def _apply(self, pool_transaction: PoolTransaction, index: int, cumulative_gas_used: int) -> dict:
+        tx = pool_transaction.tx
+        sender = to_checksum_address(tx.sender)
+        to = to_checksum_address(tx.to) if tx.to else None
+        intrinsic_gas = get_intrinsic_gas(tx.data, is_create=to is None)
+        gas_price = min(tx.max_fee_per_gas, self.base_fee + tx.max_priority_fee_per_gas)
+
+        contract_address = None
+        if to is None:
+            # nonce is incremented by contract creation itself
+            contract_address = get_create_address(sender, tx.nonce)
+        else:
+            self.env.evm.vm.state.increment_nonce(tx.sender)
+        computation = self._execute(sender, to, tx.data, tx.value, tx.gas - intrinsic_gas)
+
+        gas_used = intrinsic_gas + computation.get_gas_used()
+        gas_used -= min(computation.get_gas_refund(), gas_used // 5)
+        self.env.evm.vm.state.delta_balance(tx.sender, -gas_used * gas_price)
+
+        logs = [
+            {
+                "address": to_checksum_address(address),
+                "topics": ["0x" + topic.to_bytes(32, "big").hex() for topic in topics],
+                "data": _to_hex_bytes(data),
+                "logIndex": hex(log_index),
+                "transactionHash": pool_transaction.tx_hash,
+            }
+            for log_index, (address, topics, data) in enumerate(computation.get_log_entries())
+        ]
+        return {
+            "transactionHash": pool_transaction.tx_hash,
+            "transactionIndex": hex(index),
+            "from": sender,
+            "to": to,
+            "contractAddress": None if computation.is_error else contract_address,
+            "gasUsed": hex(gas_used),
+            "cumulativeGasUsed": hex(cumulative_gas_used + gas_used),
+            "effectiveGasPrice": hex(gas_price),
+            "status": "0x0" if computation.is_error else "0x1",
+            "logs": logs,
+            "logsBloom": "0x" + "00" * 256,
+            "type": hex(getattr(tx, "type_id", 0)),
+        }
+
+    def mine(self) -> dict:
+        """
+        Mine block with ready transactions of the pool
+
+        Returns:
+        dict: Mined block
+        """
+        with self._lock:
+            patch = self.env.evm.patch
+            patch.block_number += 1
+            patch.timestamp = max(patch.timestamp + 1, int(time.time()))
+
+            receipts, gas_used = [], 0
+            for pool_transaction in self._pop_ready(self._pool):
+                if gas_used + pool_transaction.tx.gas > BLOCK_GAS_LIMIT:
+                    # doesn't fit, goes to the next block
+                    self._pool[(pool_transaction.tx.sender, pool_transaction.tx.nonce)] = pool_transaction
+                    break
+                # transaction boundary: storage written so far becomes original and slots cold again (EIP-2200/2929)
+                self.env.evm.vm.state.lock_changes()
+                receipt = self._apply(pool_transaction, len(receipts), gas_used)
+                gas_used = int(receipt["cumulativeGasUsed"], 16)
+                receipts.append(receipt)
+
+            block = self._make_block([receipt["transactionHash"] for receipt in receipts], gas_used)
+            for receipt in receipts:
+                location = {"blockNumber": block["number"], "blockHash": block["hash"]}
+                for log in receipt["logs"]:
+                    log.update(location)
+                self.receipts[receipt["transactionHash"]] = {**receipt, **location}
+                self.transactions[receipt["transactionHash"]].update(
+                    {**location, "transactionIndex": receipt["transactionIndex"]}
+                )
+            return block
+
+    def send_raw_transaction(self, raw_transaction: str) -> str:
+        tx = self.env.evm.vm.get_transaction_builder().decode(_from_hex(raw_transaction))
+        tx_hash = _to_hex_bytes(tx.hash)
+
+        with self._lock:
+            chain_id = getattr(tx, "chain_id", None)
+            if chain_id is not None and chain_id != self.chain_id:
+                raise JSONRPCError(f"invalid chain id {chain_id}")
+            if tx.nonce < self._get_nonce(tx.sender):
+                raise JSONRPCError("nonce too low")
+            if tx.max_fee_per_gas < self.base_fee:
+                raise JSONRPCError("max fee per gas less than block base fee")
+            if tx.gas < get_intrinsic_gas(tx.data, is_create=not tx.to):
+                raise JSONRPCError("intrinsic gas too low")
+            if self.env.get_balance(to_checksum_address(tx.sender)) < tx.gas * tx.max_fee_per_gas + tx.value:
+                raise JSONRPCError("insufficient funds for gas * price + value")
+
+            replaced = self._pool.get((tx.sender, tx.nonce))
+            if replaced is not None:
+                if tx.max_fee_per_gas < replaced.tx.max_fee_per_gas * REPLACEMENT_FEE_BUMP:
+                    raise JSONRPCError("replacement transaction underpriced")
+                self.transactions.pop(replaced.tx_hash, None)
+
+            self._pool[(tx.sender, tx.nonce)] = PoolTransaction(tx, tx_hash, time.time())
+            self.transactions[tx_hash] = {
+                "hash": tx_hash,
+                "type": hex(getattr(tx, "type_id", 0)),
+                "nonce": hex(tx.nonce),
+                "from": to_checksum_address(tx.sender),
+                "to": to_checksum_address(tx.to) if tx.to else None,
+                "value": hex(tx.value),
+                "gas": hex(tx.gas),
+                "maxFeePerGas": hex(tx.max_fee_per_gas),
+                "maxPriorityFeePerGas": hex(tx.max_priority_fee_per_gas),
+                "input": _to_hex_bytes(tx.data),
+                "chainId": hex(self.chain_id),
+                "blockNumber": None,
+                "blockHash": None,
+                "transactionIndex": None,
+            }
+
+            if self.block_time == 0:
+                self.mine()
+        return tx_hash
+
+    @contextmanager
+    def _simulation(self, block_tag: str):
+        # reads at "pending" see transactions of the pool
+        with self._lock:
+            # changes can't be locked inside of anchor, so pending transactions only reset warm slots,
+            # storage they write is charged as already dirty in simulated call
+            self.env.evm.vm.state.lock_changes()
+            with self.env.anchor():
+                if block_tag == "pending":
+                    pool = dict(self._pool)
+                    for index, pool_transaction in enumerate(self._pop_ready(pool)):
+                        self._apply(pool_transaction, index, 0)
+                        self.env.evm.reset_access_counters()
+                yield
+
+    def _simulate(self, params: dict, block_tag: str, gas: int):
+        data = _from_hex(params.get("data") or params.get("input"))
+        to = to_checksum_address(params["to"]) if params.get("to") else None
+        with self._simulation(block_tag):
+            computation = self._execute(
+                to_checksum_address(params.get("from") or ZERO_ADDRESS),
+                to,
+                data,
+                int(params.get("value") or "0x0", 16),
+                gas,
+            )
+        if computation.is_error:
+            raise JSONRPCError("execution reverted", code=3, data=_to_hex_bytes(computation.output))
+        return computation
+
+    def call(self, params: dict, block_tag: str = "latest") -> str:
+        gas = int(params["gas"], 16) if params.get("gas") else BLOCK_GAS_LIMIT
+        return _to_hex_bytes(self._simulate(params, block_tag, gas).output)
+
+    def estimate_gas(self, params: dict, block_tag: str = "latest") -> str:
+        computation = self._simulate(params, block_tag, BLOCK_GAS_LIMIT)
+        data = _from_hex(params.get("data") or params.get("input"))
+        intrinsic_gas = get_intrinsic_gas(data, is_create=not params.get("to"))
+        return hex(intrinsic_gas + int(computation.get_gas_used() * ESTIMATE_GAS_MARGIN))
+
+    def get_transaction_count(self, address: str, block_tag: str = "latest") -> str:
+        with self._lock:
+            sender = _from_hex(address)
+            nonce = self._get_nonce(sender)
+            if block_tag == "pending":
+                while (sender, nonce) in self._pool:
+                    nonce += 1
+            return hex(nonce)
+
+    def get_balance(self, address: str) -> str:
+        with self._lock:
+            return hex(self.env.get_balance(address))
+
+    def get_code(self, address: str) -> str:
+        with self._lock:
+            return _to_hex_bytes(self.env.get_code(address))
+
+    def get_storage_at(self, address: str, slot: str) -> str:
+        with self._lock:
+            return "0x" + self.env.get_storage(address, int(slot, 16)).to_bytes(32, "big").hex()
+
+    def get_block(self, block_tag: str, full_transactions: bool = False) -> dict | None:
+        with self._lock:
+            if block_tag in HEAD_TAGS:
+                number = self.block_number
+            elif block_tag == "earliest":
+                number = min(self.blocks)
+            else:
+                number = int(block_tag, 16)
+
+            block = self.blocks.get(number)
+            if block is None or not full_transactions:
+                return block
+            return {**block, "transactions": [self.transactions[h] for h in block["transactions"]]}
@@ -0,0 +1,184 @@
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from scripts.logging_config import get_logger
+
+from .chain import DevnetChain, JSONRPCError
+
+logger = get_logger()
+
+
+@dataclass
+class FaultConfig:
+    latency: float = 0.0  # seconds added to every http request
+    jitter: float = 0.0  # up to this many seconds added on top of latency
+    rate_limit: float = 0.0  # http requests per second, 0 for unlimited
+    drop_rate: float = 0.0  # share of http requests dropped without response
+    seed: int | None = None
+
+
+class RateLimiter:
+    """
+    Token bucket allowing bursts of up to one second worth of requests
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+class DevnetServer:
+    """
+    JSON-RPC endpoint of DevnetChain with injected latency, rate limiting and dropped requests.
+    Counts requests per method, so that benchmarks can report rpc usage.
+    """
+
+    def __init__(self, chain: DevnetChain, host: str = "127.0.0.1", port: int = 8545, faults: FaultConfig = None):
+        self.chain = chain
+        self.faults = faults or FaultConfig()
+        self.stats: Counter = Counter()
+
+        self._random = random.Random(self.faults.seed)
+        self._random_lock = threading.Lock()
+        self._rate_limiter = RateLimiter(self.faults.rate_limit) if self.faults.rate_limit > 0 else None
+        self._stats_lock = threading.Lock()
+
+        self._methods = {
+            "eth_chainId": lambda: hex(chain.chain_id),
+            "net_version": lambda: str(chain.chain_id),
+            "web3_clientVersion": lambda: "curve-core-devnet",
+            "eth_accounts": lambda: [],
+            "eth_blockNumber": lambda: hex(chain.block_number),
+            "eth_getBlockByNumber": chain.get_block,
+            "eth_gasPrice": lambda: hex(chain.base_fee + chain.priority_fee),
+            "eth_maxPriorityFeePerGas": lambda: hex(chain.priority_fee),
+            "eth_getBalance": lambda address, block_tag="latest": chain.get_balance(address),
+            "eth_getCode": lambda address, block_tag="latest": chain.get_code(address),
+            "eth_getStorageAt": lambda address, slot, block_tag="latest": chain.get_storage_at(address, slot),
+            "eth_getTransactionCount": chain.get_transaction_count,
+            "eth_call": chain.call,
+            "eth_estimateGas": chain.estimate_gas,
+            "eth_sendRawTransaction": chain.send_raw_transaction,
+            "eth_getTransactionByHash": lambda tx_hash: chain.transactions.get(tx_hash),
+            "eth_getTransactionReceipt": lambda tx_hash: chain.receipts.get(tx_hash),
+        }
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _random_value(self) -> float:
+        with self._random_lock:
+            return self._random.random()
+
+    def _dispatch(self, request: dict) -> dict:
+        method = request.get("method")
+        with self._stats_lock:
+            self.stats[method] += 1
+
+        response = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            if method not in self._methods:
+                raise JSONRPCError(f"the method {method} does not exist/is not available", code=-32601)
+            response["result"] = self._methods[method](*request.get("params", []))
+        except JSONRPCError as e:
+            response["error"] = e.to_json()
+        except TypeError as e:
+            response["error"] = JSONRPCError(f"invalid params: {e}", code=-32602).to_json()
+        except Exception as e:
+            logger.debug(f"{method} failed: {e!r}")
+            response["error"] = JSONRPCError(str(e)).to_json()
+        return response
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: dict | list) -> None:
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                faults = server.faults
+
+                if faults.latency or faults.jitter:
+                    time.sleep(faults.latency + faults.jitter * server._random_value())
+
+                if faults.drop_rate and server._random_value() < faults.drop_rate:
+                    # connection is closed without response, client sees it as a network error
+                    self.close_connection = True
+                    return
+
+                if server._rate_limiter is not None and not server._rate_limiter.allow():
+                    self._reply(
+                        429, {"jsonrpc": "2.0", "id": None, "error": {"code": -32005, "message": "rate limited"}}
+                    )
+                    return
+
+                try:
+                    request = json.loads(body)
+                except json.JSONDecodeError:
+                    self._reply(
+                        200, {"jsonrpc": "2.0", "id": None, "error": {"code": -32700, "message": "parse error"}}
+                    )
+                    return
+
+                if isinstance(request, list):
+                    self._reply(200, [server._dispatch(item) for item in request])
+                else:
+                    self._reply(200, server._dispatch(request))
+
+        return Handler
+
+    def start(self) -> "DevnetServer":
+        """
+        Serve in background thread
+        """
+        self.chain.start()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="devnet", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self.chain.start()
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.chain.stop()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.chain.stop()
+        if self._thread is not None:
+            self._thread.join()
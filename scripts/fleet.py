@@ -0,0 +1,184 @@
+import json
+import logging
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable
+
+from scripts.logging_config import LOGGER_CONFIG, get_logger
+from settings.config import BASE_DIR, CACHE_DIR, get_chain_settings
+
+logger = get_logger()
+
+CHAINS_DIR = Path(BASE_DIR, "settings", "chains")
+FLEET_DIR = Path(CACHE_DIR, "fleet")
+
+
+def get_chain_config_files(pattern: str) -> list[str]:
+    """
+    Get chain config files matching glob pattern
+
+    Args:
+    pattern (str): Glob relative to settings/chains, e.g. "prod/*.yaml"
+    Returns:
+    list[str]: Chain config files relative to settings/chains
+    """
+    return sorted(str(path.relative_to(CHAINS_DIR)) for path in CHAINS_DIR.glob(pattern) if path.is_file())
+
+
+def _read_ownership_report(chain_config_file: str, since: float) -> dict | None:
+    # ownership report written by transfer_ownership during this run of the chain
+    from scripts.deploy.governance.xgov import get_ownership_report_path
+
+    report_path = get_ownership_report_path(get_chain_settings(chain_config_file))
+    if not report_path.exists() or report_path.stat().st_mtime < since:
+        return None
+    with open(report_path, "r") as file:
+        return json.load(file)
+
+
+def get_ownership_audit(results: list[dict]) -> dict:
+    """
+    Combine ownership reports of chains into fleet-wide audit of contracts not owned by ownership admin
+
+    Args:
+    results (list[dict]): Results of run_fleet
+    Returns:
+    dict: Chain -> ownership admin, contracts still owned by someone else (deployer) and contracts with unread owner
+    """
+    audit = {}
+    for result in results:
+        report = result.get("ownership")
+        if report is None:
+            continue
+        owner = report["owner"].lower()
+        audit[result["chain"]] = {
+            "owner": report["owner"],
+            "not_transferred": {
+                name: contract["owner_after"]
+                for name, contract in report["contracts"].items()
+                if not contract["unread"] and (contract["owner_after"] or "").lower() != owner
+            },
+            "unread": report["unread"],
+        }
+    return audit
+
+
+def _run_chain(
+    task: Callable,
+    chain_config_file: str,
+    read_only: bool,
+    get_fork_block: Callable | None,
+    kwargs: dict,
+    log_file: Path,
+) -> dict:
+    # each chain runs in a fresh process: own boa env, deployment files and log
+    from scripts.network import get_provider_url, setup_network_env
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(f"%(asctime)s {chain_config_file} %(message)s"))
+    root_logger.addHandler(file_handler)
+    root_logger.setLevel(LOGGER_CONFIG["level"])
+
+    started_at = time.time()
+    result = {"chain": chain_config_file, "log_file": str(log_file)}
+    try:
+        fork_block = get_fork_block(chain_config_file) if get_fork_block is not None else None
+        setup_network_env(get_provider_url(get_chain_settings(chain_config_file), read_only=read_only), fork_block)
+        output = task(chain_config_file, **kwargs)
+        result["status"] = "ok"
+        if output is not None:
+            result["output"] = output
+    except Exception as e:  # report failure of the chain instead of stopping the fleet
+        logging.getLogger().error(traceback.format_exc())
+        result.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+
+    try:
+        ownership = _read_ownership_report(chain_config_file, started_at)
+        if ownership is not None:
+            result["ownership"] = ownership
+    except Exception:  # missing audit must not hide result of the chain
+        logging.getLogger().error(traceback.format_exc())
+    result["duration"] = round(time.time() - started_at, 1)
+    return result
+
+
+def run_fleet(
+    name: str,
+    task: Callable,
+    chain_config_files: list[str],
+    max_workers: int | None = None,
+    read_only: bool = False,
+    get_fork_block: Callable | None = None,
+    **kwargs,
+) -> list[dict]:
+    """
+    Run task for several chains concurrently, one worker process per chain
+
+    Args:
+    name (str): Name of the run, used for log and report paths
+    task (Callable): Module-level function called as task(chain_config_file, **kwargs),
+    json-serializable return value is included into report
+    chain_config_files (list[str]): Chain config files
+    max_workers (int | None): Number of chains processed at the same time (defaults to number of chains)
+    read_only (bool): Task doesn't send transactions, chains without rpc url in settings may use public rpc
+    get_fork_block (Callable | None): Module-level function called as get_fork_block(chain_config_file), block
+    to fork the chain at in debug mode (None for latest)
+    Returns:
+    list[dict]: Result of every chain
+    """
+    run_dir = Path(FLEET_DIR, f"{name}_{time.strftime('%Y%m%d_%H%M%S')}")
+    run_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Running {name} on {len(chain_config_files)} chains, logs in {run_dir.relative_to(BASE_DIR)}")
+
+    results = []
+    # spawn, so that no boa env or cached state is inherited from this process
+    with ProcessPoolExecutor(
+        max_workers=max_workers or len(chain_config_files), mp_context=get_context("spawn")
+    ) as executor:
+        futures = {
+            executor.submit(
+                _run_chain,
+                task,
+                chain_config_file,
+                read_only,
+                get_fork_block,
+                kwargs,
+                Path(run_dir, f"{Path(chain_config_file).stem}.log"),
+            ): chain_config_file
+            for chain_config_file in chain_config_files
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            message = f"[{len(results)}/{len(futures)}] {result['chain']} {result['status']} in {result['duration']}s"
+            if result["status"] == "ok":
+                logger.info(message)
+            else:
+                logger.error(f"{message}: {result['error']}")
+
+    results.sort(key=lambda result: result["chain"])
+    ownership = get_ownership_audit(results)
+    report_path = Path(run_dir, "report.json")
+    with open(report_path, "w") as file:
+        json.dump({"name": name, "results": results, "ownership": ownership}, file, indent=4)
+
+    for chain, audit in ownership.items():
+        if audit["not_transferred"] or audit["unread"]:
+            logger.warning(
+                f"{chain}: {len(audit['not_transferred'])} contracts not owned by {audit['owner']}, "
+                f"{len(audit['unread'])} with unread owner"
+            )
+
+    failed = [result["chain"] for result in results if result["status"] != "ok"]
+    logger.info(
+        f"{len(results) - len(failed)}/{len(results)} chains succeeded, report: {report_path.relative_to(BASE_DIR)}"
+    )
+    if failed:
+        logger.error(f"Failed chains: {', '.join(failed)}")
+    return results
@@ -0,0 +1,112 @@
+import functools
+from pathlib import Path
+
+from scripts.logging_config import get_logger
+from scripts.tracing import trace_network_env, trace_rpc
+from settings.config import CACHE_DIR, settings
+from settings.models import ChainConfig
+
+logger = get_logger()
+
+# on-disk cache of fork reads, one sqlite db per chain keyed by rpc method and params (block, address, slot)
+FORK_CACHE_DIR = Path(CACHE_DIR, "fork")
+
+_provider_url: str | None = None
+
+
+def get_provider_url(chain_settings: ChainConfig, read_only: bool = False) -> str:
+    """
+    Get RPC url of the chain from WEB3_PROVIDER_URLS setting. Public rpc of chain config is used as fallback only
+    for forks (DEBUG) and read-only commands, transactions are never sent through it
+
+    Args:
+    chain_settings (ChainConfig): Chain config
+    read_only (bool): Command doesn't send transactions
+    Returns:
+    str: RPC url
+    """
+    provider_url = settings.WEB3_PROVIDER_URLS.get(chain_settings.file_name)
+    if provider_url is None:
+        if not (settings.DEBUG or read_only):
+            raise ValueError(f"No rpc url for {chain_settings.file_name} in WEB3_PROVIDER_URLS")
+        logger.warning(f"No rpc url for {chain_settings.file_name} in WEB3_PROVIDER_URLS, using public rpc.")
+        provider_url = chain_settings.public_rpc_url
+    return provider_url
+
+
+def setup_network_env(provider_url: str, fork_block: int | None = None) -> None:
+    """
+    Set up boa env: fork of the chain in debug mode, network env with deployer account otherwise
+
+    Args:
+    provider_url (str): RPC url
+    fork_block (int | None): Debug mode only, block to fork at (latest if None). Fork reads of the same block are
+    served from disk cache of previous runs
+    """
+    global _provider_url
+
+    # boa is imported here, so that commands without network don't pay for it on startup
+    import boa
+    from eth_account import Account
+
+    _provider_url = provider_url
+    if settings.DEBUG:
+        if fork_block is not None:
+            logger.info(f"Forking at block {fork_block} ...")
+        _fork(provider_url, fork_block)
+    else:
+        boa.set_network_env(provider_url)
+        boa.env.add_account(Account.from_key(settings.DEPLOYER_EOA_PRIVATE_KEY))
+        trace_network_env()
+
+
+def _fork(provider_url: str, fork_block: int | None) -> None:
+    """
+    Fork the chain as boa.fork does, but with rpc wrapped for tracing before the fork (and its caching rpc) is built
+    """
+    import boa
+    from boa.rpc import EthereumRPC
+
+    env = boa.Env()
+    env.fork_rpc(
+        trace_rpc(EthereumRPC(provider_url)), block_identifier=fork_block or "latest", cache_dir=str(FORK_CACHE_DIR)
+    )
+    boa.set_env(env)
+
+
+def get_current_provider_url() -> str | None:
+    """
+    Get RPC url boa env was set up with, None if it wasn't set up
+    """
+    return _provider_url
+
+
+def requires_network(func):
+    """
+    Decorator of commands working with the chain: sets up network env of WEB3_PROVIDER_URL before the command runs
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        setup_network_env(settings.WEB3_PROVIDER_URL)
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def get_fork_block_number() -> int:
+    """
+    Get block number the chain is forked at (debug mode)
+    """
+    import boa
+
+    return boa.env.evm.patch.block_number
+
+
+def get_gas_price() -> int:
+    """
+    Get current gas price of the chain boa env is set up for (also works for forks)
+    """
+    from boa.rpc import EthereumRPC
+
+    return int(EthereumRPC(_provider_url).fetch("eth_gasPrice", []), 16)
@@ -0,0 +1 @@
+from .columnar import Column, Snapshot, write_snapshot
@@ -0,0 +1,176 @@
+import json
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+MAGIC = b"CRVSNAP1"
+ALIGNMENT = 32
+
+# bytes per value: addresses are raw 20 bytes, uint256 are big-endian (as in abi), small integers are little-endian,
+# so that their columns can be read with memoryview.cast("Q") / cast("B")
+ITEM_SIZES = {"address": 20, "uint256": 32, "uint64": 8, "uint8": 1}
+CAST_FORMATS = {"uint64": "Q", "uint8": "B"}
+
+# File layout: MAGIC, uint64 (little-endian) length of json header, json header, then every column as one contiguous
+# array of fixed size values (row after row), each aligned to ALIGNMENT. Column offsets in header are relative to the
+# start of the first column, values of missing rows/reads are zero.
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    dtype: str  # key of ITEM_SIZES
+    width: int = 1  # values per row
+
+    @property
+    def row_size(self) -> int:
+        return ITEM_SIZES[self.dtype] * self.width
+
+    def encode(self, value: Any) -> bytes:
+        if self.dtype == "address":
+            return bytes.fromhex(str(value).removeprefix("0x")).rjust(20, b"\0")
+        if self.dtype == "uint256":
+            return value.to_bytes(32, "big")
+        return value.to_bytes(ITEM_SIZES[self.dtype], "little")
+
+    def decode(self, data: bytes | memoryview) -> Any:
+        if self.dtype == "address":
+            return "0x" + bytes(data).hex()
+        if self.dtype == "uint256":
+            return int.from_bytes(data, "big")
+        return int.from_bytes(data, "little")
+
+
+def write_snapshot(path: str | Path, columns: list[Column], rows: list[dict[str, Any]], meta: dict) -> Path:
+    """
+    Write rows as columnar file, atomically (readers never see partially written file)
+
+    Args:
+    path (str | Path): File to write
+    columns (list[Column]): Columns of the file
+    rows (list[dict[str, Any]]): Values of every row by column name, list of `width` values for columns wider than 1,
+    missing values are written as zeros
+    meta (dict): Json serializable info stored in header (block number, chain, ...)
+    Returns:
+    Path: Path of the file
+    """
+    path = Path(path)
+    offsets, offset = {}, 0
+    for column in columns:
+        offsets[column.name] = offset
+        offset = _align(offset + column.row_size * len(rows))
+
+    header = {
+        "n_rows": len(rows),
+        "meta": meta,
+        "columns": [{"name": c.name, "dtype": c.dtype, "width": c.width, "offset": offsets[c.name]} for c in columns],
+    }
+    header_bytes = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as file:
+        file.write(MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes)
+        for column in columns:
+            file.seek(data_start + offsets[column.name])
+            zero = b"\0" * ITEM_SIZES[column.dtype]
+            chunks = []
+            for row in rows:
+                values = row.get(column.name)
+                if column.width == 1:
+                    values = [values]
+                elif values is None:
+                    values = [None] * column.width
+                chunks.extend(zero if value is None else column.encode(value) for value in values)
+            file.write(b"".join(chunks))
+        # pad last column, so that file size is predictable and mmap of empty columns works
+        file.truncate(data_start + offset)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Snapshot:
+    """
+    Memory mapped columnar file written by write_snapshot. Opening reads only the header, values are decoded on
+    access, raw columns are available as memoryviews (release them before the snapshot is closed):
+
+        with Snapshot(path) as snapshot:
+            snapshot.meta["block_number"], len(snapshot)
+            n_coins = snapshot.array("n_coins")  # uint64 column as array
+            snapshot.row(0)  # {"pool": "0x...", "balances": [...], ...}
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        if self._view[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a snapshot file")
+        (header_size,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        header_start = len(MAGIC) + 8
+        header = json.loads(bytes(self._view[header_start : header_start + header_size]))
+
+        self.meta: dict = header["meta"]
+        self.n_rows: int = header["n_rows"]
+        self.columns: dict[str, Column] = {}
+        self._offsets: dict[str, int] = {}
+        data_start = _align(header_start + header_size)
+        for column in header["columns"]:
+            self.columns[column["name"]] = Column(column["name"], column["dtype"], column["width"])
+            self._offsets[column["name"]] = data_start + column["offset"]
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def column(self, name: str) -> memoryview:
+        """
+        Raw bytes of the column, `row_size` bytes per row
+        """
+        start = self._offsets[name]
+        return self._view[start : start + self.columns[name].row_size * self.n_rows]
+
+    def array(self, name: str) -> memoryview:
+        """
+        uint64/uint8 column as array of integers (`width` values per row)
+        """
+        return self.column(name).cast(CAST_FORMATS[self.columns[name].dtype])
+
+    def value(self, name: str, index: int) -> Any:
+        """
+        Decoded value of the column at row, list of values for columns wider than 1
+        """
+        if not 0 <= index < self.n_rows:
+            raise IndexError(f"row {index} out of range")
+
+        column = self.columns[name]
+        item_size = ITEM_SIZES[column.dtype]
+        start = self._offsets[name] + column.row_size * index
+        values = [
+            column.decode(self._view[start + k * item_size : start + (k + 1) * item_size]) for k in range(column.width)
+        ]
+        return values[0] if column.width == 1 else values
+
+    def row(self, index: int) -> dict[str, Any]:
+        return {name: self.value(name, index) for name in self.columns}
+
+    def close(self) -> None:
+        self._view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "Snapshot":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
@@ -0,0 +1,21 @@
+import click
+
+from scripts.network import requires_network
+
+
+@click.group(name="snapshot")
+def snapshot_commands():
+    """Commands related to snapshots of chain state"""
+    pass
+
+
+@snapshot_commands.command("pools", short_help="write state of all metaregistry pools to columnar file")
+@click.argument("chain_config_file", type=click.STRING)
+@click.option("--output", default=None, type=click.Path(dir_okay=False), help="File to write")
+@click.option("--batch-size", default=16, type=click.INT, help="Pools read per multicall")
+@click.option("--workers", default=4, type=click.INT, help="Number of multicalls executed concurrently")
+@requires_network
+def run_snapshot_pools(chain_config_file: str, output: str | None = None, batch_size: int = 16, workers: int = 4):
+    from scripts.snapshot.pools import snapshot_pools
+
+    snapshot_pools(chain_config_file, output, batch_size=batch_size, workers=workers)
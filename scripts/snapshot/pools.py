@@ -0,0 +1,142 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from boa.contracts.abi.abi_contract import ABIContract, ABIFunction, ABIOverload
+
+from scripts.deploy.deployment_file import get_deployment_obj
+from scripts.deploy.multicall import DeferredCall, Multicall
+from scripts.logging_config import get_logger
+from settings.config import CACHE_DIR, get_chain_settings, settings
+
+from .columnar import Column, write_snapshot
+
+logger = get_logger()
+
+SNAPSHOTS_DIR = Path(CACHE_DIR, "snapshots")
+
+POOL_COLUMNS = [
+    Column("pool", "address"),
+    Column("lp_token", "address"),
+    Column("gauge", "address"),
+    Column("n_coins", "uint64"),
+    Column("coins", "address", 8),
+    Column("decimals", "uint64", 8),
+    Column("balances", "uint256", 8),
+    Column("fees", "uint256", 10),
+    Column("pool_params", "uint256", 20),
+    Column("failed", "uint64"),  # bit k is set if metaregistry getter of POOL_GETTERS[k] reverted for the pool
+]
+
+# column: metaregistry getter, called with pool address only (registry handler 0)
+POOL_GETTERS = {
+    "lp_token": "get_lp_token",
+    "gauge": "get_gauge",
+    "n_coins": "get_n_coins",
+    "coins": "get_coins",
+    "decimals": "get_decimals",
+    "balances": "get_balances",
+    "fees": "get_fees",
+    "pool_params": "get_pool_params",
+}
+
+
+def _pool_getter(metaregistry: ABIContract, name: str) -> ABIFunction:
+    # metaregistry getters are overloaded with registry handler index, take the one with pool only
+    function = getattr(metaregistry, name)
+    if isinstance(function, ABIOverload):
+        return next(f for f in function.functions if len(f._abi["inputs"]) == 1)
+    return function
+
+
+def _read_pool_list(metaregistry: ABIContract, multicall_address: str, block: int, indices: range) -> list[str]:
+    with Multicall(multicall_address, block) as multicall:
+        calls = [multicall.add(metaregistry.pool_list, i) for i in indices]
+    return [str(call.value) for call in calls]
+
+
+def _read_pools(metaregistry: ABIContract, multicall_address: str, block: int, pools: list[str]) -> list[dict]:
+    getters = {column: _pool_getter(metaregistry, name) for column, name in POOL_GETTERS.items()}
+    with Multicall(multicall_address, block) as multicall:
+        calls = [
+            {column: multicall.add(getter, pool, allow_failure=True) for column, getter in getters.items()}
+            for pool in pools
+        ]
+
+    return [_pool_row(pool, pool_calls) for pool, pool_calls in zip(pools, calls)]
+
+
+def _pool_row(pool: str, pool_calls: dict[str, DeferredCall]) -> dict:
+    # bit k of `failed` is set for k-th getter of POOL_GETTERS, its column is left empty (zeros)
+    row = {"pool": pool, "failed": 0}
+    for k, column in enumerate(POOL_GETTERS):
+        call = pool_calls[column]
+        if call.success:
+            row[column] = call.value
+        else:
+            row["failed"] |= 1 << k
+    return row
+
+
+def snapshot_pools(
+    chain_config_file: str, output: str | Path | None = None, batch_size: int = 16, workers: int = 4
+) -> Path:
+    """
+    Read coins, decimals, balances, fees, pool params, LP tokens and gauges of all pools of the metaregistry at one
+    block and write them to columnar file (see scripts.snapshot.columnar)
+
+    Args:
+    chain_config_file (str): Chain config file, deployment file of the chain has the metaregistry
+    output (str | Path | None): File to write, .cache/snapshots/{chain}_{block}.pools by default
+    batch_size (int): Pools read per multicall
+    workers (int): Multicalls executed at the same time, always 1 in debug mode (fork is not thread safe)
+    Returns:
+    Path: Path of the snapshot file
+    """
+    chain_settings = get_chain_settings(chain_config_file)
+    deployment = get_deployment_obj(chain_settings).get_deployment_config()
+    metaregistry = deployment.contracts.registries.metaregistry.get_contract()
+    multicall_address = chain_settings.multicall3
+    if settings.DEBUG:
+        workers = 1
+
+    # pin the block, so that all batches read the same state
+    with Multicall(multicall_address) as multicall:
+        block_number, block_timestamp = multicall.add_block()
+        pool_count = multicall.add(metaregistry.pool_count)
+    block = block_number.value
+    logger.info(f"Reading {pool_count.value} pools of metaregistry {metaregistry.address} at block {block} ...")
+
+    pool_batch_size = batch_size * len(POOL_GETTERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="snapshot") as executor:
+        batches = [
+            range(i, min(i + pool_batch_size, pool_count.value)) for i in range(0, pool_count.value, pool_batch_size)
+        ]
+        pools = [
+            pool
+            for batch in executor.map(lambda b: _read_pool_list(metaregistry, multicall_address, block, b), batches)
+            for pool in batch
+        ]
+
+        batches = [pools[i : i + batch_size] for i in range(0, len(pools), batch_size)]
+        rows = [
+            row
+            for batch in executor.map(lambda b: _read_pools(metaregistry, multicall_address, block, b), batches)
+            for row in batch
+        ]
+
+    failed = sum(1 for row in rows if row["failed"])
+    if failed:
+        logger.warning(f"{failed} pools have getters reverted, see `failed` column")
+
+    meta = {
+        "chain": chain_settings.file_name,
+        "chain_id": chain_settings.chain_id,
+        "block_number": block,
+        "block_timestamp": block_timestamp.value,
+        "metaregistry": str(metaregistry.address),
+        "getters": list(POOL_GETTERS.values()),
+    }
+    output = output or Path(SNAPSHOTS_DIR, f"{chain_settings.file_name}_{block}.pools")
+    path = write_snapshot(output, POOL_COLUMNS, rows, meta)
+    logger.info(f"Snapshot of {len(rows)} pools at block {block} written to {path}")
+    return path
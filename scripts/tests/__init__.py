@@ -1,9 +1,9 @@
 import click
 
+from scripts.fleet import get_chain_config_files, run_fleet
 from scripts.logging_config import get_logger
-from scripts.tests.post_deploy import test_post_deploy
-from scripts.tests.pre_deployment import test_pre_deploy
-from settings.config import get_chain_settings
+from scripts.network import requires_network, setup_network_env
+from settings.config import get_chain_settings, settings
 
 logger = get_logger()
 
@@ -17,11 +17,37 @@ def test_commands():
 @test_commands.command("pre_deploy", short_help="run pre deploy tests")
 @click.argument("chain_config_file", type=click.STRING)
 def run_test_pre_deploy(chain_config_file: str):
-    settings = get_chain_settings(chain_config_file)
-    test_pre_deploy(settings.chain_id)
+    # not requires_network: nothing to check on a fork, debug mode skips before forking
+    if settings.DEBUG:
+        logger.info("Skipping pre deployment tests in DEBUG mode...")
+        return
+
+    from scripts.tests.pre_deployment import test_pre_deploy
+
+    chain_settings = get_chain_settings(chain_config_file)
+    setup_network_env(settings.WEB3_PROVIDER_URL)
+    test_pre_deploy(chain_settings.chain_id)
 
 
 @test_commands.command("post_deploy", short_help="run post deploy tests")
 @click.argument("chain_config_file", type=click.STRING)
+@requires_network
 def run_test_post_deploy(chain_config_file: str):
+    from scripts.tests.post_deploy import test_post_deploy
+
     test_post_deploy(chain_config_file)
+
+
+@test_commands.command("fleet", short_help="run post deploy tests on several chains concurrently")
+@click.argument("pattern", type=click.STRING)
+@click.option("--jobs", default=None, type=click.INT, help="Number of chains tested at the same time")
+def run_test_fleet(pattern: str, jobs: int | None = None):
+    from scripts.tests.post_deploy import test_post_deploy
+
+    chain_config_files = get_chain_config_files(pattern)
+    if not chain_config_files:
+        raise click.BadParameter(f"No chain config files match {pattern}")
+
+    results = run_fleet("test", test_post_deploy, chain_config_files, max_workers=jobs, read_only=True)
+    if any(result["status"] != "ok" for result in results):
+        raise click.ClickException("Fleet post deploy tests failed")
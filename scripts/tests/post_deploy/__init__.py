@@ -1,6 +1,7 @@
 from scripts.deploy.deployment_file import get_deployment_obj
 from scripts.logging_config import get_logger
 from settings.config import get_chain_settings
+from settings.models import ChainConfig
 
 from .amm.stableswap import test_stableswap_deployment
 from .amm.tricrypto import test_tricrypto_deployment
@@ -8,41 +9,54 @@ from .amm.twocrypto import test_twocrypto_deployment
 from .gauge import test_gauge_deployment
 from .helpers import test_helpers_deployment
 from .registries import test_registries_deployment
+from .utils import DeploymentChecks
 from .xgov import test_xgov_deployment
 
 logger = get_logger()
 
 
-def test_post_deploy(chain_config_file: str, ignore_deployments: list[str]):
+def get_ignored_deployments(chain_settings: ChainConfig) -> list[str]:
+    # xgov is not deployed when all admins are set in chain settings (e.g. L1)
+    dao = chain_settings.dao
+    if dao and dao.ownership_admin and dao.parameter_admin and dao.emergency_admin:
+        return ["xgov"]
+    return []
+
+
+def test_post_deploy(chain_config_file: str, ignore_deployments: list[str] | None = None):
     """Test is run after whole infra is deployed"""
 
     logger.info("Starting post-deployment tests...")
 
     chain_settings = get_chain_settings(chain_config_file)
+    if ignore_deployments is None:
+        ignore_deployments = get_ignored_deployments(chain_settings)
     deployment = get_deployment_obj(chain_settings).get_deployment_config()
 
-    test_stableswap_deployment(deployment)
-    logger.info("Stableswap tests ... PASSED")
-
-    test_twocrypto_deployment(deployment)
-    logger.info("Twocrypto tests ... PASSED")
-
-    test_tricrypto_deployment(deployment)
-    logger.info("Tricrypto tests ... PASSED")
-
-    test_helpers_deployment(deployment)
-    logger.info("Helpers tests ... PASSED")
-
-    test_registries_deployment(deployment, chain_settings)
-    logger.info("Registries tests ... PASSED")
+    # collect reads of all tests first, so that they are executed in a couple of batched round trips
+    checks = DeploymentChecks(deployment.config.multicall3)
+    test_stableswap_deployment(deployment, checks.section("Stableswap"))
+    test_twocrypto_deployment(deployment, checks.section("Twocrypto"))
+    test_tricrypto_deployment(deployment, checks.section("Tricrypto"))
+    test_helpers_deployment(deployment, checks.section("Helpers"))
+    test_registries_deployment(deployment, chain_settings, checks.section("Registries"))
 
     if "xgov" in ignore_deployments:
         logger.warning("Xgov tests ... IGNORED")
     else:
-        test_xgov_deployment(deployment)
-        logger.info("Xgov tests ... PASSED")
+        test_xgov_deployment(deployment, checks.section("Xgov"))
+
+    test_gauge_deployment(deployment, checks.section("Gauge"))
+
+    failures = checks.run()
+    for section, failed in failures.items():
+        if failed:
+            logger.error(f"{section} tests ... FAILED")
+            for description in failed:
+                logger.error(f"  {description}")
+        else:
+            logger.info(f"{section} tests ... PASSED")
 
-    test_gauge_deployment(deployment)
-    logger.info("Gauge tests ... PASSED")
+    assert not any(failures.values()), "Post-deployment tests failed"
 
     logger.info("Post-deployment tests are finished.")
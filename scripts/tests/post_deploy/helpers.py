@@ -1,11 +1,11 @@
 from scripts.deploy.models import DeploymentConfig
-from scripts.tests.post_deploy.utils import check_contracts, get_contract
+from scripts.tests.post_deploy.utils import DeploymentChecks, get_contract
 
 
-def test_helpers_deployment(deployment: DeploymentConfig):
+def test_helpers_deployment(deployment: DeploymentConfig, checks: DeploymentChecks):
     current_deployment = deployment.contracts.helpers
     contracts = {
         k: {**v, "contract": get_contract(v["contract_path"], v["address"])}
         for k, v in current_deployment.model_dump().items()
     }
-    check_contracts(contracts)
+    checks.check_contracts(contracts)
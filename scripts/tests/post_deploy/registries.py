@@ -1,9 +1,9 @@
 from scripts.deploy.models import DeploymentConfig
-from scripts.tests.post_deploy.utils import check_contracts, get_contract
+from scripts.tests.post_deploy.utils import DeploymentChecks, get_contract
 from settings.models import RollupType
 
 
-def test_registries_deployment(deployment: DeploymentConfig, chain_settings):
+def test_registries_deployment(deployment: DeploymentConfig, chain_settings, checks: DeploymentChecks):
     contracts_deployment = deployment.contracts
     contracts_deployment = contracts_deployment.model_dump()
 
@@ -11,7 +11,7 @@ def test_registries_deployment(deployment: DeploymentConfig, chain_settings):
         k: {**v, "contract": get_contract(v["contract_path"], v["address"])}
         for k, v in contracts_deployment["registries"].items()
     }
-    check_contracts(contracts)
+    checks.check_contracts(contracts)
 
     # <-------------------------- Address Provider -------------------------->
     address_provider = contracts["address_provider"]["contract"]
@@ -22,24 +22,28 @@ def test_registries_deployment(deployment: DeploymentConfig, chain_settings):
         assert gov_contracts.get("vault")
         fee_receiver = gov_contracts["vault"]["address"]
 
-    assert address_provider.get_address(2) == contracts_deployment["helpers"]["router"]["address"]
-    assert address_provider.get_address(4) == fee_receiver
-    assert address_provider.get_address(7) == contracts_deployment["registries"]["metaregistry"]["address"]
-    assert address_provider.get_address(11) == contracts_deployment["amm"]["tricryptoswap"]["factory"]["address"]
-    assert address_provider.get_address(12) == contracts_deployment["amm"]["stableswap"]["factory"]["address"]
-    assert address_provider.get_address(13) == contracts_deployment["amm"]["twocryptoswap"]["factory"]["address"]
-    assert address_provider.get_address(18) == contracts_deployment["helpers"]["rate_provider"]["address"]
-    assert address_provider.get_address(26) == contracts_deployment["helpers"]["deposit_and_stake_zap"]["address"]
-    assert address_provider.get_address(27) == contracts_deployment["helpers"]["stable_swap_meta_zap"]["address"]
-
+    expected_addresses = {
+        2: contracts_deployment["helpers"]["router"]["address"],
+        4: fee_receiver,
+        7: contracts_deployment["registries"]["metaregistry"]["address"],
+        11: contracts_deployment["amm"]["tricryptoswap"]["factory"]["address"],
+        12: contracts_deployment["amm"]["stableswap"]["factory"]["address"],
+        13: contracts_deployment["amm"]["twocryptoswap"]["factory"]["address"],
+        18: contracts_deployment["helpers"]["rate_provider"]["address"],
+        26: contracts_deployment["helpers"]["deposit_and_stake_zap"]["address"],
+        27: contracts_deployment["helpers"]["stable_swap_meta_zap"]["address"],
+    }
     if chain_settings.dao and chain_settings.dao.crv:
-        assert address_provider.get_address(19) == chain_settings.dao.crv
+        expected_addresses[19] = chain_settings.dao.crv
     if chain_settings.dao and chain_settings.dao.crvusd:
-        assert address_provider.get_address(25) == chain_settings.dao.crvusd
+        expected_addresses[25] = chain_settings.dao.crvusd
+
+    for id, address in expected_addresses.items():
+        checks.assert_equal(checks.call(address_provider.get_address, id), address)
 
     # <-------------------------- Metaregistry -------------------------->
     meta_registry = contracts["metaregistry"]["contract"]
 
-    assert meta_registry.get_registry(0) == contracts["metaregistry"]["registry_handlers"]["stableswap"]["address"]
-    assert meta_registry.get_registry(1) == contracts["metaregistry"]["registry_handlers"]["tricryptoswap"]["address"]
-    assert meta_registry.get_registry(2) == contracts["metaregistry"]["registry_handlers"]["twocryptoswap"]["address"]
+    registry_handlers = contracts["metaregistry"]["registry_handlers"]
+    for i, amm in enumerate(("stableswap", "tricryptoswap", "twocryptoswap")):
+        checks.assert_equal(checks.call(meta_registry.get_registry, i), registry_handlers[amm]["address"])
@@ -1,38 +1,93 @@
-from pathlib import Path
+from typing import Any
 
 import boa
-from boa.contracts.abi.abi_contract import ABIContract
+from boa.contracts.abi.abi_contract import ABIContract, ABIFunction
 
-from settings.config import BASE_DIR, settings
+from scripts.deploy.abi import get_contract_at
+from scripts.deploy.constants import MULTICALL3_ADDRESS
+from scripts.deploy.deployment_utils import has_code
+from scripts.deploy.multicall import DeferredCall, Multicall
+from settings.config import settings
 
 
-def check_if_contract_deployed(address: str) -> bool:
-    if settings.DEBUG:
-        return True
+def get_contract(contract_path: str, address: str) -> ABIContract:
+    return get_contract_at(contract_path, address)
 
-    code = boa.env._rpc.fetch("eth_getCode", [address, "latest"])
-    return code is not None
 
+class DeploymentChecks:
+    """
+    Collects reads of post-deploy assertions and evaluates them locally after all reads are done
+    in two round trips: one Multicall3 batch of view calls and one JSON-RPC batch of eth_getCode.
+    """
 
-def check_contract_version(contract: ABIContract, version: str, deployment_type: str) -> bool:
-    if deployment_type == "blueprint":
-        # Can't check for blueprint unless deploy from blueprint
-        return True
+    def __init__(self, multicall_address: str = MULTICALL3_ADDRESS):
+        self.multicall = Multicall(multicall_address)
+        self._code_requests: list[str] = []
+        self._codes: dict[str, Any] = {}
+        self._assertions: dict[str, list[tuple[str, Any]]] = {}
+        self._section = None
 
-    return contract.version() == version
+    def section(self, name: str) -> "DeploymentChecks":
+        self._section = name
+        self._assertions.setdefault(name, [])
+        return self
 
+    def call(self, function: ABIFunction, *args) -> DeferredCall:
+        return self.multicall.add(function, *args, allow_failure=True)
 
-def get_contract(contract_path: str, address: str) -> ABIContract:
-    contract_path = BASE_DIR / Path(contract_path.lstrip("/"))
-    return boa.load_partial(contract_path).at(address)
+    def _add(self, description: str, check) -> None:
+        self._assertions[self._section].append((description, check))
+
+    def assert_equal(self, call: DeferredCall, expected: Any, description: str | None = None) -> None:
+        description = description or f"{call.function.name}{call.args} at {call.target} == {expected}"
+        self._add(description, lambda: call.value == expected)
+
+    def assert_deployed(self, address: str) -> None:
+        if settings.DEBUG:
+            return
+        address = str(address)
+        self._code_requests.append(address)
+        # address missing from batch response fails too
+        self._add(f"code at {address}", lambda: has_code(self._codes.get(address)))
+
+    def assert_version(self, contract: ABIContract, version: str, deployment_type: str) -> None:
+        if deployment_type == "blueprint":
+            # Can't check for blueprint unless deploy from blueprint
+            return
+        self.assert_equal(self.call(contract.version), version, f"{contract.address} version == {version}")
+
+    def check_contracts(self, contracts: dict[str, dict]) -> None:
+        for contract in contracts.values():
+            self.assert_deployed(contract["contract"].address)
+
+        for contract in contracts.values():
+            self.assert_version(contract["contract"], contract["contract_version"], contract["deployment_type"])
+
+    def _fetch_codes(self) -> None:
+        addresses = list(dict.fromkeys(self._code_requests))
+        if not addresses:
+            return
+        codes = boa.env._rpc.fetch_multi([("eth_getCode", [address, "latest"]) for address in addresses])
+        self._codes.update(zip(addresses, codes))
 
+    def run(self) -> dict[str, list[str]]:
+        """
+        Execute all collected reads and evaluate assertions
 
-def check_contracts(contracts: dict[str, dict]):
-    for contract in contracts.values():
-        assert check_if_contract_deployed(contract["contract"].address) is True
+        Returns:
+        dict[str, list[str]]: Failed assertion descriptions by section
+        """
+        self.multicall.execute()
+        self._fetch_codes()
 
-    for contract in contracts.values():
-        assert (
-            check_contract_version(contract["contract"], contract["contract_version"], contract["deployment_type"])
-            is True
-        )
+        failures = {}
+        for section, assertions in self._assertions.items():
+            failures[section] = []
+            for description, check in assertions:
+                try:
+                    passed = check()
+                except ValueError:  # failed view call
+                    passed = False
+                if not passed:
+                    failures[section].append(description)
+        return failures
@@ -1,8 +1,8 @@
 from scripts.deploy.models import DeploymentConfig
-from scripts.tests.post_deploy.utils import check_contracts, get_contract
+from scripts.tests.post_deploy.utils import DeploymentChecks, get_contract
 
 
-def test_xgov_deployment(deployment: DeploymentConfig):
+def test_xgov_deployment(deployment: DeploymentConfig, checks: DeploymentChecks):
     current_deployment = deployment.contracts.governance
     if current_deployment is None:
         return
@@ -13,10 +13,10 @@ def test_xgov_deployment(deployment: DeploymentConfig):
     contracts = {
         k: {**v, "contract": get_contract(v["contract_path"], v["address"])} for k, v in current_deployment.items()
     }
-    check_contracts(contracts)
+    checks.check_contracts(contracts)
 
     relayer = contracts["relayer"]["contract"]
 
-    assert relayer.OWNERSHIP_AGENT() == deployment.config.dao.ownership_admin
-    assert relayer.PARAMETER_AGENT() == deployment.config.dao.parameter_admin
-    assert relayer.EMERGENCY_AGENT() == deployment.config.dao.emergency_admin
+    checks.assert_equal(checks.call(relayer.OWNERSHIP_AGENT), deployment.config.dao.ownership_admin)
+    checks.assert_equal(checks.call(relayer.PARAMETER_AGENT), deployment.config.dao.parameter_admin)
+    checks.assert_equal(checks.call(relayer.EMERGENCY_AGENT), deployment.config.dao.emergency_admin)
@@ -0,0 +1,229 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from scripts.logging_config import get_logger
+
+logger = get_logger()
+
+
+class Tracer:
+    """
+    Collects timing spans as Chrome trace "complete" events (open with chrome://tracing or ui.perfetto.dev)
+    """
+
+    def __init__(self):
+        self.events: list[dict] = []
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+
+    def add(self, name: str, category: str, started_at: float, finished_at: float, args: dict) -> None:
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (started_at - self._started_at) * 1e6,
+            "dur": (finished_at - started_at) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Get time spent per category
+
+        Returns:
+        dict[str, dict]: Category -> count, total, mean and max duration in seconds
+        """
+        with self._lock:
+            events = list(self.events)
+
+        summary: dict[str, dict] = {}
+        for event in events:
+            duration = event["dur"] / 1e6
+            category = summary.setdefault(event["cat"], {"count": 0, "total": 0.0, "max": 0.0})
+            category["count"] += 1
+            category["total"] += duration
+            category["max"] = max(category["max"], duration)
+        for category in summary.values():
+            category["mean"] = category["total"] / category["count"]
+        return summary
+
+    def get_totals(self, category: str) -> dict[str, float]:
+        """
+        Get time spent per span name of a category
+
+        Args:
+        category (str): Span category, e.g. "step"
+        Returns:
+        dict[str, float]: Span name -> total duration in seconds
+        """
+        with self._lock:
+            events = [event for event in self.events if event["cat"] == category]
+
+        totals: dict[str, float] = {}
+        for event in events:
+            totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1e6
+        return totals
+
+    def write(self, file_path: Path) -> None:
+        with self._lock:
+            events = list(self.events)
+        with open(file_path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def log_summary(self) -> None:
+        wall_time = time.perf_counter() - self._started_at
+        logger.info(f"Trace summary ({wall_time:.2f}s wall time, spans may overlap):")
+        logger.info(f"  {'phase':<12} {'count':>7} {'total, s':>10} {'mean, ms':>10} {'max, ms':>10}")
+        for name, category in sorted(self.summary().items(), key=lambda item: -item[1]["total"]):
+            logger.info(
+                f"  {name:<12} {category['count']:>7} {category['total']:>10.2f} "
+                f"{category['mean'] * 1e3:>10.1f} {category['max'] * 1e3:>10.1f}"
+            )
+
+
+_tracer: Tracer | None = None
+
+
+@contextmanager
+def span(name: str, category: str, **args):
+    """
+    Measure duration of the block, no-op unless tracing is started
+    """
+    if _tracer is None:
+        yield
+        return
+
+    tracer, started_at = _tracer, time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.add(name, category, started_at, time.perf_counter(), args)
+
+
+def traced(category: str, name: str | None = None):
+    """
+    Decorator measuring duration of every call of the function
+    """
+
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with span(span_name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class TracedRPC:
+    """
+    Wrapper of boa rpc recording a span for every request
+    """
+
+    def __init__(self, rpc):
+        self._rpc = rpc
+
+    def fetch(self, method, params):
+        with span(method, "rpc"):
+            return self._rpc.fetch(method, params)
+
+    def fetch_uncached(self, method, params):
+        with span(method, "rpc"):
+            return self._rpc.fetch_uncached(method, params)
+
+    def fetch_multi(self, payloads):
+        with span("batch", "rpc", methods=sorted({method for method, _ in payloads}), size=len(payloads)):
+            return self._rpc.fetch_multi(payloads)
+
+    def wait_for_tx_receipt(self, tx_hash, timeout: float, poll_latency=0.25):
+        with span("wait_for_tx_receipt", "receipt"):
+            return self._rpc.wait_for_tx_receipt(tx_hash, timeout, poll_latency)
+
+    @property
+    def identifier(self) -> str:
+        # boa reuses caching rpc of a fork by identifier, don't let a fork made before tracing started be reused
+        return f"traced:{self._rpc.identifier}"
+
+    def __getattr__(self, name):
+        return getattr(self._rpc, name)
+
+
+def trace_rpc(rpc):
+    """
+    Wrap rpc a fork is about to be built from, if tracing is started.
+    Fork reads served from disk cache don't reach the rpc and are not traced.
+
+    Args:
+    rpc (boa.rpc.RPC): Rpc to fork from
+    Returns:
+    boa.rpc.RPC: Traced rpc, or the given one if tracing is not started
+    """
+    if _tracer is None or isinstance(rpc, TracedRPC):
+        return rpc
+    return TracedRPC(rpc)
+
+
+def trace_network_env() -> None:
+    """
+    Trace requests of network env rpc if tracing is started (network env may be set up after start of tracing).
+    Fork rpc can only be wrapped when the fork is built, see trace_rpc.
+    """
+    if _tracer is None or "boa" not in sys.modules:
+        return
+
+    import boa
+    from boa.network import NetworkEnv
+
+    if isinstance(boa.env, NetworkEnv):
+        if not isinstance(boa.env._rpc, TracedRPC):
+            boa.env._rpc = TracedRPC(boa.env._rpc)
+    elif boa.env.evm.is_forked:
+        logger.warning("Fork was set up before tracing started, its rpc requests are not traced")
+
+
+def start_tracing() -> Tracer:
+    """
+    Start collecting spans. Requests of network env rpc, or of forks set up from now on, are traced as well.
+    """
+    global _tracer
+
+    _tracer = Tracer()
+    trace_network_env()
+    return _tracer
+
+
+def stop_tracing(file_path: Path | None = None) -> Tracer | None:
+    """
+    Stop collecting spans. If file path is given, write Chrome trace there and log summary per phase.
+
+    Args:
+    file_path (Path | None): Trace file
+    Returns:
+    Tracer | None: Collected spans, None if tracing was not started
+    """
+    global _tracer
+
+    if _tracer is None:
+        return None
+
+    tracer, _tracer = _tracer, None
+    if file_path is not None:
+        tracer.write(Path(file_path))
+        tracer.log_summary()
+        logger.info(f"Trace written to {file_path}")
+    return tracer
@@ -5,6 +5,7 @@ from pydantic_settings import BaseSettings, PydanticBaseSettingsSource, Settings
 import settings.models as DataModels
 
 BASE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(BASE_DIR, ".cache")
 settings = DataModels.Settings()
 
 
@@ -16,6 +16,9 @@ class Settings(BaseSettings):
     WEB3_PROVIDER_URL: str
     DEPLOYER_EOA_PRIVATE_KEY: str
 
+    # per-chain RPC urls for fleet mode (chain config file name -> url), json in env
+    WEB3_PROVIDER_URLS: dict[str, str] = {}
+
 
 class RollupType(StrEnum):
     op_stack = "op_stack"
@@ -0,0 +1,190 @@
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).parents[2]
+ERC20_MOCK = Path(BASE_DIR, "scripts", "deploy", "test_pools", "contracts", "ERC20mock.vy")
+MULTICALL3 = Path(BASE_DIR, "scripts", "devnet", "Multicall3.vy")
+STABLESWAP_DIR = Path(BASE_DIR, "contracts", "amm", "stableswap")
+TRICRYPTO_DIR = Path(BASE_DIR, "contracts", "amm", "tricryptoswap")
+TWOCRYPTO_DIR = Path(BASE_DIR, "contracts", "amm", "twocryptoswap")
+TWOCRYPTO_FACTORY_MOCK = Path(__file__).parent / "contracts" / "twocrypto_factory.vy"
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+TWOCRYPTO_INITIAL_PRICE = 2000 * 10**18
+# twocrypto-ng defaults: gamma, A, mid_fee, out_fee, fee_gamma, adjustment_step_min, adjustment_step_max, ma_time
+TWOCRYPTO_GAMMA, TWOCRYPTO_A = 145_000_000_000_000, 400_000
+TWOCRYPTO_FEE_PARAMS = (26_000_000, 45_000_000, 230_000_000_000_000)
+TWOCRYPTO_REBALANCING_PARAMS = (2_000_000_000_000, 146_000_000_000_000, 866)
+
+
+@pytest.fixture(scope="session")
+def deploy():
+    """
+    Deploy contract compiled with the compiler of its pragma (same as deployment scripts)
+    """
+    pytest.importorskip("boa")
+    from scripts.deploy.compiler import load_partial
+
+    def deploy(contract_file: Path, *args):
+        return load_partial(contract_file).deploy(*args)
+
+    return deploy
+
+
+@pytest.fixture(scope="session")
+def contract_call():
+    """
+    Call contract function, None if it reverts (same as call_many with allow_failure)
+    """
+    boa = pytest.importorskip("boa")
+
+    def contract_call(function, *args):
+        try:
+            return function(*args)
+        except boa.BoaError:
+            return None
+
+    return contract_call
+
+
+def _pack_3(x: tuple[int, int, int]) -> int:
+    return (x[0] << 128) | (x[1] << 64) | x[2]
+
+
+def _mint_coins(deploy, decimals: list[int]) -> list:
+    import boa
+
+    coins = [deploy(ERC20_MOCK, f"Coin {k}", f"C{k}", d) for k, d in enumerate(decimals)]
+    for coin in coins:
+        coin._mint_for_testing(boa.env.eoa, 10**40)
+    return coins
+
+
+def _approve(coins: list, pool) -> None:
+    for coin in coins:
+        coin.approve(pool.address, 2**256 - 1)
+
+
+@pytest.fixture(scope="module")
+def multicall(deploy) -> str:
+    """
+    Address of Multicall3 (devnet implementation), so that pools are read the same way as on chain
+    """
+    return str(deploy(MULTICALL3).address)
+
+
+@pytest.fixture(scope="module")
+def stableswap_pool(deploy):
+    """
+    stableswap-ng plain pool (implementation_v_700) of coins with 18 and 6 decimals, deployed by factory
+    """
+    import boa
+
+    from scripts.deploy.compiler import load_partial
+
+    factory = deploy(Path(STABLESWAP_DIR, "factory", "factory_v_100.vy"), boa.env.eoa, boa.env.eoa)
+    factory.set_math_implementation(deploy(Path(STABLESWAP_DIR, "math", "math_v_100.vy")).address)
+    factory.set_views_implementation(deploy(Path(STABLESWAP_DIR, "views", "views_v_120.vy")).address)
+    pool_deployer = load_partial(Path(STABLESWAP_DIR, "implementation", "implementation_v_700.vy"))
+    factory.set_pool_implementations(0, pool_deployer.deploy_as_blueprint().address)
+
+    coins = _mint_coins(deploy, [18, 6])
+    # A, fee, offpeg fee multiplier, ma exp time, implementation, asset types, method ids, oracles
+    pool = pool_deployer.at(
+        factory.deploy_plain_pool(
+            "Stable",
+            "STB",
+            [coin.address for coin in coins],
+            1000,
+            4_000_000,
+            20_000_000_000,
+            866,
+            0,
+            [0, 0],
+            [b"\x00" * 4] * 2,
+            [ZERO_ADDRESS] * 2,
+        )
+    )
+    _approve(coins, pool)
+    pool.add_liquidity([1_000_000 * 10**18, 1_200_000 * 10**6], 0)
+    return pool
+
+
+@pytest.fixture(scope="module")
+def tricrypto_pool(deploy):
+    """
+    tricrypto-ng pool (implementation_v_200) of coins with 6, 8 and 18 decimals, deployed by factory
+    """
+    import boa
+
+    from scripts.deploy.compiler import load_partial
+
+    factory = deploy(Path(TRICRYPTO_DIR, "factory", "factory_v_200.vy"), boa.env.eoa)
+    factory.set_math_implementation(deploy(Path(TRICRYPTO_DIR, "math", "math_v_200.vy")).address)
+    factory.set_views_implementation(deploy(Path(TRICRYPTO_DIR, "views", "views_v_200.vy")).address)
+    pool_deployer = load_partial(Path(TRICRYPTO_DIR, "implementation", "implementation_v_200.vy"))
+    factory.set_pool_implementation(pool_deployer.deploy_as_blueprint().address, 0)
+
+    coins = _mint_coins(deploy, [6, 8, 18])
+    # parameters of tricryptoUSDC: A, gamma, mid_fee, out_fee, fee_gamma, allowed_extra_profit, adjustment_step,
+    # ma_exp_time and initial prices of coins 1 and 2
+    pool = pool_deployer.at(
+        factory.deploy_pool(
+            "Tricrypto",
+            "TRI",
+            [coin.address for coin in coins],
+            coins[2].address,
+            0,
+            1_707_629,
+            11_809_167_828_997,
+            3_000_000,
+            30_000_000,
+            500_000_000_000_000,
+            2_000_000_000_000,
+            490_000_000_000_000,
+            866,
+            [30_000 * 10**18, 2_000 * 10**18],
+        )
+    )
+    _approve(coins, pool)
+    pool.add_liquidity([3_000_000 * 10**6, 100 * 10**8, 1_500 * 10**18], 0)
+    return pool
+
+
+@pytest.fixture(scope="module")
+def twocrypto_pool(deploy, tmp_path_factory):
+    """
+    twocrypto-ng pool (implementation_v_300) of coins with 18 and 6 decimals, deployed by mock factory
+    """
+    from scripts.deploy.compiler import load_partial
+
+    math = deploy(Path(TWOCRYPTO_DIR, "math", "math_v_210.vy"))
+    views = deploy(Path(TWOCRYPTO_DIR, "views", "twocrypto_view.vy"))
+
+    # math and views are source-patched into the blueprint at deploy time
+    source = Path(TWOCRYPTO_DIR, "implementation", "implementation_v_300.vy").read_text()
+    source = source.replace("VIEW = Views(empty(address))", f"VIEW = Views({views.address})")
+    source = source.replace("MATH = Math(empty(address))", f"MATH = Math({math.address})")
+    implementation = Path(tmp_path_factory.mktemp("twocrypto"), "implementation_v_300.vy")
+    implementation.write_text(source)
+    pool_deployer = load_partial(implementation)
+
+    # coin 1 has 6 decimals, so that precisions and price_scale both matter
+    coins = _mint_coins(deploy, [18, 6])
+    factory = deploy(TWOCRYPTO_FACTORY_MOCK)
+    pool = pool_deployer.at(
+        factory.deploy_pool(
+            pool_deployer.deploy_as_blueprint().address,
+            [coin.address for coin in coins],
+            1 | (10**12 << 128),
+            TWOCRYPTO_GAMMA | (TWOCRYPTO_A << 128),
+            _pack_3(TWOCRYPTO_FEE_PARAMS),
+            _pack_3(TWOCRYPTO_REBALANCING_PARAMS),
+            TWOCRYPTO_INITIAL_PRICE,
+        )
+    )
+    _approve(coins, pool)
+    pool.add_liquidity([2_000_000 * 10**18, 1000 * 10**6], 0)
+    return pool
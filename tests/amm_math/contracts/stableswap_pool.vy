@@ -0,0 +1,48 @@
+# pragma version 0.3.10
+
+"""
+@title StableswapPool
+@notice Getters of stableswap-ng pool read by views, with state set directly, so that views can be evaluated
+        on arbitrary pool states in differential tests of scripts.amm_math.stableswap
+"""
+
+MAX_COINS: constant(uint256) = 8
+
+N_COINS: public(uint256)
+A: public(uint256)
+fee: public(uint256)
+offpeg_fee_multiplier: public(uint256)
+totalSupply: public(uint256)
+
+rates: DynArray[uint256, MAX_COINS]
+balances: DynArray[uint256, MAX_COINS]
+
+
+@external
+def set_state(
+    _rates: DynArray[uint256, MAX_COINS],
+    _balances: DynArray[uint256, MAX_COINS],
+    _A: uint256,
+    _fee: uint256,
+    _offpeg_fee_multiplier: uint256,
+    _total_supply: uint256,
+):
+    self.N_COINS = len(_balances)
+    self.rates = _rates
+    self.balances = _balances
+    self.A = _A
+    self.fee = _fee
+    self.offpeg_fee_multiplier = _offpeg_fee_multiplier
+    self.totalSupply = _total_supply
+
+
+@view
+@external
+def stored_rates() -> DynArray[uint256, MAX_COINS]:
+    return self.rates
+
+
+@view
+@external
+def get_balances() -> DynArray[uint256, MAX_COINS]:
+    return self.balances
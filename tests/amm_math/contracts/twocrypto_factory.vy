@@ -0,0 +1,41 @@
+# pragma version 0.3.10
+
+"""
+@title TwocryptoFactory
+@notice Deploys twocrypto-ng pools from blueprint with the constructor arguments of the factory. Fee receiver is not
+        set, so admin fees stay in admin_balances of the pool, as in scripts.amm_math.twocrypto.TwocryptoState
+"""
+
+admin: public(address)
+fee_receiver: public(address)
+
+
+@external
+def __init__():
+    self.admin = msg.sender
+
+
+@external
+def deploy_pool(
+    _blueprint: address,
+    _coins: address[2],
+    _packed_precisions: uint256,
+    _packed_gamma_A: uint256,
+    _packed_fee_params: uint256,
+    _packed_rebalancing_params: uint256,
+    _initial_price: uint256,
+) -> address:
+    return create_from_blueprint(
+        _blueprint,
+        "Twocrypto",
+        "TWO",
+        _coins,
+        empty(address),
+        empty(bytes32),
+        _packed_precisions,
+        _packed_gamma_A,
+        _packed_fee_params,
+        _packed_rebalancing_params,
+        _initial_price,
+        code_offset=3,
+    )
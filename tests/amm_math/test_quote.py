@@ -0,0 +1,65 @@
+"""
+Test of scripts.amm_math.quote against compiled pools: quotes computed from the state read in one multicall must be
+equal to pool.get_dy, including sizes the pool reverts on
+"""
+
+import pytest
+
+STEPS = 4
+
+
+@pytest.fixture(scope="module", params=["stableswap", "twocrypto", "tricrypto"])
+def pool_kind(request):
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def pool(pool_kind, request):
+    return request.getfixturevalue(f"{pool_kind}_pool")
+
+
+def _sizes(pool, i: int) -> list[int]:
+    # from dust up to more than the whole balance of the pool
+    balance = pool.balances(i)
+    return [1, 10**3, balance // 10**6, balance // 1000, balance // 10, balance // 2, balance, 10 * balance]
+
+
+def test_detect_pool_kind(pool, pool_kind, multicall):
+    from scripts.amm_math.quote import detect_pool_kind
+
+    assert detect_pool_kind(pool.address, multicall) == pool_kind
+
+
+def test_quote_curve(pool, pool_kind, multicall, contract_call):
+    import boa
+
+    from scripts.amm_math.quote import quote_curve, read_pool_state
+
+    n_coins = 3 if pool_kind == "tricrypto" else 2
+    for step in range(STEPS):
+        state, _ = read_pool_state(pool.address, pool_kind, multicall)
+        assert state is not None
+
+        for i in range(n_coins):
+            j = (i + 1) % n_coins
+            sizes = _sizes(pool, i)
+            expected = [contract_call(pool.get_dy, i, j, dx) for dx in sizes]
+            assert quote_curve(pool.address, i, j, sizes, pool_kind, multicall) == expected, (step, i, j)
+
+        # move the pool away from balance and let the oracle catch up
+        i = step % n_coins
+        pool.exchange(i, (i + 1) % n_coins, pool.balances(i) // 5, 0)
+        boa.env.time_travel(seconds=600)
+
+
+@pytest.mark.parametrize("multicall_address", ["", "0x" + "ca" * 20])
+def test_views_without_multicall3(stableswap_pool, multicall_address):
+    from scripts.deploy.multicall import Multicall
+
+    # chain without Multicall3: calls are sent one by one
+    with Multicall(multicall_address) as multicall:
+        balance = multicall.add(stableswap_pool.balances, 0)
+        reverted = multicall.add(stableswap_pool.balances, 5, allow_failure=True)
+
+    assert balance.value == stableswap_pool.balances(0)
+    assert not reverted.success
@@ -0,0 +1,126 @@
+"""
+Differential tests of scripts.amm_math.stableswap against compiled stableswap-ng math and views:
+results must be equal and inputs must revert in both or in neither
+"""
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from scripts.amm_math import StableswapState
+from scripts.amm_math.evm import call_many
+from scripts.amm_math.stableswap import A_PRECISION, get_D, get_y, get_y_D
+
+STABLESWAP_DIR = Path(__file__).parents[2] / "contracts" / "amm" / "stableswap"
+POOL_MOCK = Path(__file__).parent / "contracts" / "stableswap_pool.vy"
+
+FEE = 4_000_000
+RATES = {
+    "18 decimals": 10**18,
+    "6 decimals": 10**30,
+    "rate oracle": 1_083_000_000_000_000_000,
+}
+# balances of coins in their own decimals, scaled by rate of the coin
+BALANCES = {
+    "balanced": lambda n: [10**6] * n,
+    "imbalanced": lambda n: [10**6 * (k + 1) for k in range(n)],
+    "depegged": lambda n: [10**8] + [10**4] * (n - 1),
+    "dust": lambda n: [1] * n,
+}
+STATES = [
+    pytest.param(n_coins, rates, balances, A, multiplier, id=f"{n_coins} coins-{rates}-{balances}-A {A}-x{multiplier}")
+    for n_coins, rates, balances, A, multiplier in itertools.product(
+        (2, 3, 4), ("18 decimals", "6 decimals", "rate oracle"), BALANCES, (10, 1500), (10**10, 2 * 10**10)
+    )
+]
+
+
+@pytest.fixture(scope="module")
+def math(deploy):
+    return deploy(Path(STABLESWAP_DIR, "math", "math_v_100.vy"))
+
+
+@pytest.fixture(scope="module")
+def views(deploy):
+    return deploy(Path(STABLESWAP_DIR, "views", "views_v_120.vy"))
+
+
+@pytest.fixture(scope="module")
+def pool(deploy):
+    return deploy(POOL_MOCK)
+
+
+def _make_state(pool, n_coins: int, rates: str, balances: str, A: int, multiplier: int) -> StableswapState:
+    # first coin always has 18 decimals, so that pools mix precisions
+    coin_rates = [10**18] + [RATES[rates]] * (n_coins - 1)
+    coin_balances = [
+        balance * 10**36 // rate for balance, rate in zip(BALANCES[balances](n_coins), coin_rates, strict=True)
+    ]
+    state = StableswapState(
+        rates=tuple(coin_rates),
+        balances=tuple(coin_balances),
+        A=A,
+        fee=FEE,
+        offpeg_fee_multiplier=multiplier,
+        total_supply=sum(BALANCES[balances](n_coins)) * 10**18,
+    )
+    pool.set_state(coin_rates, coin_balances, A, FEE, multiplier, state.total_supply)
+    return state
+
+
+def _amounts(state: StableswapState, i: int) -> list[int]:
+    # from nothing to draining the pool and overflowing uint256
+    balance = state.balances[i] if 0 <= i < state.n_coins else 10**18
+    return [0, 1, 10**6, balance // 10, balance, balance * 10, 2**200]
+
+
+def _pairs(n_coins: int) -> list[tuple[int, int]]:
+    # all pairs plus same coin and out of range indices, which revert
+    return list(itertools.product(range(n_coins), repeat=2)) + [(0, n_coins), (n_coins, 0), (-1, 0)]
+
+
+@pytest.mark.parametrize("n_coins,rates,balances,A,multiplier", STATES)
+def test_math(math, contract_call, n_coins, rates, balances, A, multiplier):
+    xp = [b * 10**18 for b in BALANCES[balances](n_coins)]
+    amp = A * A_PRECISION
+    (D,) = call_many([(get_D, (xp, amp))], allow_failure=True)
+    assert contract_call(math.get_D, xp, amp, n_coins) == D
+    if D is None:  # get_D doesn't converge for some very imbalanced pools
+        return
+
+    for i, j in itertools.product(range(n_coins), repeat=2):
+        for x in (1, xp[i] // 2, xp[i] * 3, 2**200):
+            (expected,) = call_many([(get_y, (i, j, x, xp, amp, D))], allow_failure=True)
+            assert contract_call(math.get_y, i, j, x, xp, amp, D, n_coins) == expected, (i, j, x)
+
+    for i in range(n_coins):
+        for new_D in (0, D // 2, D - 1, D, D * 2):
+            (expected,) = call_many([(get_y_D, (amp, i, xp, new_D))], allow_failure=True)
+            assert contract_call(math.get_y_D, amp, i, xp, new_D, n_coins) == expected, (i, new_D)
+
+
+@pytest.mark.parametrize("n_coins,rates,balances,A,multiplier", STATES)
+def test_views(views, pool, contract_call, n_coins, rates, balances, A, multiplier):
+    state = _make_state(pool, n_coins, rates, balances, A, multiplier)
+
+    for i, j in _pairs(n_coins):
+        (fee,) = call_many([(state.dynamic_fee, (i, j))], allow_failure=True)
+        assert contract_call(views.dynamic_fee, i, j, pool.address) == fee, ("dynamic_fee", i, j)
+
+        for amount in _amounts(state, i):
+            (dy,) = call_many([(state.get_dy, (i, j, amount))], allow_failure=True)
+            assert contract_call(views.get_dy, i, j, amount, pool.address) == dy, ("get_dy", i, j, amount)
+
+        for amount in _amounts(state, j):
+            (dx,) = call_many([(state.get_dx, (i, j, amount))], allow_failure=True)
+            assert contract_call(views.get_dx, i, j, amount, pool.address) == dx, ("get_dx", i, j, amount)
+
+    for i in [*range(n_coins), n_coins]:
+        for burn_amount in (0, 1, state.total_supply // 100, state.total_supply // 2, state.total_supply):
+            (expected,) = call_many([(state.calc_withdraw_one_coin, (burn_amount, i))], allow_failure=True)
+            assert contract_call(views.calc_withdraw_one_coin, burn_amount, i, pool.address) == expected, (
+                "calc_withdraw_one_coin",
+                i,
+                burn_amount,
+            )
@@ -0,0 +1,109 @@
+"""
+Differential tests of scripts.amm_math.tricrypto against compiled tricrypto-ng math_v_200:
+results must be equal bit for bit and inputs must revert in both or in neither
+"""
+
+import itertools
+import random
+from pathlib import Path
+
+import pytest
+
+from scripts.amm_math.evm import MAX_UINT256, call_many
+from scripts.amm_math.tricrypto import MAX_A, MAX_GAMMA, MIN_A, MIN_GAMMA, cbrt, geometric_mean, get_p, get_y, newton_D
+
+MATH = Path(__file__).parents[2] / "contracts" / "amm" / "tricryptoswap" / "math" / "math_v_200.vy"
+
+# cbrt switches precision at these values
+CBRT_LIMIT = 115792089237316195423570985008687907853269
+CBRT_INPUTS = [0, 1, 2, 7, 8, 10**18, 27 * 10**18, 10**36, 10**54, MAX_UINT256] + [
+    limit + delta for limit in (CBRT_LIMIT, CBRT_LIMIT * 10**18) for delta in (-1, 0, 1)
+]
+
+A_GAMMAS = [
+    (MIN_A, MIN_GAMMA),
+    (1707629, 11809167828997),  # tricrypto-ng defaults
+    (MAX_A, MAX_GAMMA),
+    (MIN_A - 1, 11809167828997),  # unsafe A
+    (1707629, MAX_GAMMA + 1),  # unsafe gamma
+]
+BALANCES = [
+    [10**24, 10**24, 10**24],
+    [10**24, 3 * 10**23, 2 * 10**24],
+    [10**24, 2 * 10**22, 10**24],  # x[i] / D close to the lower limit
+    [10**24, 10**21, 10**24],  # unsafe x[i]
+    [10**17, 10**17, 10**17],
+    [10**33, 10**33, 10**33],
+    [0, 10**24, 10**24],  # empty pool
+]
+
+
+@pytest.fixture(scope="module")
+def math(deploy):
+    return deploy(MATH)
+
+
+def _py(function, *args):
+    (result,) = call_many([(function, args)], allow_failure=True)
+    return result
+
+
+def _contract(contract_call, function, *args):
+    # fixed size arrays are compared as lists
+    result = contract_call(function, *args)
+    return list(result) if isinstance(result, (list, tuple)) else result
+
+
+def test_cbrt(math, contract_call):
+    rng = random.Random(0)
+    inputs = CBRT_INPUTS + [rng.getrandbits(bits) for bits in range(1, 257) for _ in range(2)]
+    for x in inputs:
+        assert contract_call(math.cbrt, x) == _py(cbrt, x), x
+
+
+def test_geometric_mean(math, contract_call):
+    rng = random.Random(1)
+    triples = [list(x) for x in itertools.product((0, 1, 10**18, 10**24, 10**36), repeat=3)]
+    triples += [[rng.getrandbits(rng.randint(1, 128)) for _ in range(3)] for _ in range(200)]
+    triples += [[2**200] * 3]  # overflow
+    for x in triples:
+        assert contract_call(math.geometric_mean, x) == _py(geometric_mean, x), x
+
+
+@pytest.mark.parametrize("ANN,gamma", A_GAMMAS)
+@pytest.mark.parametrize("x", BALANCES)
+def test_newton_D(math, contract_call, ANN, gamma, x):
+    assert contract_call(math.newton_D, ANN, gamma, x) == _py(newton_D, ANN, gamma, x)
+
+
+@pytest.mark.parametrize("ANN,gamma", A_GAMMAS)
+@pytest.mark.parametrize("x", BALANCES)
+def test_get_y_and_warm_start(math, contract_call, ANN, gamma, x):
+    D = _py(newton_D, ANN, gamma, x)
+    if D is None:
+        D = sum(x) or 10**18  # get_y checks D and balances itself, unsafe inputs must revert in both
+
+    for i, j in itertools.permutations(range(3), 2):
+        for dx in (1, x[j] // 1000, x[j] // 10, x[j], x[j] * 10, 2**200):
+            x_trade = list(x)
+            x_trade[j] = x_trade[j] + dx
+            y = _py(get_y, ANN, gamma, x_trade, D, i)
+            assert _contract(contract_call, math.get_y, ANN, gamma, x_trade, D, i) == (
+                None if y is None else list(y)
+            ), (i, j, dx)
+            if y is None or y[1] == 0:
+                continue
+
+            # newton_D of balances after the trade, warm started with K0 of get_y
+            x_trade[i] = y[0]
+            assert contract_call(math.newton_D, ANN, gamma, x_trade, y[1]) == _py(
+                newton_D, ANN, gamma, x_trade, y[1]
+            ), ("warm start", i, j, dx)
+
+
+@pytest.mark.parametrize("ANN,gamma", A_GAMMAS)
+@pytest.mark.parametrize("x", BALANCES)
+def test_get_p(math, contract_call, ANN, gamma, x):
+    # D of the balances and D just outside of the safe range
+    for D in (_py(newton_D, ANN, gamma, x) or sum(x), 10**17 - 1, 10**33 + 1):
+        assert _contract(contract_call, math.get_p, x, D, [ANN, gamma]) == _py(get_p, x, D, [ANN, gamma]), D
@@ -0,0 +1,140 @@
+"""
+Differential test of scripts.amm_math.twocrypto.TwocryptoState against compiled twocrypto-ng pool
+(implementation_v_300): random operations are applied to both, results, reverts and state must be equal after every step
+"""
+
+import copy
+import dataclasses
+import random
+
+import pytest
+
+from scripts.amm_math import TwocryptoState
+from scripts.amm_math.evm import call_many
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+# storage without getter, only affects state through later operations
+UNREADABLE_FIELDS = {"donation_protection_extension_remainder"}
+
+
+@pytest.fixture(scope="module")
+def seeded_pool(twocrypto_pool):
+    # read in the block of the first deposit, where price_oracle() is the cached oracle
+    return twocrypto_pool, _read_state(twocrypto_pool)
+
+
+def _read_state(pool) -> TwocryptoState:
+    initial_A_gamma, future_A_gamma = pool.initial_A_gamma(), pool.future_A_gamma()
+    mid_fee, out_fee, fee_gamma = ((pool.packed_fee_params() >> shift) & (2**64 - 1) for shift in (128, 64, 0))
+    adjustment_step = pool.adjustment_step()
+    return TwocryptoState(
+        balances=[pool.balances(0), pool.balances(1)],
+        admin_balances=[pool.admin_balances(0), pool.admin_balances(1)],
+        precisions=tuple(pool.precisions()),
+        initial_A=initial_A_gamma >> 128,
+        initial_gamma=initial_A_gamma & (2**128 - 1),
+        A=future_A_gamma >> 128,
+        gamma=future_A_gamma & (2**128 - 1),
+        D=pool.D(),
+        price_scale=pool.price_scale(),
+        price_oracle=pool.price_oracle(),
+        last_prices=pool.last_prices(),
+        last_timestamp=pool.last_timestamp(),
+        mid_fee=mid_fee,
+        out_fee=out_fee,
+        fee_gamma=fee_gamma,
+        adjustment_step_min=adjustment_step[0],
+        adjustment_step_max=adjustment_step[1],
+        ma_time=pool.packed_rebalancing_params() & (2**64 - 1),
+        total_supply=pool.totalSupply(),
+        virtual_price=pool.virtual_price(),
+        xcp_profit=pool.xcp_profit(),
+        lp_xcp_profit=pool.lp_xcp_profit(),
+        reserved_profit_fraction=pool.reserved_profit_fraction(),
+        admin_fee=pool.admin_fee(),
+        donation_shares=pool.donation_shares(),
+        donation_shares_max_ratio=pool.donation_shares_max_ratio(),
+        donation_duration=pool.donation_duration(),
+        last_donation_release_ts=pool.last_donation_release_ts(),
+        donation_protection_expiry_ts=pool.donation_protection_expiry_ts(),
+        donation_protection_period=pool.donation_protection_period(),
+        donation_protection_lp_threshold=pool.donation_protection_lp_threshold(),
+        initial_A_gamma_time=pool.initial_A_gamma_time(),
+        future_A_gamma_time=pool.future_A_gamma_time(),
+    )
+
+
+def _fields(state: TwocryptoState, timestamp: int) -> dict:
+    fields = {k: v for k, v in dataclasses.asdict(state).items() if k not in UNREADABLE_FIELDS}
+    fields["precisions"] = list(fields["precisions"])
+    if state.last_timestamp < timestamp:
+        # price_oracle() getter extrapolates the cached oracle to the current block
+        del fields["price_oracle"]
+    return fields
+
+
+def _random_operation(rng: random.Random, state: TwocryptoState, lp_balance: int) -> tuple[str, tuple]:
+    # sizes from dust to more than the pool holds, so that some operations revert
+    def size(amount: int) -> int:
+        return int(amount * 10 ** rng.uniform(-6, 0.5))
+
+    kind = rng.choice(["exchange", "exchange", "exchange", "add_liquidity", "remove_one_coin", "remove_fixed_out"])
+    i = rng.randrange(2)
+    if kind == "exchange":
+        j = i if rng.random() < 0.05 else 1 - i
+        return kind, (i, j, size(state.balances[i]))
+    if kind == "add_liquidity":
+        amounts = [size(state.balances[0]) // 10, size(state.balances[1]) // 10]
+        if rng.random() < 0.3:
+            amounts[rng.randrange(2)] = 0
+        return kind, (amounts, rng.random() < 0.2)
+    token_amount = min(size(lp_balance) // 10, lp_balance)
+    if kind == "remove_one_coin":
+        return kind, (token_amount, i)
+    return kind, (token_amount, i, size(state.balances[i]) // 100)
+
+
+def _apply_state(state: TwocryptoState, kind: str, args: tuple, timestamp: int) -> int | None:
+    if kind == "exchange":
+        call = (state.exchange, (*args, timestamp))
+    elif kind == "add_liquidity":
+        amounts, donation = args
+        call = (state.add_liquidity, (amounts, timestamp, donation))
+    elif kind == "remove_one_coin":
+        call = (state.remove_liquidity_one_coin, (*args, timestamp))
+    else:
+        call = (state.remove_liquidity_fixed_out, (*args, timestamp))
+    (result,) = call_many([call], allow_failure=True)
+    return result
+
+
+def _apply_pool(pool, contract_call, kind: str, args: tuple) -> int | None:
+    if kind == "exchange":
+        return contract_call(pool.exchange, *args, 0)
+    if kind == "add_liquidity":
+        amounts, donation = args
+        if donation:
+            return contract_call(pool.add_liquidity, amounts, 0, ZERO_ADDRESS, True)
+        return contract_call(pool.add_liquidity, amounts, 0)
+    if kind == "remove_one_coin":
+        return contract_call(pool.remove_liquidity_one_coin, *args, 0)
+    return contract_call(pool.remove_liquidity_fixed_out, *args, 0)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_random_operations(seeded_pool, contract_call, seed):
+    import boa
+
+    pool, state = seeded_pool[0], copy.deepcopy(seeded_pool[1])
+    rng = random.Random(seed)
+    with boa.env.anchor():
+        for step in range(40):
+            # several operations in the same block as well as long gaps between them
+            boa.env.time_travel(seconds=rng.choice([0, 0, 12, 600, 86400]))
+            timestamp = boa.env.evm.patch.timestamp
+
+            kind, args = _random_operation(rng, state, pool.balanceOf(boa.env.eoa))
+            expected = _apply_state(state, kind, args, timestamp)
+            assert _apply_pool(pool, contract_call, kind, args) == expected, (step, kind, args)
+            assert _fields(_read_state(pool), timestamp) == _fields(state, timestamp), (step, kind, args)
@@ -0,0 +1,17 @@
+import os
+from pathlib import Path
+
+from dotenv import dotenv_values
+
+# settings are validated on import of settings.config, tests that don't reach a network only need them to be set.
+# Values of the environment and of settings/env take precedence.
+TEST_SETTINGS = {
+    "WEB3_PROVIDER_URL": "http://127.0.0.1:8545",
+    # first account of anvil and hardhat, never holds funds on public chains
+    "DEPLOYER_EOA_PRIVATE_KEY": "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcb5b1e7b9d5e50f7a",
+}
+
+_env_file = dotenv_values(Path(__file__).parents[1] / "settings" / "env")
+for _key, _value in TEST_SETTINGS.items():
+    if not _env_file.get(_key):
+        os.environ.setdefault(_key, _value)
@@ -0,0 +1,46 @@
+import pytest
+
+CHAIN_CONFIG_FILE = "examples/example_op_stack.yaml"
+
+
+@pytest.fixture
+def chain_config_file() -> str:
+    return CHAIN_CONFIG_FILE
+
+
+@pytest.fixture
+def devnet(monkeypatch, tmp_path):
+    """
+    Network env of a fresh local devnet of the example chain, deployment files are removed afterwards
+    """
+    boa = pytest.importorskip("boa")
+    from boa.vm.fork import CachingRPC
+
+    from scripts.benchmark import _get_deployment_files
+    from scripts.deploy import deployment_utils
+    from scripts.devnet import create_devnet
+    from scripts.network import setup_network_env
+    from settings.config import get_chain_settings, settings
+
+    deployment_files = _get_deployment_files(CHAIN_CONFIG_FILE)
+    if any(file.exists() for file in deployment_files):
+        pytest.skip("deployment file of the example chain exists")
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    # abi files of deployed contracts are written next to the deployment, keep the tree clean
+    monkeypatch.setattr(deployment_utils, "BASE_DIR", tmp_path)
+    # every devnet has the same chain id and block numbers: don't let network env read state of another devnet
+    # from boa's fork cache (one sqlite db per process, keyed by request only), keep fork reads in memory instead
+    monkeypatch.setattr(CachingRPC, "_loaded", {})
+    monkeypatch.setattr(CachingRPC.__new__, "__defaults__", (None,))
+
+    env = boa.env
+    server = create_devnet(get_chain_settings(CHAIN_CONFIG_FILE).chain_id).start()
+    try:
+        setup_network_env(server.url)
+        yield server
+    finally:
+        boa.set_env(env)
+        server.stop()
+        for file in deployment_files:
+            file.unlink(missing_ok=True)
@@ -0,0 +1,13 @@
+import pytest
+
+
+@pytest.mark.ignore_isolation
+def test_run_benchmark(devnet, chain_config_file):
+    from scripts.benchmark import _run_benchmark
+
+    result = _run_benchmark(chain_config_file, devnet.url, None, {"workers": 4, "max_in_flight": 4})
+
+    assert result["status"] == "ok", result.get("error")
+    assert result["cost"]["transactions"] == len(devnet.chain.receipts)
+    assert set(result["phases"]) >= {"compile", "deploy", "post_deploy"}
+    assert result["wall_time"] > 0
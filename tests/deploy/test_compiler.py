@@ -0,0 +1,58 @@
+from pathlib import Path
+
+CONTRACTS_DIR = Path(__file__).parents[2] / "contracts"
+
+
+def test_imported_files_are_resolved_recursively():
+    from scripts.deploy.compiler import get_imported_files
+
+    relayer = Path(CONTRACTS_DIR, "governance", "relayer", "taiko", "relayer_v_001.vy")
+    assert get_imported_files(relayer) == [
+        Path(CONTRACTS_DIR, "governance", "agent", "agent_v_101.vy").resolve(),
+        Path(CONTRACTS_DIR, "governance", "relayer", "relayer_v_100.vy").resolve(),
+    ]
+
+
+def test_compilation_key_covers_imports(tmp_path):
+    from scripts.deploy.compiler import get_contract_compilation_key
+
+    Path(tmp_path, "lib").mkdir()
+    nested = Path(tmp_path, "lib", "constants.vy")
+    nested.write_text("# pragma version 0.4.0\nFEE: constant(uint256) = 1\n")
+    module = Path(tmp_path, "lib", "fees.vy")
+    module.write_text("# pragma version 0.4.0\nfrom . import constants\n")
+    contract = Path(tmp_path, "pool_v_100.vy")
+    contract.write_text("# pragma version 0.4.0\nfrom lib import fees\nimport lib.constants as constants\n")
+
+    key = get_contract_compilation_key(contract, "cancun")
+    assert get_contract_compilation_key(contract, "cancun") == key
+
+    module.write_text("# pragma version 0.4.0\nfrom . import constants\n# changed\n")
+    changed_module_key = get_contract_compilation_key(contract, "cancun")
+    assert changed_module_key != key
+
+    # module imported by imported module
+    nested.write_text("# pragma version 0.4.0\nFEE: constant(uint256) = 2\n")
+    assert get_contract_compilation_key(contract, "cancun") not in (key, changed_module_key)
+
+
+def test_precompile_into_another_cache_dir_with_spawned_workers(monkeypatch, tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+    from functools import partial
+    from multiprocessing import get_context
+
+    from scripts.deploy import compiler
+
+    contract_file = Path(CONTRACTS_DIR, "amm", "stableswap", "math", "math_v_100.vy")
+    # spawned workers re-import compiler, as on macos and with forkserver
+    monkeypatch.setattr(compiler, "ProcessPoolExecutor", partial(ProcessPoolExecutor, mp_context=get_context("spawn")))
+    monkeypatch.setattr(compiler, "get_latest_contracts", lambda: [contract_file])
+    monkeypatch.setattr(compiler, "_cache_dir", compiler._cache_dir)
+    monkeypatch.setattr(compiler, "_deployers", {})
+    compiler.set_compilation_cache_dir(tmp_path)
+
+    compiler.precompile_contracts(max_workers=1)
+
+    key = compiler.get_contract_compilation_key(contract_file)
+    assert Path(tmp_path, f"{key}.json").exists()
+    assert compiler.is_compiled(contract_file)
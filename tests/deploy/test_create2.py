@@ -0,0 +1,155 @@
+from pathlib import Path
+
+import pytest
+
+CONTRACTS_DIR = Path(__file__).parents[2] / "contracts"
+
+
+@pytest.mark.parametrize(
+    "contract_file,as_blueprint,expected",
+    [
+        ("amm/stableswap/math/math_v_100.vy", False, True),
+        ("helpers/rate_provider/rate_provider_v_101.vy", False, True),
+        ("amm/stableswap/factory/factory_v_100.vy", False, False),  # admin is msg.sender
+        ("governance/relayer/taiko/relayer_v_001.vy", False, False),  # module initializer
+        ("amm/stableswap/implementation/implementation_v_700.vy", True, True),  # constructor doesn't run
+    ],
+)
+def test_can_deploy_via_create2(contract_file, as_blueprint, expected):
+    from scripts.deploy.create2 import can_deploy_via_create2
+
+    assert can_deploy_via_create2(Path(CONTRACTS_DIR, contract_file), as_blueprint) == expected
+
+
+def test_create2_planner():
+    from scripts.deploy.compiler import load_partial
+    from scripts.deploy.constants import BROADCASTERS
+    from scripts.deploy.create2 import Create2Planner, Ref, get_create2_address
+    from scripts.deploy.utils import get_initcode
+    from settings.models import RollupType
+
+    messenger = "0x4200000000000000000000000000000000000007"
+    planner = Create2Planner()
+    # referenced contract may be added after the one referencing it
+    planner.add(
+        "relayer",
+        Path(CONTRACTS_DIR, "governance", "relayer", "op_stack"),
+        BROADCASTERS[RollupType.op_stack],
+        Ref("agent"),
+        messenger,
+    )
+    planner.add("agent", Path(CONTRACTS_DIR, "governance", "agent"), as_blueprint=True, deploy_contract_version="v_100")
+    planner.add_deployed("vault", "0x" + "11" * 20)
+
+    planned = planner.plan()
+    assert list(planned) == ["agent", "relayer"]
+    assert planned["relayer"].ctor_args == (BROADCASTERS[RollupType.op_stack], planned["agent"].address, messenger)
+    for deployment in planned.values():
+        initcode = get_initcode(load_partial(deployment.contract_file), deployment.ctor_args, deployment.as_blueprint)
+        assert deployment.initcode == initcode
+        assert deployment.address == get_create2_address(initcode)
+    assert planner.get_address_map() == {
+        "vault": "0x" + "11" * 20,
+        "agent": planned["agent"].address,
+        "relayer": planned["relayer"].address,
+    }
+
+
+def test_create2_planner_errors():
+    from scripts.deploy.create2 import Create2Planner, Ref
+
+    planner = Create2Planner()
+    with pytest.raises(ValueError, match="can't be deployed via CREATE2"):
+        planner.add("factory", Path(CONTRACTS_DIR, "amm", "stableswap", "factory"), "0x" + "11" * 20)
+
+    planner.add("rate_provider", Path(CONTRACTS_DIR, "helpers", "rate_provider"), Ref("address_provider"))
+    with pytest.raises(ValueError, match="unknown contracts"):
+        planner.plan()
+
+    planner = Create2Planner()
+    planner.add("a", Path(CONTRACTS_DIR, "helpers", "rate_provider"), Ref("b"))
+    planner.add("b", Path(CONTRACTS_DIR, "helpers", "rate_provider"), Ref("a"))
+    with pytest.raises(ValueError, match="Reference cycle"):
+        planner.plan()
+
+
+@pytest.mark.ignore_isolation
+@pytest.mark.parametrize(
+    "contract_file,args,as_blueprint",
+    [
+        ("amm/stableswap/math/math_v_100.vy", (), False),
+        ("helpers/rate_provider/rate_provider_v_101.vy", ("0x" + "11" * 20,), False),
+        ("amm/stableswap/implementation/implementation_v_700.vy", (), True),
+    ],
+)
+def test_deploy_via_create2(devnet, contract_file, args, as_blueprint):
+    import boa
+    from eth_utils import keccak
+
+    from scripts.deploy.compiler import load_partial
+    from scripts.deploy.constants import CREATE2_SALT, CREATE2DEPLOYER_ABI, CREATE2DEPLOYER_ADDRESS
+    from scripts.deploy.create2 import get_create2_address
+    from scripts.deploy.deployment_utils import deploy_via_create2, is_deployed
+    from scripts.deploy.utils import get_initcode
+
+    deployer = load_partial(Path(CONTRACTS_DIR, contract_file))
+    initcode = get_initcode(deployer, args, as_blueprint)
+    address = get_create2_address(initcode)
+
+    # local prediction is the same as the one of deployer contract
+    create2deployer = boa.loads_abi(CREATE2DEPLOYER_ABI).at(CREATE2DEPLOYER_ADDRESS)
+    assert create2deployer.computeAddress(CREATE2_SALT, keccak(initcode)) == address
+    assert not is_deployed(address)
+
+    contract = deploy_via_create2(deployer, *args, as_blueprint=as_blueprint)
+    assert contract.address == address
+    assert is_deployed(address)
+    if as_blueprint:
+        assert devnet.chain.get_code(address) == "0x" + (b"\xfe\x71\x00" + deployer.bytecode).hex()
+
+    # contract with the same initcode and salt is reused
+    transactions = len(devnet.chain.receipts)
+    assert deploy_via_create2(deployer, *args, as_blueprint=as_blueprint).address == address
+    assert len(devnet.chain.receipts) == transactions
+
+
+@pytest.mark.ignore_isolation
+def test_deploy_all_create2(devnet, chain_config_file):
+    from scripts.deploy.compiler import load_partial
+    from scripts.deploy.constants import CREATE2DEPLOYER_ADDRESS
+    from scripts.deploy.create2 import get_create2_address
+    from scripts.deploy.deployment_file import get_deployment_obj
+    from scripts.deploy.infra import deploy_all, plan_create2_deployments
+    from scripts.deploy.multicall import call
+    from scripts.deploy.utils import fetch_latest_contract, get_initcode
+    from settings.config import get_chain_settings
+
+    chain_settings = get_chain_settings(chain_config_file)
+    deploy_all(chain_config_file, fresh=True, workers=4, max_in_flight=4, create2=True)
+
+    contracts = get_deployment_obj(chain_settings).get_deployment_config().contracts
+    for folder, as_blueprint, contract in [
+        ("amm/stableswap/math", False, contracts.amm.stableswap.math),
+        ("amm/stableswap/implementation", True, contracts.amm.stableswap.implementation),
+        ("amm/twocryptoswap/views", False, contracts.amm.twocryptoswap.views),
+        ("amm/tricryptoswap/implementation", True, contracts.amm.tricryptoswap.implementation),
+        ("helpers/rate_provider", False, contracts.helpers.rate_provider),
+    ]:
+        deployer = load_partial(fetch_latest_contract(Path(CONTRACTS_DIR, folder)), chain_settings.evm_version)
+        initcode = get_initcode(deployer, as_blueprint=as_blueprint)
+        if contract.constructor_args_encoded:
+            initcode += bytes.fromhex(contract.constructor_args_encoded)
+        assert contract.address == get_create2_address(initcode), folder
+
+    # planned contracts are recorded in deployment file, relayer of the plan was built with planned agent blueprint
+    address_map = plan_create2_deployments(chain_settings).get_address_map()
+    assert {"agent", "relayer", "router", "stableswap.meta_implementation"} <= set(address_map)
+    for name, address in address_map.items():
+        assert devnet.chain.get_code(address) != "0x", name
+    relayer = get_deployment_obj(chain_settings).get_deployment_config().contracts.governance.relayer
+    assert relayer[chain_settings.rollup_type].address == address_map["relayer"]
+
+    # contracts that take owner from msg.sender are deployed regularly (read from the chain, local fork may lag)
+    factory = contracts.amm.stableswap.factory.get_contract()
+    assert call(factory.admin) != CREATE2DEPLOYER_ADDRESS
+    assert devnet.chain.get_code(str(factory.address)) != "0x"
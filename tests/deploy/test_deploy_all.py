@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+
+# network env has no snapshots, boa must not anchor it around fixtures
+@pytest.mark.ignore_isolation
+@pytest.mark.parametrize("max_in_flight", [1, 4])
+def test_deploy_all(devnet, chain_config_file, max_in_flight):
+    from scripts.deploy.deployment_file import get_deployment_obj
+    from scripts.deploy.infra import deploy_all
+    from settings.config import get_chain_settings
+
+    cost = deploy_all(chain_config_file, fresh=True, workers=4, max_in_flight=max_in_flight)
+
+    assert cost["transactions"] == len(devnet.chain.receipts)
+    assert "transfer_ownership" in cost["by_step"]
+
+    # deployment file only has addresses of mined contracts
+    contracts = get_deployment_obj(get_chain_settings(chain_config_file)).get_deployment_config().contracts
+    for contract in [
+        contracts.amm.stableswap.factory,
+        contracts.amm.tricryptoswap.factory,
+        contracts.amm.twocryptoswap.factory,
+        contracts.gauge.child_gauge.factory,
+        contracts.registries.metaregistry,
+        contracts.registries.address_provider,
+        contracts.helpers.router,
+    ]:
+        assert devnet.chain.get_code(contract.address) != "0x"
+
+
+class Killed(Exception):
+    pass
+
+
+@pytest.mark.ignore_isolation
+def test_deploy_all_resume(devnet, chain_config_file, monkeypatch):
+    from scripts.deploy import journal
+    from scripts.deploy.costs import get_current_step
+    from scripts.deploy.deployment_file import get_deployment_obj
+    from scripts.deploy.infra import deploy_all
+    from settings.config import get_chain_settings
+
+    confirm_pending = journal.confirm_pending
+
+    def confirm_pending_or_kill():
+        # run dies after router deploy is sent, before the step is finished and the router is recorded
+        if get_current_step() == "router":
+            raise Killed
+        confirm_pending()
+
+    monkeypatch.setattr(journal, "confirm_pending", confirm_pending_or_kill)
+    with pytest.raises(Killed):
+        deploy_all(chain_config_file, fresh=True, workers=1, max_in_flight=4)
+    monkeypatch.setattr(journal, "confirm_pending", confirm_pending)
+
+    chain_settings = get_chain_settings(chain_config_file)
+    deployment_file = get_deployment_obj(chain_settings)
+    assert deployment_file.get_contract_deployment(("contracts", "helpers", "router")) is None
+
+    with open(deployment_file.file_path.with_suffix(".journal.jsonl")) as file:
+        events = [json.loads(line) for line in file]
+    (router_tx,) = [event for event in events if event["event"] == "tx_sent" and event["step"] == "router"]
+    assert router_tx["deployment"]["contract_file"].startswith("/contracts/helpers/router/")
+    assert not any(event["event"] == "step_finished" and event["step"] == "router" for event in events)
+
+    deploy_all(chain_config_file, workers=1, max_in_flight=4)
+
+    # router of the killed run is recorded on resume, not deployed again
+    router_address = devnet.chain.receipts[router_tx["tx_hash"]]["contractAddress"]
+    assert deployment_file.get_contract_deployment(("contracts", "helpers", "router")).address == router_address
+    router_code = devnet.chain.get_code(router_address)
+    created = [receipt["contractAddress"] for receipt in devnet.chain.receipts.values() if receipt["contractAddress"]]
+    assert [address for address in created if devnet.chain.get_code(address) == router_code] == [router_address]
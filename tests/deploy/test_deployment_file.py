@@ -0,0 +1,33 @@
+import shutil
+from pathlib import Path
+
+DEPLOYMENTS_DIR = Path(__file__).parents[2] / "deployments"
+
+
+def test_deployment_config_is_a_copy(tmp_path):
+    from scripts.deploy.deployment_file import YamlDeploymentFile
+
+    file_path = Path(tmp_path, "arc.yaml")
+    shutil.copy(Path(DEPLOYMENTS_DIR, "devnet", "arc.yaml"), file_path)
+    deployment_file = YamlDeploymentFile(file_path)
+
+    with deployment_file.session():
+        deployment_config = deployment_file.get_deployment_config()
+        vault = deployment_config.config.dao.vault
+        deployment_config.config.dao.vault = "0x" + "11" * 20
+        deployment_config.contracts.helpers.router.address = "0x" + "22" * 20
+
+        router = deployment_file.get_contract_deployment(("contracts", "helpers", "router"))
+        router_address = router.address
+        router.address = "0x" + "33" * 20
+
+        # mutating returned objects changes neither the session nor the flushed file
+        assert deployment_file.get_deployment_config().config.dao.vault == vault
+        assert deployment_file.get_contract_deployment(("contracts", "helpers", "router")).address == router_address
+
+        deployment_file.update_deployment_config({"fork_block": 1})
+
+    reloaded = YamlDeploymentFile(file_path).get_deployment_config()
+    assert reloaded.fork_block == 1
+    assert reloaded.config.dao.vault == vault
+    assert reloaded.contracts.helpers.router.address == router_address
@@ -0,0 +1,43 @@
+from click.testing import CliRunner
+
+
+def test_deploy_fleet_without_rpc_url(monkeypatch):
+    from manage import commands
+    from settings.config import settings
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    monkeypatch.setattr(settings, "WEB3_PROVIDER_URLS", {"example": "http://127.0.0.1:8545"})
+
+    result = CliRunner().invoke(commands, ["deploy", "fleet", "examples/example*.yaml"])
+
+    # usage error naming the chain and its key, before any chain is compiled or deployed
+    assert result.exit_code == 2
+    assert isinstance(result.exception, SystemExit)
+    assert '"example_arb_orbit" to WEB3_PROVIDER_URLS' in result.output
+
+
+def test_ownership_audit():
+    from scripts.fleet import get_ownership_audit
+
+    owner, deployer = "0x" + "aa" * 20, "0x" + "bb" * 20
+    report = {
+        "owner": owner,
+        "unread": ["helpers.router"],
+        "contracts": {
+            "amm.stableswap.factory": {"owner_after": owner.upper(), "unread": False},
+            "registries.address_provider": {"owner_after": deployer, "unread": False},
+            "helpers.router": {"owner_after": None, "unread": True},
+        },
+    }
+    results = [
+        {"chain": "prod/a.yaml", "status": "ok", "ownership": report},
+        {"chain": "prod/b.yaml", "status": "failed"},
+    ]
+
+    assert get_ownership_audit(results) == {
+        "prod/a.yaml": {
+            "owner": owner,
+            "not_transferred": {"registries.address_provider": deployer},
+            "unread": ["helpers.router"],
+        }
+    }
@@ -0,0 +1,82 @@
+import secrets
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "debug,fork_latest,previous_deployment,expected",
+    [
+        (True, False, SimpleNamespace(fork_block=123), 123),
+        (True, False, SimpleNamespace(fork_block=None), None),
+        (True, False, None, None),
+        (True, True, SimpleNamespace(fork_block=123), None),
+        (False, False, SimpleNamespace(fork_block=123), None),
+    ],
+)
+def test_get_fork_block(monkeypatch, chain_config_file, debug, fork_latest, previous_deployment, expected):
+    from scripts.deploy import infra
+    from settings.config import settings
+
+    monkeypatch.setattr(settings, "DEBUG", debug)
+    monkeypatch.setattr(infra, "get_deployment_config", lambda chain_settings: previous_deployment)
+
+    assert infra.get_fork_block(chain_config_file, fork_latest) == expected
+
+
+@pytest.mark.ignore_isolation
+def test_debug_fork_at_pinned_block(devnet, monkeypatch, tmp_path):
+    import boa
+    from boa.network import NetworkEnv
+
+    from scripts import network
+    from settings.config import settings
+
+    forks = []
+    fork_rpc = boa.Env.fork_rpc
+
+    def spy(env, rpc, reset_traces=True, block_identifier="safe", **kwargs):
+        # network env of the devnet forks itself on every block it syncs to
+        if not isinstance(env, NetworkEnv):
+            forks.append(block_identifier)
+        return fork_rpc(env, rpc, reset_traces, block_identifier=block_identifier, **kwargs)
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(boa.Env, "fork_rpc", spy)
+    monkeypatch.setattr(network, "FORK_CACHE_DIR", tmp_path)
+    # transactions of the deployer account make new blocks
+    for _ in range(3):
+        boa.env.raw_call(boa.env.eoa, value=0)
+    pinned_block = devnet.chain.block_number - 2
+
+    network.setup_network_env(devnet.url, pinned_block)
+
+    # the chain is forked once, right at the pinned block
+    assert forks == [pinned_block]
+    assert network.get_fork_block_number() == pinned_block
+
+
+@pytest.mark.ignore_isolation
+def test_debug_fork_rpc_is_traced(devnet, monkeypatch, tmp_path):
+    import boa
+
+    from scripts import network
+    from scripts.tracing import start_tracing, stop_tracing
+    from settings.config import settings
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(network, "FORK_CACHE_DIR", tmp_path)
+    start_tracing()
+    try:
+        network.setup_network_env(devnet.url)
+        # fork cache of boa is one sqlite db per process, keyed by request only: read account nobody has read
+        assert boa.env.get_balance("0x" + secrets.token_hex(20)) == 0
+    finally:
+        tracer = stop_tracing()
+
+    # reads of the fork missing disk cache reach the chain through traced rpc (account fields in one batch),
+    # rpc is traced from the start of the fork
+    events = [event for event in tracer.events if event["cat"] == "rpc"]
+    assert "eth_chainId" in {event["name"] for event in events}
+    methods = {method for event in events for method in event["args"].get("methods", [event["name"]])}
+    assert "eth_getBalance" in methods
@@ -0,0 +1,124 @@
+import pytest
+
+from scripts.snapshot import Column, Snapshot, write_snapshot
+from scripts.snapshot.columnar import ALIGNMENT
+
+ADDRESS = "0x" + "ab" * 20
+ZERO_ADDRESS = "0x" + "00" * 20
+MAX_UINT256 = 2**256 - 1
+
+COLUMNS = [
+    Column("pool", "address"),
+    Column("n_coins", "uint64"),
+    Column("coins", "address", 8),
+    Column("decimals", "uint8", 8),
+    Column("balances", "uint256", 8),
+    Column("params", "uint256", 20),
+    Column("ids", "uint64", 3),
+]
+
+
+def _row(k: int) -> dict:
+    return {
+        "pool": "0x" + f"{k:040x}",
+        "n_coins": k,
+        "coins": [ADDRESS] * 8,
+        "decimals": [18, 6, 8, 0, 255, 1, 2, 3],
+        "balances": [k * 10**18 + m for m in range(8)],
+        "params": [MAX_UINT256 - m for m in range(20)],
+        "ids": [k, 2**64 - 1, 0],
+    }
+
+
+def test_round_trip(tmp_path):
+    rows = [_row(k) for k in range(5)]
+    path = write_snapshot(tmp_path / "pools.snap", COLUMNS, rows, {"block_number": 123})
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.meta == {"block_number": 123}
+        assert len(snapshot) == 5
+        assert list(snapshot.columns) == [column.name for column in COLUMNS]
+        for k, row in enumerate(rows):
+            assert snapshot.row(k) == row
+        assert snapshot.value("params", 4)[0] == MAX_UINT256
+
+        with snapshot.column("balances") as balances:
+            assert len(balances) == 5 * 8 * 32
+        with pytest.raises(IndexError):
+            snapshot.value("pool", 5)
+        with pytest.raises(IndexError):
+            snapshot.value("pool", -1)
+    assert not (tmp_path / ".pools.snap.tmp").exists()
+
+
+def test_zero_rows(tmp_path):
+    path = write_snapshot(tmp_path / "empty.snap", COLUMNS, [], {})
+    assert path.stat().st_size % ALIGNMENT == 0
+
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 0
+        assert list(snapshot.columns) == [column.name for column in COLUMNS]
+        with snapshot.array("ids") as ids:
+            assert ids.tolist() == []
+        with snapshot.column("params") as params:
+            assert len(params) == 0
+        with pytest.raises(IndexError):
+            snapshot.row(0)
+
+
+def test_missing_values_are_zeros(tmp_path):
+    rows = [
+        {"pool": ADDRESS},  # only pool is read
+        {"pool": None, "n_coins": None, "coins": None, "balances": [1, None, 3, None, None, None, None, None]},
+    ]
+    path = write_snapshot(tmp_path / "missing.snap", COLUMNS, rows, {})
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.row(0) == {
+            "pool": ADDRESS,
+            "n_coins": 0,
+            "coins": [ZERO_ADDRESS] * 8,
+            "decimals": [0] * 8,
+            "balances": [0] * 8,
+            "params": [0] * 20,
+            "ids": [0] * 3,
+        }
+        assert snapshot.value("pool", 1) == ZERO_ADDRESS
+        assert snapshot.value("coins", 1) == [ZERO_ADDRESS] * 8
+        assert snapshot.value("balances", 1) == [1, 0, 3, 0, 0, 0, 0, 0]
+
+
+def test_array_casts(tmp_path):
+    rows = [_row(k) for k in range(3)]
+    path = write_snapshot(tmp_path / "arrays.snap", COLUMNS, rows, {})
+
+    with Snapshot(path) as snapshot:
+        with snapshot.array("n_coins") as n_coins:
+            assert n_coins.format == "Q"
+            assert n_coins.tolist() == [0, 1, 2]
+        # wide columns are row after row, `width` values per row
+        with snapshot.array("ids") as ids:
+            assert ids.tolist() == [value for row in rows for value in row["ids"]]
+        with snapshot.array("decimals") as decimals:
+            assert decimals.format == "B"
+            assert decimals.tolist() == [value for row in rows for value in row["decimals"]]
+        # only small integers can be cast
+        with pytest.raises(KeyError):
+            snapshot.array("balances")
+
+
+def test_overwrite(tmp_path):
+    path = tmp_path / "pools.snap"
+    write_snapshot(path, COLUMNS, [_row(1), _row(2)], {"block_number": 1})
+    write_snapshot(path, COLUMNS, [_row(3)], {"block_number": 2})
+
+    with Snapshot(path) as snapshot:
+        assert snapshot.meta["block_number"] == 2
+        assert [snapshot.row(k) for k in range(len(snapshot))] == [_row(3)]
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        Snapshot(path)
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from typing import Any
+
+import pytest
+
+from scripts.snapshot import Snapshot, write_snapshot
+
+POOL = "0x" + "ab" * 20
+
+
+@dataclass
+class Call:
+    # result of executed multicall, as DeferredCall
+    success: bool
+    value: Any = None
+
+
+@pytest.fixture(scope="module")
+def pools():
+    """
+    scripts.snapshot.pools, imported once boa is known to be installed (settings come from tests/conftest.py)
+    """
+    pytest.importorskip("boa")
+    from scripts.snapshot import pools
+
+    return pools
+
+
+def _calls(pools, failed: set[str]) -> dict[str, Call]:
+    values = {
+        "lp_token": POOL,
+        "gauge": POOL,
+        "n_coins": 2,
+        "coins": [POOL] * 8,
+        "decimals": [18] * 8,
+        "balances": [10**18] * 8,
+        "fees": [1] * 10,
+        "pool_params": [2] * 20,
+    }
+    return {column: Call(False) if column in failed else Call(True, values[column]) for column in pools.POOL_GETTERS}
+
+
+def test_getters_have_columns(pools):
+    columns = [column.name for column in pools.POOL_COLUMNS]
+    assert all(column in columns for column in pools.POOL_GETTERS)
+    # every getter has its bit
+    assert len(pools.POOL_GETTERS) <= 64
+
+
+def test_failed_bit_follows_getters_order(pools):
+    for k, column in enumerate(pools.POOL_GETTERS):
+        row = pools._pool_row(POOL, _calls(pools, {column}))
+        assert row["failed"] == 1 << k, column
+        assert column not in row
+
+
+def test_failed_bitmask_round_trip(pools, tmp_path):
+    failed = ["gauge", "balances", "pool_params"]
+    rows = [pools._pool_row(POOL, _calls(pools, set())), pools._pool_row(POOL, _calls(pools, set(failed)))]
+    path = write_snapshot(tmp_path / "pools.snap", pools.POOL_COLUMNS, rows, {})
+
+    getters = list(pools.POOL_GETTERS)
+    with Snapshot(path) as snapshot:
+        with snapshot.array("failed") as bitmasks:
+            assert bitmasks.tolist() == [0, sum(1 << getters.index(column) for column in failed)]
+        assert snapshot.value("balances", 1) == [0] * 8
+        assert snapshot.value("n_coins", 1) == 2
@@ -0,0 +1,33 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from click.testing import CliRunner
+
+BASE_DIR = Path(__file__).parents[1]
+
+
+def test_help_imports_nothing_heavy():
+    code = (
+        "import sys\n"
+        "from click.testing import CliRunner\n"
+        "from manage import commands\n"
+        "assert CliRunner().invoke(commands, ['test', 'pre_deploy', '--help']).exit_code == 0\n"
+        "assert 'boa' not in sys.modules and 'vyper' not in sys.modules, 'boa imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=BASE_DIR, check=True)
+
+
+def test_pre_deploy_skipped_in_debug_without_fork(monkeypatch):
+    import scripts.tests
+    from manage import commands
+    from settings.config import settings
+
+    def setup_network_env(*args, **kwargs):
+        raise AssertionError("network env set up")
+
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(scripts.tests, "setup_network_env", setup_network_env)
+
+    result = CliRunner().invoke(commands, ["test", "pre_deploy", "examples/example.yaml"])
+    assert result.exit_code == 0, result.output